@@ -1,14 +1,17 @@
 """Blog content generation agent - Clean implementation"""
 
-from typing import AsyncIterator, Dict, Optional
-from langchain_openai import ChatOpenAI
-from langchain_ollama import ChatOllama
-from langchain_core.messages import HumanMessage, SystemMessage
-from langchain_community.chat_message_histories import ChatMessageHistory
+import asyncio
+import logging
+from typing import AsyncIterator, List, Optional, Set
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
 
+from backend.agent.history import SessionHistoryStore
 from backend.config import settings
 
 
+logger = logging.getLogger(__name__)
+
+
 class BlogContentAgent:
     """Blog content generation agent using LangChain"""
 
@@ -18,15 +21,20 @@ class BlogContentAgent:
         llm_model: str = "gpt-4o-mini",
         temperature: float = 0.7,
         api_key: Optional[str] = None,
+        history_store: Optional[SessionHistoryStore] = None,
     ):
         """Initialize the agent with LLM configuration."""
         self.api_key = api_key or settings.OPENAI_API_KEY
         self.llm = self._create_llm(llm_provider, llm_model, temperature)
-        self.session_histories: Dict[str, ChatMessageHistory] = {}
+        self.history_store = history_store or SessionHistoryStore()
+        self._summary_tasks: Set[asyncio.Task] = set()
 
     def _create_llm(self, provider: str, model: str, temperature: float):
         """Create LLM instance based on provider."""
+        # Provider packages are imported only for the provider in use
         if provider == "openai":
+            from langchain_openai import ChatOpenAI
+
             return ChatOpenAI(
                 model=model,
                 temperature=temperature,
@@ -34,15 +42,26 @@ class BlogContentAgent:
                 api_key=self.api_key,
             )
         elif provider == "ollama":
+            from langchain_ollama import ChatOllama
+
             return ChatOllama(model=model, temperature=temperature, streaming=True)
         else:
             raise ValueError(f"Unsupported LLM provider: {provider}")
 
-    def get_session_history(self, session_id: str) -> ChatMessageHistory:
-        """Get or create session history."""
-        if session_id not in self.session_histories:
-            self.session_histories[session_id] = ChatMessageHistory()
-        return self.session_histories[session_id]
+    def get_session_history(self, session_id: str) -> List[BaseMessage]:
+        """Get the bounded history sent to the model (rolling summary + recent window)."""
+        summary, window = self.history_store.prompt_messages(session_id)
+        messages: List[BaseMessage] = []
+        if summary:
+            messages.append(
+                SystemMessage(content=f"Summary of the earlier conversation:\n{summary}")
+            )
+        for message in window:
+            if message["role"] == "user":
+                messages.append(HumanMessage(content=message["content"]))
+            elif message["role"] == "assistant":
+                messages.append(AIMessage(content=message["content"]))
+        return messages
 
     async def generate_content(
         self,
@@ -56,15 +75,13 @@ class BlogContentAgent:
 engaging blog content based on the user's instructions. Use markdown formatting with proper 
 headings, paragraphs, and bullet points where appropriate."""
 
-        history = self.get_session_history(session_id)
-        
         messages = [
             SystemMessage(content=system_prompt),
-            *history.messages,
+            *self.get_session_history(session_id),
             HumanMessage(content=prompt),
         ]
 
-        history.add_user_message(prompt)
+        self.history_store.append(session_id, "user", prompt)
         
         full_response = ""
         async for chunk in self.llm.astream(messages):
@@ -72,7 +89,42 @@ headings, paragraphs, and bullet points where appropriate."""
                 full_response += chunk.content
                 yield chunk.content
 
-        history.add_ai_message(full_response)
+        self.history_store.append(session_id, "assistant", full_response)
+
+        # Fold turns that left the window into the rolling summary off the hot path
+        if self.history_store.pending_summary(session_id):
+            task = asyncio.create_task(self._summarize_history(session_id))
+            self._summary_tasks.add(task)
+            task.add_done_callback(self._summary_tasks.discard)
+
+    async def _summarize_history(self, session_id: str):
+        """Merge messages older than the window into the session's rolling summary."""
+        pending = self.history_store.pending_summary(session_id)
+        if not pending:
+            return
+        old_messages, upto = pending
+        summary, _ = self.history_store.prompt_messages(session_id)
+
+        transcript = "\n".join(f"{m['role']}: {m['content']}" for m in old_messages)
+        prompt = f"""Existing summary:
+{summary or "(none)"}
+
+New conversation turns:
+{transcript}
+
+Update the summary to include the new turns. Keep decisions, requested changes and
+facts about the blog post; drop pleasantries. Be concise."""
+
+        try:
+            response = await self.llm.ainvoke(
+                [
+                    SystemMessage(content="You maintain a concise running summary of a conversation."),
+                    HumanMessage(content=prompt),
+                ]
+            )
+            self.history_store.update_summary(session_id, str(response.content), upto)
+        except Exception as exc:
+            logger.warning("Failed to summarize history for session %s: %s", session_id, exc)
 
     async def refine_content(
         self,
@@ -0,0 +1,161 @@
+"""Bounded, Redis-backed chat history for the content agent"""
+
+import re
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Deque, List, Optional, Tuple
+
+from backend.config import settings
+from backend.core.chat_codec import decode_message, encode_message
+from backend.core.database import db
+
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?])\s+|\n+")
+
+
+def clip_summary(summary: str, limit: int) -> str:
+    """Keep the newest ``limit`` characters, starting at a sentence boundary"""
+    if len(summary) <= limit:
+        return summary
+    tail = summary[-limit:]
+    # The cut can land mid-sentence; drop the fragment unless the tail is one sentence
+    match = _SENTENCE_BREAK.search(tail)
+    if match is None or match.end() >= len(tail):
+        return tail.strip()
+    return tail[match.end():]
+
+
+@dataclass
+class SessionContext:
+    """What the agent sends to the model for a session"""
+
+    summary: str = ""
+    summarized_upto: int = 0  # Absolute message index (archived messages included)
+    archived: int = 0
+    length: int = 0  # Messages in the hot Redis list
+    window: Deque[dict] = field(default_factory=deque)
+
+
+class SessionHistoryStore:
+    """Chat history persisted in Redis with an LRU cache of recent windows.
+
+    Messages are appended to ``session:{id}:chat_history`` with the same
+    codec ``SessionService`` uses, so the API and the agent share one
+    history. Only the last ``AGENT_HISTORY_WINDOW`` messages are ever loaded;
+    older turns are folded into a rolling summary kept in
+    ``session:{id}:chat_summary``.
+    """
+
+    def __init__(
+        self,
+        redis=None,
+        max_cached_sessions: Optional[int] = None,
+        window: Optional[int] = None,
+        summary_batch: Optional[int] = None,
+    ):
+        self.redis = redis if redis is not None else db.redis
+        self.max_cached_sessions = max_cached_sessions or settings.AGENT_HISTORY_CACHE_SESSIONS
+        self.window = window or settings.AGENT_HISTORY_WINDOW
+        self.summary_batch = summary_batch or settings.AGENT_HISTORY_SUMMARY_BATCH
+        self._cache: "OrderedDict[str, SessionContext]" = OrderedDict()
+
+    def _history_key(self, session_id: str) -> str:
+        return f"session:{session_id}:chat_history"
+
+    def _summary_key(self, session_id: str) -> str:
+        return f"session:{session_id}:chat_summary"
+
+    def load(self, session_id: str) -> SessionContext:
+        """Return the summary and message window, refreshing from Redis if stale"""
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.llen(self._history_key(session_id))
+        pipe.hget(f"session:{session_id}", "archived_messages")
+        length, archived = pipe.execute()
+        archived = int(archived or 0)
+        # Archival trims the list back to the same length, so LLEN alone can
+        # match a window that other writers have since moved past
+        context = self._cache.get(session_id)
+        if context is not None and (context.length, context.archived) == (length, archived):
+            self._cache.move_to_end(session_id)
+            return context
+
+        raw_messages = self.redis.lrange(self._history_key(session_id), -self.window, -1)
+        summary_data = self.redis.hgetall(self._summary_key(session_id))
+        context = SessionContext(
+            summary=summary_data.get("summary", ""),
+            summarized_upto=int(summary_data.get("upto", "0")),
+            archived=archived,
+            length=length,
+            window=deque((decode_message(raw) for raw in raw_messages), maxlen=self.window),
+        )
+        self._remember(session_id, context)
+        return context
+
+    def append(self, session_id: str, role: str, content: str):
+        """Persist a message and update the cached window"""
+        from backend.services.session_service import session_service
+
+        context = self.load(session_id)
+        message = {"role": role, "content": content, "timestamp": datetime.utcnow()}
+        context.length = self.redis.rpush(
+            self._history_key(session_id),
+            encode_message(role, content, message["timestamp"]),
+        )
+        context.window.append(message)
+        self.redis.hset(
+            f"session:{session_id}", "updated_at", message["timestamp"].isoformat()
+        )
+        session_service.archive_overflow(session_id, context.length)
+
+    def prompt_messages(self, session_id: str) -> Tuple[str, List[dict]]:
+        """Summary plus the newest window trimmed to ``AGENT_HISTORY_MAX_CHARS``"""
+        context = self.load(session_id)
+        budget = settings.AGENT_HISTORY_MAX_CHARS
+        selected: List[dict] = []
+        for message in reversed(context.window):
+            budget -= len(message["content"])
+            if budget < 0 and selected:
+                break
+            selected.append(message)
+        selected.reverse()
+        return context.summary, selected
+
+    def pending_summary(self, session_id: str) -> Optional[Tuple[List[dict], int]]:
+        """Messages that left the window but are not summarized yet.
+
+        Returns ``(messages, upto)`` once at least ``AGENT_HISTORY_SUMMARY_BATCH``
+        such messages exist, otherwise ``None``.
+        """
+        context = self.load(session_id)
+        upto = context.archived + context.length - self.window
+        if upto - context.summarized_upto < self.summary_batch:
+            return None
+        # Messages archived before they could be summarized are skipped
+        raw_messages = self.redis.lrange(
+            self._history_key(session_id),
+            max(0, context.summarized_upto - context.archived),
+            upto - context.archived - 1,
+        )
+        return [decode_message(raw) for raw in raw_messages], upto
+
+    def update_summary(self, session_id: str, summary: str, upto: int):
+        """Store the rolling summary covering messages before ``upto``"""
+        summary = clip_summary(summary, settings.AGENT_SUMMARY_MAX_CHARS)
+        self.redis.hset(
+            self._summary_key(session_id),
+            mapping={"summary": summary, "upto": str(upto)},
+        )
+        context = self._cache.get(session_id)
+        if context is not None:
+            context.summary = summary
+            context.summarized_upto = upto
+
+    def forget(self, session_id: str):
+        """Drop a session from the hot cache"""
+        self._cache.pop(session_id, None)
+
+    def _remember(self, session_id: str, context: SessionContext):
+        self._cache[session_id] = context
+        self._cache.move_to_end(session_id)
+        while len(self._cache) > self.max_cached_sessions:
+            self._cache.popitem(last=False)
@@ -1,10 +1,9 @@
 """Blog generation API endpoints"""
 
-import json
 import logging
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, status, Query
 from fastapi.responses import StreamingResponse
-from typing import List, Optional
+from typing import AsyncIterator, Callable, List, Optional, Union
 
 from backend.models.blog import (
     BlogGenerateRequest,
@@ -12,15 +11,55 @@ from backend.models.blog import (
     BlogDraft,
     BlogDraftUpdate,
     BlogExportRequest,
+    BlogBatch,
+    BlogBatchRequest,
+    DraftVersion,
+    DraftVersionDiff,
+    DraftVersionInfo,
+    GenerationMode,
+    RefineMode,
 )
 from backend.services.blog_service import blog_service
+from backend.services.batch_service import batch_service
+from backend.services.draft_history_service import draft_history_service
+from backend.services.stream_service import parse_event_id, stream_service, text_events
 from backend.core.security import get_current_user_id
+from backend.core.sse import SSE_HEADERS, error_frame, event_frame
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/blog", tags=["Blog"])
 
 
+def _stream_response(stream_id: str, after: int = -1) -> StreamingResponse:
+    return StreamingResponse(
+        stream_service.frames(stream_id, after),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
+
+
+def _start_or_resume(
+    user_id: str,
+    draft_id: str,
+    kind: str,
+    last_event_id: Optional[str],
+    events: Callable[[], AsyncIterator[Union[str, dict]]],
+) -> StreamingResponse:
+    """Resume the caller's stream named by ``Last-Event-ID``, or start a new one.
+
+    Only a stream of the same kind for the same draft is resumed; an id left
+    over from another draft or operation starts a fresh stream.
+    """
+    resume = parse_event_id(last_event_id)
+    if resume:
+        stream_id, seq = resume
+        if stream_service.resumable(stream_id, user_id, kind, draft_id):
+            return _stream_response(stream_id, seq)
+
+    return _stream_response(stream_service.start(user_id, kind, events(), draft_id=draft_id))
+
+
 @router.post("/generate", response_model=BlogDraft, status_code=status.HTTP_201_CREATED)
 async def generate_blog(
     request: BlogGenerateRequest,
@@ -31,33 +70,102 @@ async def generate_blog(
     try:
         # Create the draft first
         draft = await blog_service.create_draft(user_id, session_id, request)
-        
-        # Trigger async content generation (fire and forget)
-        # Content will be generated and stored in Redis
-        import asyncio
-        asyncio.create_task(_generate_content_background(draft.id, request.instructions))
-        
+
+        # Content is generated in the background and stored in Redis
+        blog_service.start_generation(draft.id, request.instructions, request.mode)
+
         return draft
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
-async def _generate_content_background(draft_id: str, instructions: Optional[str] = None):
-    """Background task to generate content"""
+@router.post("/batch", response_model=BlogBatch, status_code=status.HTTP_202_ACCEPTED)
+async def create_batch(
+    request: BlogBatchRequest,
+    session_id: str,
+    user_id: str = Depends(get_current_user_id),
+):
+    """Generate many drafts sharing one retrieval pass (progress via /batch/{id})"""
     try:
-        async for _ in blog_service.generate_content(draft_id, instructions):
-            pass  # Consume the generator to completion
-    except Exception as e:
-        logger.error(f"Error generating content for draft {draft_id}: {e}")
+        return await batch_service.create_batch(user_id, session_id, request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/batch/{batch_id}", response_model=BlogBatch)
+async def get_batch(
+    batch_id: str,
+    user_id: str = Depends(get_current_user_id),
+):
+    """Get batch progress, per-item status and aggregate tokens/latency"""
+    batch = await batch_service.get_batch(batch_id)
+    if not batch:
+        raise HTTPException(status_code=404, detail="Batch not found")
+
+    if batch.user_id != user_id:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    return batch
+
+
+@router.get("/batch/{batch_id}/stream")
+async def stream_batch(
+    batch_id: str,
+    token: Optional[str] = Query(None, description="Auth token for SSE"),
+    user_id: str = Depends(get_current_user_id),
+):
+    """Stream batch item results as they finish using SSE"""
+    batch = await batch_service.get_batch(batch_id)
+    if not batch:
+        raise HTTPException(status_code=404, detail="Batch not found")
+
+    if batch.user_id != user_id:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    async def batch_stream_sse():
+        try:
+            async for event in batch_service.stream_events(batch_id):
+                yield event_frame(event)
+        except Exception as e:
+            yield error_frame(str(e))
+
+    return StreamingResponse(
+        batch_stream_sse(),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
+
+
+@router.get("/streams/{stream_id}")
+async def resume_stream(
+    stream_id: str,
+    last_event_id: Optional[str] = Query(None, description="Last event id received"),
+    last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID"),
+    token: Optional[str] = Query(None, description="Auth token for SSE"),
+    user_id: str = Depends(get_current_user_id),
+):
+    """Replay a generation stream after the given event id and follow it to the end"""
+    owner = stream_service.owner(stream_id)
+    if not owner:
+        raise HTTPException(status_code=404, detail="Stream not found or expired")
+
+    if owner != user_id:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    resume = parse_event_id(last_event_id_header or last_event_id)
+    after = resume[1] if resume and resume[0] == stream_id else -1
+    return _stream_response(stream_id, after)
 
 
 @router.post("/{draft_id}/generate-content")
 async def generate_content(
     draft_id: str,
     instructions: str = None,
+    mode: GenerationMode = Query(GenerationMode.SEQUENTIAL, description="sequential or parallel sections"),
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
     user_id: str = Depends(get_current_user_id),
 ):
-    """Generate blog content (streaming response)"""
+    """Generate blog content (resumable SSE stream)"""
     draft = await blog_service.get_draft(draft_id)
     if not draft:
         raise HTTPException(status_code=404, detail="Draft not found")
@@ -65,23 +173,29 @@ async def generate_content(
     if draft.user_id != user_id:
         raise HTTPException(status_code=403, detail="Access denied")
 
-    async def generate_stream():
-        try:
-            async for chunk in blog_service.generate_content(draft_id, instructions):
-                yield chunk
-        except Exception as e:
-            yield f"\n\nError: {str(e)}"
+    generate = (
+        blog_service.generate_content_parallel
+        if mode == GenerationMode.PARALLEL
+        else blog_service.generate_content
+    )
 
-    return StreamingResponse(generate_stream(), media_type="text/plain")
+    return _start_or_resume(
+        user_id,
+        draft_id,
+        "generate",
+        last_event_id,
+        lambda: text_events(generate(draft_id, instructions)),
+    )
 
 
 @router.post("/{draft_id}/refine")
 async def refine_blog(
     draft_id: str,
     request: BlogRefineRequest,
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
     user_id: str = Depends(get_current_user_id),
 ):
-    """Refine blog draft with feedback (streaming)"""
+    """Refine blog draft with feedback (resumable SSE stream)"""
     draft = await blog_service.get_draft(draft_id)
     if not draft:
         raise HTTPException(status_code=404, detail="Draft not found")
@@ -89,24 +203,29 @@ async def refine_blog(
     if draft.user_id != user_id:
         raise HTTPException(status_code=403, detail="Access denied")
 
-    async def refine_stream():
-        try:
-            async for chunk in blog_service.refine_content(draft_id, request.feedback):
-                yield f"data: {chunk}\n\n"
-        except Exception as e:
-            yield f"data: Error: {str(e)}\n\n"
+    def events():
+        if request.mode == RefineMode.SECTION:
+            return blog_service.refine_sections(draft_id, request.feedback, request.anchors)
+        return text_events(blog_service.refine_content(draft_id, request.feedback))
 
-    return StreamingResponse(refine_stream(), media_type="text/event-stream")
+    return _start_or_resume(user_id, draft_id, "refine", last_event_id, events)
 
 
 @router.get("/{draft_id}/refine")
 async def refine_blog_sse(
     draft_id: str,
     feedback: str = Query(..., description="Feedback for refinement"),
+    mode: RefineMode = Query(RefineMode.FULL, description="Refine the full post or matching sections"),
+    anchors: Optional[List[str]] = Query(None, description="Heading anchors to refine (section mode)"),
     token: Optional[str] = Query(None, description="Auth token for SSE"),
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
     user_id: str = Depends(get_current_user_id),
 ):
-    """Refine blog draft with feedback using SSE (for EventSource compatibility)"""
+    """Refine blog draft with feedback using SSE (for EventSource compatibility).
+
+    EventSource reconnects to the same URL with ``Last-Event-ID`` and picks
+    up the running stream instead of starting a new refinement.
+    """
     draft = await blog_service.get_draft(draft_id)
     if not draft:
         raise HTTPException(status_code=404, detail="Draft not found")
@@ -114,29 +233,12 @@ async def refine_blog_sse(
     if draft.user_id != user_id:
         raise HTTPException(status_code=403, detail="Access denied")
 
-    async def refine_stream_sse():
-        try:
-            async for chunk in blog_service.refine_content(draft_id, feedback):
-                # SSE format: data: {json}\n\n
-                sse_data = json.dumps({"type": "content", "content": chunk})
-                yield f"data: {sse_data}\n\n"
-            
-            # Send done signal
-            done_data = json.dumps({"type": "done"})
-            yield f"data: {done_data}\n\n"
-        except Exception as e:
-            error_data = json.dumps({"type": "error", "message": str(e)})
-            yield f"data: {error_data}\n\n"
+    def events():
+        if mode == RefineMode.SECTION:
+            return blog_service.refine_sections(draft_id, feedback, anchors)
+        return text_events(blog_service.refine_content(draft_id, feedback))
 
-    return StreamingResponse(
-        refine_stream_sse(), 
-        media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "X-Accel-Buffering": "no",
-        }
-    )
+    return _start_or_resume(user_id, draft_id, "refine", last_event_id, events)
 
 
 @router.get("", response_model=List[BlogDraft])
@@ -183,6 +285,89 @@ async def update_draft(
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.get("/{draft_id}/versions", response_model=List[DraftVersionInfo])
+async def list_versions(
+    draft_id: str,
+    user_id: str = Depends(get_current_user_id),
+):
+    """List stored versions of a draft"""
+    draft = await blog_service.get_draft(draft_id)
+    if not draft:
+        raise HTTPException(status_code=404, detail="Draft not found")
+
+    if draft.user_id != user_id:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    return await draft_history_service.list_versions(draft_id)
+
+
+@router.get("/{draft_id}/versions/{version}", response_model=DraftVersion)
+async def get_version(
+    draft_id: str,
+    version: int,
+    user_id: str = Depends(get_current_user_id),
+):
+    """Get the content of a draft version"""
+    draft = await blog_service.get_draft(draft_id)
+    if not draft:
+        raise HTTPException(status_code=404, detail="Draft not found")
+
+    if draft.user_id != user_id:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    draft_version = await draft_history_service.get_version(draft_id, version)
+    if not draft_version:
+        raise HTTPException(status_code=404, detail="Version not found")
+
+    return draft_version
+
+
+@router.get("/{draft_id}/versions/{version}/diff", response_model=DraftVersionDiff)
+async def diff_version(
+    draft_id: str,
+    version: int,
+    against: Optional[int] = Query(None, description="Base version (defaults to the previous one)"),
+    user_id: str = Depends(get_current_user_id),
+):
+    """Unified diff of a draft version against another version"""
+    draft = await blog_service.get_draft(draft_id)
+    if not draft:
+        raise HTTPException(status_code=404, detail="Draft not found")
+
+    if draft.user_id != user_id:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    base = against if against is not None else version - 1
+    diff = await draft_history_service.diff_versions(draft_id, base, version)
+    if not diff:
+        raise HTTPException(status_code=404, detail="Version not found")
+
+    return diff
+
+
+@router.post("/{draft_id}/versions/{version}/restore", response_model=BlogDraft)
+async def restore_version(
+    draft_id: str,
+    version: int,
+    user_id: str = Depends(get_current_user_id),
+):
+    """Restore a previous version (recorded as a new version)"""
+    draft = await blog_service.get_draft(draft_id)
+    if not draft:
+        raise HTTPException(status_code=404, detail="Draft not found")
+
+    if draft.user_id != user_id:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    draft_version = await draft_history_service.get_version(draft_id, version)
+    if not draft_version:
+        raise HTTPException(status_code=404, detail="Version not found")
+
+    return await blog_service.update_draft(
+        draft_id, BlogDraftUpdate(content=draft_version.content)
+    )
+
+
 @router.delete("/{draft_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_draft(
     draft_id: str,
@@ -1,13 +1,25 @@
 """Document API endpoints"""
 
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, BackgroundTasks
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    status,
+    UploadFile,
+    File,
+    BackgroundTasks,
+    Query,
+    Request,
+)
 from backend.models.documents import (
     Document,
     DocumentList,
     DocumentSearch,
     SearchResponse,
+    UploadInitRequest,
+    UploadSession,
 )
-from backend.services.document_service import document_service
+from backend.services.document_service import document_service, UploadConflictError
 from backend.core.security import get_current_user_id
 
 router = APIRouter(prefix="/documents", tags=["Documents"])
@@ -31,6 +43,92 @@ async def upload_document(
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.post("/uploads", response_model=UploadSession, status_code=status.HTTP_201_CREATED)
+async def init_upload(
+    upload: UploadInitRequest,
+    user_id: str = Depends(get_current_user_id),
+):
+    """Start a resumable chunked upload"""
+    try:
+        return await document_service.init_upload(
+            user_id, upload.filename, upload.size, upload.sha256
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/uploads/{upload_id}", response_model=UploadSession)
+async def get_upload(
+    upload_id: str,
+    user_id: str = Depends(get_current_user_id),
+):
+    """Get chunked upload progress (bytes received so far)"""
+    upload = await document_service.get_upload(user_id, upload_id)
+    if not upload:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return upload
+
+
+@router.put("/uploads/{upload_id}", response_model=UploadSession)
+async def append_upload(
+    upload_id: str,
+    request: Request,
+    offset: int = Query(..., ge=0, description="Byte offset of this part (must equal bytes received)"),
+    user_id: str = Depends(get_current_user_id),
+):
+    """Append a part to a chunked upload (raw request body)"""
+    try:
+        upload = await document_service.append_upload(
+            user_id, upload_id, offset, request.stream()
+        )
+    except UploadConflictError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={"message": str(e), "received_bytes": e.expected},
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if not upload:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return upload
+
+
+@router.post("/uploads/{upload_id}/complete", response_model=Document, status_code=status.HTTP_201_CREATED)
+async def complete_upload(
+    upload_id: str,
+    background_tasks: BackgroundTasks,
+    user_id: str = Depends(get_current_user_id),
+):
+    """Finish a chunked upload and start processing"""
+    try:
+        document = await document_service.complete_upload(user_id, upload_id)
+    except UploadConflictError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={"message": str(e), "received_bytes": e.expected},
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if not document:
+        raise HTTPException(status_code=404, detail="Upload not found")
+
+    background_tasks.add_task(document_service.process_document, document.id)
+    return document
+
+
+@router.delete("/uploads/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def abort_upload(
+    upload_id: str,
+    user_id: str = Depends(get_current_user_id),
+):
+    """Cancel a chunked upload"""
+    if not await document_service.abort_upload(user_id, upload_id):
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return None
+
+
 @router.get("", response_model=DocumentList)
 async def list_documents(user_id: str = Depends(get_current_user_id)):
     """List user's documents"""
@@ -117,6 +215,9 @@ async def search_documents(
         query=search_request.query,
         document_ids=search_request.document_ids,
         top_k=search_request.top_k,
+        snippets=search_request.snippets,
+        snippet_size=search_request.snippet_size,
+        rerank=search_request.rerank,
     )
 
     return SearchResponse(results=results, total=len(results))
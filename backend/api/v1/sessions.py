@@ -1,10 +1,12 @@
 """Session API endpoints"""
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from typing import List, Optional
 
 from backend.models.sessions import Session, SessionCreate, SessionList, ChatHistory
 from backend.services.session_service import session_service
+from backend.config import settings
 from backend.core.security import get_current_user_id
 
 router = APIRouter(prefix="/sessions", tags=["Sessions"])
@@ -59,9 +61,12 @@ async def delete_session(
 @router.get("/{session_id}/chat-history", response_model=ChatHistory)
 async def get_chat_history(
     session_id: str,
+    limit: int = Query(settings.CHAT_HISTORY_PAGE_SIZE, ge=1, le=500, description="Page size"),
+    offset: int = Query(0, ge=0, description="Skip this many newest messages"),
+    before: Optional[datetime] = Query(None, description="Only messages sent before this time"),
     user_id: str = Depends(get_current_user_id),
 ):
-    """Get session chat history"""
+    """Get one page of session chat history (newest page by default)"""
     session = await session_service.get_session(session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
@@ -69,5 +74,19 @@ async def get_chat_history(
     if session.user_id != user_id:
         raise HTTPException(status_code=403, detail="Access denied")
 
-    messages = await session_service.get_chat_history(session_id)
-    return ChatHistory(session_id=session_id, messages=messages)
+    messages = await session_service.get_chat_history(
+        session_id, limit=limit, offset=offset, before=before
+    )
+    total = session_service.count_chat_messages(session_id)
+    oldest_index = total - offset - len(messages) if before is None else None
+    has_more = (
+        oldest_index > 0
+        if oldest_index is not None
+        else bool(messages) and len(messages) == limit
+    )
+    return ChatHistory(
+        session_id=session_id,
+        messages=messages,
+        total=total,
+        has_more=has_more,
+    )
@@ -1,21 +1,52 @@
 """WebSocket API for real-time communication"""
 
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, Query
-from typing import Dict, Set
-import json
+from typing import Dict, Optional, Set
 import asyncio
+import contextlib
+import uuid
+import orjson
 
+from backend.config import settings
+from backend.core.database import db
 from backend.core.security import decode_token
 
 router = APIRouter(tags=["WebSocket"])
 
 
 class ConnectionManager:
-    """Manages WebSocket connections"""
+    """Manages WebSocket connections
+
+    Connections belong to one worker process. Every message is delivered to
+    the local connections and published on the ``WS_CHANNEL`` Redis channel;
+    the other workers deliver it to their own connections, so peers in a
+    session see each other whichever worker they landed on.
+    """
 
     def __init__(self):
         # session_id -> Set of WebSocket connections
         self.active_connections: Dict[str, Set[WebSocket]] = {}
+        self.worker_id = uuid.uuid4().hex
+        self._listener: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Start receiving messages published by other workers"""
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        """Stop the subscriber and close local connections so clients reconnect"""
+        if self._listener is not None:
+            self._listener.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._listener
+            self._listener = None
+
+        for connections in list(self.active_connections.values()):
+            for connection in list(connections):
+                with contextlib.suppress(Exception):
+                    await connection.close(code=1012, reason="Server restarting")
+        self.active_connections.clear()
 
     async def connect(self, websocket: WebSocket, session_id: str):
         """Connect a WebSocket to a session"""
@@ -36,32 +67,81 @@ class ConnectionManager:
                 del self.active_connections[session_id]
 
     async def send_message(self, message: dict, session_id: str, exclude: WebSocket = None):
-        """Send message to all connections in a session"""
-        if session_id not in self.active_connections:
-            return
+        """Send message to all connections in a session, on every worker"""
+        # Encode once for every recipient
+        text = orjson.dumps(message).decode()
+        await self._deliver(text, session_id, exclude)
+        self._publish(text, session_id)
 
-        # Send to all connections except the sender
-        for connection in self.active_connections[session_id]:
+    async def broadcast(self, message: dict):
+        """Broadcast message to all connections, on every worker"""
+        text = orjson.dumps(message).decode()
+        await self._deliver_all(text)
+        self._publish(text, None)
+
+    async def _deliver(self, text: str, session_id: str, exclude: WebSocket = None):
+        for connection in list(self.active_connections.get(session_id, ())):
             if connection != exclude:
                 try:
-                    await connection.send_json(message)
+                    await connection.send_text(text)
                 except Exception:
                     # Connection closed, will be cleaned up on next disconnect
                     pass
 
-    async def broadcast(self, message: dict):
-        """Broadcast message to all connections"""
-        for connections in self.active_connections.values():
-            for connection in connections:
+    async def _deliver_all(self, text: str):
+        for connections in list(self.active_connections.values()):
+            for connection in list(connections):
                 try:
-                    await connection.send_json(message)
+                    await connection.send_text(text)
                 except Exception:
                     pass
 
+    def _publish(self, text: str, session_id: Optional[str]):
+        envelope = orjson.dumps({"origin": self.worker_id, "session_id": session_id, "text": text})
+        try:
+            db.redis.publish(settings.WS_CHANNEL, envelope)
+        except Exception as e:
+            # Local delivery already happened; other workers miss this one
+            print(f"⚠️  WebSocket fan-out failed: {e}")
+
+    async def _listen(self):
+        """Deliver messages published by other workers to local connections"""
+        retry_delay = 1.0
+        while True:
+            pubsub = db.async_redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(settings.WS_CHANNEL)
+                retry_delay = 1.0
+                async for message in pubsub.listen():
+                    envelope = orjson.loads(message["data"])
+                    if envelope["origin"] == self.worker_id:
+                        continue
+                    if envelope["session_id"] is None:
+                        await self._deliver_all(envelope["text"])
+                    else:
+                        await self._deliver(envelope["text"], envelope["session_id"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠️  WebSocket fan-out subscriber error (retrying in {retry_delay:.0f}s): {e}")
+                await asyncio.sleep(retry_delay)
+                retry_delay = min(retry_delay * 2, 30.0)
+            finally:
+                with contextlib.suppress(Exception):
+                    await pubsub.aclose()
+
 
 # Global connection manager
 manager = ConnectionManager()
 
+_PONG = '{"type":"pong"}'
+_HEARTBEAT = '{"type":"heartbeat"}'
+
+
+async def send_json(websocket: WebSocket, message: dict):
+    """``send_json`` with orjson encoding"""
+    await websocket.send_text(orjson.dumps(message).decode())
+
 
 @router.websocket("/ws/{session_id}")
 async def websocket_endpoint(
@@ -87,7 +167,7 @@ async def websocket_endpoint(
 
     try:
         # Send initial connection message
-        await websocket.send_json({
+        await send_json(websocket, {
             "type": "connection",
             "status": "connected",
             "session_id": session_id,
@@ -99,11 +179,11 @@ async def websocket_endpoint(
         # Listen for messages
         while True:
             data = await websocket.receive_text()
-            message = json.loads(data)
+            message = orjson.loads(data)
 
             # Handle different message types
             if message.get("type") == "ping":
-                await websocket.send_json({"type": "pong"})
+                await websocket.send_text(_PONG)
 
             elif message.get("type") == "chat":
                 # Broadcast chat message to session
@@ -155,6 +235,6 @@ async def heartbeat(websocket: WebSocket):
     try:
         while True:
             await asyncio.sleep(30)  # 30 seconds
-            await websocket.send_json({"type": "heartbeat"})
+            await websocket.send_text(_HEARTBEAT)
     except Exception:
         pass
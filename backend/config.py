@@ -34,6 +34,10 @@ class Settings(BaseSettings):
     # Server
     HOST: str = "0.0.0.0"
     PORT: int = 8002
+    WORKERS: int = 0  # Worker processes for backend.serve; 0 = one per CPU
+    KEEPALIVE_SECONDS: int = 5
+    SHUTDOWN_TIMEOUT_SECONDS: float = 30.0  # Drain open requests, then background generation
+    WS_CHANNEL: str = "ws:events"  # Redis pub/sub channel for cross-worker WebSocket messages
 
     # CORS
     CORS_ORIGINS: List[str] = Field(
@@ -50,7 +54,18 @@ class Settings(BaseSettings):
 
     # Database URLs
     REDIS_URL: str = "redis://localhost:6379"
+    REDIS_WARM_CONNECTIONS: int = 4  # Pooled connections opened at startup
     ELASTICSEARCH_URL: str = ""  # Optional
+    ES_INDEX_ALIAS: str = "documents"  # Read alias; writers use "<alias>-write"
+    ES_NUMBER_OF_SHARDS: int = 1
+    ES_NUMBER_OF_REPLICAS: int = 1  # Restored after bulk loads, which run with 0
+    ES_REFRESH_INTERVAL: str = "1s"  # Restored after bulk loads, which run with -1
+    ES_INDEX_RETAIN: int = 1  # Previous index versions kept for rollback
+    ES_AUTO_MIGRATE: bool = True  # Migrate outdated index schemas on startup
+    ES_TENANT_INDEX_MIN_CHUNKS: int = 50000  # Tenants this large get their own index
+
+    # Startup warm-up (connections, indices, heavy imports, caches); /ready waits for it
+    WARMUP_TIMEOUT_SECONDS: float = 30.0  # Per component
 
     # LLM Configuration
     OPENAI_API_KEY: str = ""
@@ -58,17 +73,115 @@ class Settings(BaseSettings):
     DEFAULT_LLM_PROVIDER: str = "openai"
     DEFAULT_LLM_MODEL: str = "gpt-4o-mini"
 
+    # Streamed LLM deltas are merged for up to this long / this many bytes per
+    # write; the first token is always sent at once. 0 ms disables coalescing.
+    STREAM_COALESCE_MS: int = 25
+    STREAM_COALESCE_BYTES: int = 1024
+    # Stream events are kept this long so a client can resume with Last-Event-ID
+    STREAM_REPLAY_TTL_SECONDS: int = 600
+    STREAM_RETRY_MS: int = 2000  # EventSource reconnection delay
+    STREAM_POLL_SECONDS: float = 0.25  # Replay polling for streams run by another process
+
     # Upload Configuration
     MAX_UPLOAD_SIZE: int = 50 * 1024 * 1024  # 50MB
     ALLOWED_EXTENSIONS: List[str] = Field(
         default=[".pdf", ".mp3", ".wav", ".png", ".jpg", ".jpeg", ".md"]
     )
     UPLOAD_DIR: str = "./data/uploads"
+    UPLOAD_CHUNK_SIZE: int = 8 * 1024 * 1024  # Suggested part size for chunked uploads
+    UPLOAD_SESSION_TTL_SECONDS: int = 60 * 60 * 24  # Abandoned chunked uploads expire
 
     # RAG Configuration
     CHUNK_SIZE: int = 1000
     CHUNK_OVERLAP: int = 200
     TOP_K_RESULTS: int = 5
+    SNIPPET_SIZE: int = 400  # Characters per search snippet
+    CONTEXT_SNIPPETS: int = 2  # Passages per chunk in prompt context; 0 = whole chunks
+
+    # Optional second-stage rerank of retrieved chunks
+    RERANK_ENABLED: bool = False
+    RERANK_SCORER: str = "lexical"  # Built-in name or "module:function"
+    RERANK_CANDIDATES: int = 30  # First-stage hits fetched for rescoring
+    RERANK_BATCH_SIZE: int = 16
+    RERANK_TIMEOUT_MS: int = 300  # Budget before falling back to first-stage order
+    RERANK_CACHE_SIZE: int = 10000  # Cached (query, chunk) scores
+
+    # Embeddings, cached in memory and in a memory-mapped float16 store on disk
+    EMBEDDINGS_ENABLED: bool = False  # Embed chunks when documents are processed
+    EMBEDDING_PROVIDER: str = "openai"  # "openai", "hashing" (offline) or "module:Class"
+    EMBEDDING_MODEL: str = "text-embedding-3-small"
+    EMBEDDING_DIM: int = 512
+    EMBEDDING_BATCH_SIZE: int = 64  # Texts per embedding request
+    EMBEDDING_CACHE_DIR: str = "./data/embedding_cache"
+    EMBEDDING_CACHE_MAX_MB: int = 512  # Oldest segments are evicted past this
+    EMBEDDING_SEGMENT_ROWS: int = 16384  # Vectors per on-disk segment
+    EMBEDDING_MEMORY_ITEMS: int = 20000  # Vectors kept in the in-memory LRU
+
+    # OCR (images and scanned PDF pages)
+    OCR_ENABLED: bool = True
+    OCR_ENGINE: str = "tesseract"  # Built-in name or "module:function"
+    OCR_LANGUAGES: str = "eng"
+    OCR_MAX_WORKERS: int = 2  # 0 = one per CPU
+    OCR_MAX_IMAGE_SIDE: int = 2000  # Downscale before recognition
+    OCR_PDF_DPI: int = 200
+    OCR_CACHE_DIR: str = "./data/ocr_cache"
+
+    # Parsed PDF layouts, keyed by content hash, so re-chunking skips parsing
+    PDF_LAYOUT_CACHE_DIR: str = "./data/layout_cache"
+
+    # Extracted text kept apart from chunks, so re-chunking never re-extracts
+    EXTRACTION_DIR: str = "./data/extracted"
+    REINDEX_CONCURRENCY: int = 8
+
+    # Audio transcription (local, CPU only)
+    TRANSCRIPTION_ENABLED: bool = True
+    TRANSCRIPTION_ENGINE: str = "faster_whisper"  # Built-in name or "module:function"
+    TRANSCRIPTION_MODEL: str = "base"
+    TRANSCRIPTION_LANGUAGE: str = ""  # Empty = auto-detect
+    TRANSCRIPTION_MAX_WORKERS: int = 0  # 0 = one per CPU
+    TRANSCRIPTION_WINDOW_SECONDS: int = 30
+
+    # Batch Generation
+    BATCH_MAX_ITEMS: int = 50
+    BATCH_MAX_CONCURRENCY: int = 4
+    BATCH_RESULT_TTL_SECONDS: int = 60 * 60 * 24  # 24 hours
+
+    # Parallel Section Generation
+    GENERATION_MAX_SECTIONS: int = 8
+    GENERATION_SECTION_CONCURRENCY: int = 4
+    GENERATION_SECTION_MAX_TOKENS: int = 1200
+
+    # Chat History Storage
+    CHAT_HISTORY_MAX_MESSAGES: int = 500  # Hot messages kept in Redis per session
+    CHAT_ARCHIVE_BATCH: int = 100  # Messages moved to cold storage at a time
+    CHAT_ARCHIVE_DIR: str = "./data/chat_archive"
+    CHAT_HISTORY_PAGE_SIZE: int = 50
+
+    # Agent Session History
+    AGENT_HISTORY_WINDOW: int = 12  # Messages sent verbatim each turn
+    AGENT_HISTORY_MAX_CHARS: int = 12000  # Cap on verbatim history per turn
+    AGENT_HISTORY_SUMMARY_BATCH: int = 8  # Summarize once this many messages leave the window
+    AGENT_HISTORY_CACHE_SESSIONS: int = 256  # Hot sessions kept in process
+    AGENT_SUMMARY_MAX_CHARS: int = 2000
+
+    # Draft History
+    DRAFT_SNAPSHOT_INTERVAL: int = 10  # Full snapshot every N versions
+
+    # Redis garbage collection (orphaned keys, abandoned and failed artifacts)
+    GC_INTERVAL_SECONDS: int = 6 * 60 * 60  # Background run interval; 0 disables
+    GC_SCAN_COUNT: int = 500  # Keys per SCAN/SSCAN step
+    GC_DELETE_BATCH: int = 100  # Keys per UNLINK
+    GC_PAUSE_MS: int = 5  # Pause between SCAN steps so other clients are served
+    GC_STALE_MINUTES: int = 120  # Generation/processing running longer was abandoned
+    GC_FAILED_TTL_DAYS: int = 7  # Failed documents and drafts are deleted after this; 0 keeps them
+    GC_EMPTY_DRAFT_TTL_DAYS: int = 30  # Drafts never written to are deleted after this; 0 keeps them
+
+    # Tiered storage: idle chunk content and draft bodies move from Redis to disk
+    COLD_STORE_PATH: str = "./data/cold/cold.sqlite3"  # Every API worker must run on this host
+    TIER_INTERVAL_SECONDS: int = 6 * 60 * 60  # Background run interval; 0 disables
+    TIER_AFTER_DAYS: int = 30  # Untouched this long moves to disk; 0 disables age-based moves
+    TIER_HOT_MAX_MB: int = 0  # Budget for chunk content and draft bodies in Redis; 0 = unbounded
+    TIER_TOUCH_SECONDS: int = 60 * 60  # accessed_at is rewritten at most this often per object
 
     # GitHub Integration
     GITHUB_CLIENT_ID: str = ""
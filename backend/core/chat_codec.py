@@ -0,0 +1,53 @@
+"""Compact encoding for chat messages stored in Redis"""
+
+from datetime import datetime, timedelta
+from typing import Optional
+
+import orjson
+
+
+_EPOCH = datetime(1970, 1, 1)
+_ROLE_CODES = {"user": "u", "assistant": "a", "system": "s"}
+_CODE_ROLES = {code: role for role, code in _ROLE_CODES.items()}
+
+
+def to_epoch_ms(timestamp: datetime) -> int:
+    """Naive UTC datetime to epoch milliseconds"""
+    return int((timestamp - _EPOCH) / timedelta(milliseconds=1))
+
+
+def from_epoch_ms(value: int) -> datetime:
+    """Epoch milliseconds to naive UTC datetime"""
+    return _EPOCH + timedelta(milliseconds=value)
+
+
+def encode_message(role: str, content: str, timestamp: Optional[datetime] = None) -> str:
+    """Encode a message as ``[role code, epoch ms, content]``.
+
+    Roughly half the size of the previous ``{"role", "content", "timestamp"}``
+    objects for short messages.
+    """
+    return orjson.dumps(
+        [
+            _ROLE_CODES.get(role, role),
+            to_epoch_ms(timestamp or datetime.utcnow()),
+            content,
+        ]
+    ).decode()
+
+
+def decode_message(raw: str) -> dict:
+    """Decode a stored message (compact or legacy object form)"""
+    data = orjson.loads(raw)
+    if isinstance(data, dict):
+        return {
+            "role": data["role"],
+            "content": data["content"],
+            "timestamp": datetime.fromisoformat(data["timestamp"]),
+        }
+    role, epoch_ms, content = data
+    return {
+        "role": _CODE_ROLES.get(role, role),
+        "content": content,
+        "timestamp": from_epoch_ms(epoch_ms),
+    }
@@ -0,0 +1,69 @@
+"""Packed, compressed storage for a document's chunks
+
+A document's chunks are stored as one Redis string instead of one hash field
+per chunk::
+
+    b"CZ1" | uint32 count | count x uint32 chunk byte lengths | zstd frame
+
+The zstd frame holds the UTF-8 chunks back to back. Neighbouring chunks
+overlap by CHUNK_OVERLAP characters, which the compressor removes almost
+entirely. The length table locates each chunk in the decompressed text, so
+readers that only need the first chunks stop decompressing early.
+"""
+
+import struct
+from typing import Iterator, List
+
+import zstandard
+
+MAGIC = b"CZ1"
+_COUNT = struct.Struct("<I")
+_LEVEL = 9  # written once per processing run, read far more often
+
+
+def encode_chunks(chunks: List[str]) -> bytes:
+    """Pack chunks into a single compressed blob"""
+    encoded = [chunk.encode("utf-8") for chunk in chunks]
+    table = struct.pack(f"<{len(encoded)}I", *(len(chunk) for chunk in encoded))
+    frame = zstandard.ZstdCompressor(level=_LEVEL).compress(b"".join(encoded))
+    return MAGIC + _COUNT.pack(len(encoded)) + table + frame
+
+
+def _header(blob: bytes):
+    if blob[: len(MAGIC)] != MAGIC:
+        raise ValueError("Not a packed chunk blob")
+    (count,) = _COUNT.unpack_from(blob, len(MAGIC))
+    start = len(MAGIC) + _COUNT.size
+    lengths = struct.unpack_from(f"<{count}I", blob, start)
+    return lengths, start + 4 * count
+
+
+def chunk_count(blob: bytes) -> int:
+    """Number of chunks, read from the header without decompressing"""
+    return len(_header(blob)[0])
+
+
+def decode_chunks(blob: bytes) -> List[str]:
+    """Unpack every chunk"""
+    lengths, start = _header(blob)
+    data = memoryview(zstandard.ZstdDecompressor().decompress(blob[start:]))
+    chunks = []
+    offset = 0
+    for length in lengths:
+        chunks.append(str(data[offset : offset + length], "utf-8"))
+        offset += length
+    return chunks
+
+
+def iter_chunks(blob: bytes) -> Iterator[str]:
+    """Yield chunks in order, decompressing only as far as the caller reads"""
+    lengths, start = _header(blob)
+    with zstandard.ZstdDecompressor().stream_reader(blob[start:]) as reader:
+        for length in lengths:
+            data = b""
+            while len(data) < length:
+                block = reader.read(length - len(data))
+                if not block:
+                    raise ValueError("Packed chunk blob is truncated")
+                data += block
+            yield data.decode("utf-8")
@@ -0,0 +1,162 @@
+"""Micro-batching of streamed LLM deltas before they hit the wire"""
+
+import asyncio
+import contextlib
+from collections import deque
+from typing import AsyncIterator, Callable, Deque, Hashable, List, Optional, TypeVar, Union
+
+from backend.config import settings
+
+
+T = TypeVar("T")
+
+
+async def _coalesce(
+    source: AsyncIterator[T],
+    key: Callable[[T], Optional[Hashable]],
+    text: Callable[[T], str],
+    build: Callable[[T, str], T],
+    max_delay_ms: Optional[float],
+    max_bytes: Optional[int],
+) -> AsyncIterator[T]:
+    """Merge consecutive items with the same non-None ``key``.
+
+    The first mergeable item goes out at once (time to first token); after
+    that, merged items are held until ``max_delay_ms`` has passed since the
+    oldest one arrived or ``max_bytes`` of text has built up. Items whose key
+    is None flush the buffer and pass through unchanged.
+    """
+    delay = (settings.STREAM_COALESCE_MS if max_delay_ms is None else max_delay_ms) / 1000
+    limit = settings.STREAM_COALESCE_BYTES if max_bytes is None else max_bytes
+    if delay <= 0:
+        async for item in source:
+            yield item
+        return
+
+    # A pump task reads the source into the open group; this generator only
+    # wakes when something is due, so there is no per-delta future or task.
+    loop = asyncio.get_running_loop()
+    outbox: Deque[T] = deque()
+    buffer: List[str] = []
+    head: Optional[T] = None
+    head_key: Optional[Hashable] = None
+    size = 0
+    timer: Optional[asyncio.TimerHandle] = None
+    wake: Optional[asyncio.Future] = None
+    finished = False
+    error: Optional[BaseException] = None
+
+    def signal():
+        if wake is not None and not wake.done():
+            wake.set_result(None)
+
+    def close_group():
+        nonlocal head, head_key, size, timer
+        if buffer:
+            outbox.append(build(head, "".join(buffer)))
+            buffer.clear()
+            head, head_key, size = None, None, 0
+            signal()
+        if timer is not None:
+            timer.cancel()
+            timer = None
+
+    async def pump():
+        nonlocal head, head_key, size, timer, finished, error
+        started = False
+        try:
+            async for item in source:
+                item_key = key(item)
+                if item_key is None:
+                    close_group()
+                    outbox.append(item)
+                    signal()
+                    continue
+                if not started:
+                    started = True
+                    outbox.append(item)
+                    signal()
+                    continue
+                if buffer and item_key != head_key:
+                    close_group()
+                chunk = text(item)
+                if not buffer:
+                    head, head_key = item, item_key
+                    timer = loop.call_later(delay, close_group)
+                buffer.append(chunk)
+                size += len(chunk) if chunk.isascii() else len(chunk.encode("utf-8"))
+                if size >= limit:
+                    close_group()
+        except Exception as e:
+            error = e
+        finally:
+            # Deliver what was generated, even before a failure
+            close_group()
+            finished = True
+            signal()
+
+    task = asyncio.create_task(pump())
+    try:
+        while True:
+            while outbox:
+                yield outbox.popleft()
+            if finished:
+                break
+            wake = loop.create_future()
+            await wake
+        if error is not None:
+            raise error
+    finally:
+        if not task.done():
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        if timer is not None:
+            timer.cancel()
+        aclose = getattr(source, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+
+def coalesce_text(
+    deltas: AsyncIterator[str],
+    max_delay_ms: Optional[float] = None,
+    max_bytes: Optional[int] = None,
+) -> AsyncIterator[str]:
+    """Coalesce a stream of text deltas (see ``STREAM_COALESCE_*``)"""
+    return _coalesce(
+        deltas,
+        key=lambda delta: True,
+        text=lambda delta: delta,
+        build=lambda head, joined: joined,
+        max_delay_ms=max_delay_ms,
+        max_bytes=max_bytes,
+    )
+
+
+def _event_key(event: Union[str, dict]) -> Optional[Hashable]:
+    if isinstance(event, str):
+        return ("content", None)
+    return ("content", event.get("anchor")) if event.get("type") == "content" else None
+
+
+def coalesce_events(
+    events: AsyncIterator[Union[str, dict]],
+    max_delay_ms: Optional[float] = None,
+    max_bytes: Optional[int] = None,
+) -> AsyncIterator[Union[str, dict]]:
+    """Coalesce consecutive ``content`` events of the same section.
+
+    A bare ``str`` is a content delta with no anchor (see
+    ``stream_service.text_events``) and stays a ``str`` when merged. Every
+    other event (plan, section boundaries, done) passes through in order and
+    flushes pending content first.
+    """
+    return _coalesce(
+        events,
+        key=_event_key,
+        text=lambda event: event if isinstance(event, str) else event["content"],
+        build=lambda head, joined: joined if isinstance(head, str) else {**head, "content": joined},
+        max_delay_ms=max_delay_ms,
+        max_bytes=max_bytes,
+    )
@@ -0,0 +1,123 @@
+"""On-disk store for values moved out of Redis (SQLite, one file per host)"""
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from backend.config import settings
+
+
+class ColdStore:
+    """Key/blob table for data that is rarely read.
+
+    Keys mirror the Redis key the value was moved from (for example
+    ``document:{id}:content``). Worker processes on one host share the
+    file: WAL mode lets readers run alongside a writer, and a busy timeout
+    covers two writers meeting. One connection per process, shared by
+    threads under a lock.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self._path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    @property
+    def path(self) -> Path:
+        return Path(self._path or settings.COLD_STORE_PATH)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cold ("
+                " key TEXT PRIMARY KEY, value BLOB NOT NULL, stored_at REAL NOT NULL)"
+            )
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> Optional[bytes]:
+        row = self.get_row(key)
+        return row[0] if row else None
+
+    def get_row(self, key: str) -> Optional[Tuple[bytes, float]]:
+        """``(value, stored_at)``; ``stored_at`` identifies this copy for ``delete_rows``"""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT value, stored_at FROM cold WHERE key = ?", (key,)
+            ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def put(self, key: str, value: bytes) -> float:
+        """Store ``value``, replacing any older copy; returns its ``stored_at``"""
+        stored_at = time.time()
+        with self._lock:
+            self._connect().execute(
+                "INSERT OR REPLACE INTO cold (key, value, stored_at) VALUES (?, ?, ?)",
+                (key, value, stored_at),
+            )
+        return stored_at
+
+    def delete(self, keys: Iterable[str]) -> int:
+        keys = list(keys)
+        if not keys:
+            return 0
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("BEGIN")
+                return sum(
+                    conn.execute("DELETE FROM cold WHERE key = ?", (key,)).rowcount for key in keys
+                )
+
+    def delete_rows(self, rows: Iterable[Tuple[str, float]]) -> int:
+        """Delete specific copies; a key stored again since is left alone"""
+        rows = list(rows)
+        if not rows:
+            return 0
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("BEGIN")
+                return sum(
+                    conn.execute(
+                        "DELETE FROM cold WHERE key = ? AND stored_at = ?", row
+                    ).rowcount
+                    for row in rows
+                )
+
+    def scan(self, older_than: float, batch: int = 500) -> Iterator[List[Tuple[str, float]]]:
+        """Pages of ``(key, stored_at)`` for rows stored before ``older_than``"""
+        last = ""
+        while True:
+            with self._lock:
+                rows = self._connect().execute(
+                    "SELECT key, stored_at FROM cold WHERE key > ? AND stored_at < ? ORDER BY key LIMIT ?",
+                    (last, older_than, batch),
+                ).fetchall()
+            if not rows:
+                return
+            yield rows
+            last = rows[-1][0]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            count, size = self._connect().execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(value)), 0) FROM cold"
+            ).fetchone()
+        return {"rows": count, "bytes": size}
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# Global cold store instance
+cold_store = ColdStore()
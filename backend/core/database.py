@@ -1,9 +1,11 @@
 """Database connections and utilities"""
 
-import asyncio
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 from redis import Redis
-from elasticsearch import AsyncElasticsearch
+
+if TYPE_CHECKING:  # elasticsearch (and aiohttp) load on first use
+    from elasticsearch import AsyncElasticsearch
+    from redis.asyncio import Redis as AsyncRedis
 
 from backend.config import settings
 
@@ -13,7 +15,9 @@ class DatabaseManager:
 
     def __init__(self):
         self._redis: Optional[Redis] = None
-        self._elasticsearch: Optional[AsyncElasticsearch] = None
+        self._raw_redis: Optional[Redis] = None
+        self._async_redis: Optional["AsyncRedis"] = None
+        self._elasticsearch: Optional["AsyncElasticsearch"] = None
 
     @property
     def redis(self) -> Redis:
@@ -26,10 +30,31 @@ class DatabaseManager:
         return self._redis
 
     @property
-    def elasticsearch(self) -> Optional[AsyncElasticsearch]:
+    def raw_redis(self) -> Redis:
+        """Get Redis client that returns bytes (for compressed values)"""
+        if self._raw_redis is None:
+            self._raw_redis = Redis.from_url(settings.REDIS_URL)
+        return self._raw_redis
+
+    @property
+    def async_redis(self) -> "AsyncRedis":
+        """Get asyncio Redis client (for long-lived reads such as pub/sub)"""
+        if self._async_redis is None:
+            from redis.asyncio import Redis as AsyncRedis
+
+            self._async_redis = AsyncRedis.from_url(
+                settings.REDIS_URL,
+                decode_responses=True,
+            )
+        return self._async_redis
+
+    @property
+    def elasticsearch(self) -> Optional["AsyncElasticsearch"]:
         """Get Elasticsearch client (optional)"""
         if self._elasticsearch is None and settings.ELASTICSEARCH_URL:
             try:
+                from elasticsearch import AsyncElasticsearch
+
                 self._elasticsearch = AsyncElasticsearch(
                     [settings.ELASTICSEARCH_URL],
                     verify_certs=False,
@@ -62,12 +87,23 @@ class DatabaseManager:
 
         return health
 
-    def close(self):
-        """Close all database connections"""
-        if self._redis:
+    async def close(self):
+        """Close all database connections, waiting for the async clients"""
+        if self._elasticsearch is not None:
+            try:
+                await self._elasticsearch.close()
+            except Exception as e:
+                print(f"⚠️  ElasticSearch close failed: {e}")
+            self._elasticsearch = None
+        if self._async_redis is not None:
+            await self._async_redis.aclose()
+            self._async_redis = None
+        if self._redis is not None:
             self._redis.close()
-        if self._elasticsearch:
-            asyncio.create_task(self._elasticsearch.close())
+            self._redis = None
+        if self._raw_redis is not None:
+            self._raw_redis.close()
+            self._raw_redis = None
 
 
 # Global database manager instance
@@ -0,0 +1,182 @@
+"""Markdown section tree utilities for section-scoped editing"""
+
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+HEADING_RE = re.compile(r"^(#{1,6})[ \t]+(.+?)[ \t]*#*[ \t]*$")
+FENCE_RE = re.compile(r"^[ \t]*(```|~~~)")
+WORD_RE = re.compile(r"[\w']+")
+QUOTE_RE = re.compile(r"[\"“']([^\"”']{8,})[\"”']")
+
+PREAMBLE_ANCHOR = "_preamble"
+
+_STOPWORDS = {
+    "about", "after", "also", "and", "section", "paragraph", "part", "please",
+    "make", "more", "less", "should", "that", "the", "this", "with", "into",
+    "from", "your", "there", "their", "then", "than", "some", "rewrite",
+    # Words that name the whole post, not one section of it
+    "post", "posts", "blog", "article", "draft", "text", "content", "heading",
+}
+
+
+@dataclass
+class Section:
+    """A heading and the lines it owns.
+
+    ``start``/``end`` cover the heading line and its own body (up to the next
+    heading of any level); ``subtree_end`` extends to the end of nested
+    subsections. Line numbers index ``markdown.splitlines(keepends=True)``.
+    """
+
+    anchor: str
+    title: str
+    level: int
+    start: int
+    end: int
+    subtree_end: int
+    parent: Optional[str] = None
+
+
+def slugify(title: str) -> str:
+    """GitHub-style heading anchor"""
+    slug = re.sub(r"[^\w\- ]", "", title.strip().lower())
+    return re.sub(r"\s+", "-", slug).strip("-") or "section"
+
+
+def parse_sections(markdown: str) -> List[Section]:
+    """Parse ATX headings (ignoring fenced code) into a flat, ordered section list"""
+    lines = markdown.splitlines(keepends=True)
+    headings: List[Tuple[int, int, str]] = []
+    in_fence = False
+    for index, line in enumerate(lines):
+        if FENCE_RE.match(line):
+            in_fence = not in_fence
+            continue
+        if in_fence:
+            continue
+        match = HEADING_RE.match(line.rstrip("\r\n"))
+        if match:
+            headings.append((index, len(match.group(1)), match.group(2)))
+
+    sections: List[Section] = []
+    first_heading = headings[0][0] if headings else len(lines)
+    if "".join(lines[:first_heading]).strip():
+        sections.append(
+            Section(PREAMBLE_ANCHOR, "", 0, 0, first_heading, first_heading)
+        )
+
+    seen: Dict[str, int] = {}
+    stack: List[Section] = []
+    for position, (start, level, title) in enumerate(headings):
+        end = headings[position + 1][0] if position + 1 < len(headings) else len(lines)
+
+        anchor = slugify(title)
+        if anchor in seen:
+            seen[anchor] += 1
+            anchor = f"{anchor}-{seen[anchor]}"
+        else:
+            seen[anchor] = 0
+
+        subtree_end = len(lines)
+        for next_start, next_level, _ in headings[position + 1:]:
+            if next_level <= level:
+                subtree_end = next_start
+                break
+
+        while stack and stack[-1].level >= level:
+            stack.pop()
+        section = Section(
+            anchor,
+            title,
+            level,
+            start,
+            end,
+            subtree_end,
+            parent=stack[-1].anchor if stack else None,
+        )
+        sections.append(section)
+        stack.append(section)
+
+    return sections
+
+
+def _keywords(text: str) -> set:
+    words = (word.strip("'") for word in WORD_RE.findall(text.lower()))
+    words = (word[:-2] if word.endswith("'s") else word for word in words)
+    return {word for word in words if len(word) > 3 and word not in _STOPWORDS}
+
+
+def _contains_phrase(text: str, phrase: str) -> bool:
+    """Whole-word occurrence of ``phrase`` in ``text``"""
+    return re.search(rf"(?<!\w){re.escape(phrase)}(?!\w)", text) is not None
+
+
+def select_sections(
+    markdown: str,
+    sections: List[Section],
+    feedback: str,
+    anchors: Optional[Iterable[str]] = None,
+) -> List[Section]:
+    """Pick the sections a refinement should touch.
+
+    Explicit ``anchors`` (slugs or heading titles) win. Otherwise a section
+    matches when the feedback quotes text from it or mentions whole words
+    from its heading (words naming the post itself, such as "post", do not
+    count). Nested matches collapse into their outermost ancestor.
+    An empty result means nothing matched.
+    """
+    selected: List[Section] = []
+    if anchors:
+        wanted = {slugify(anchor) for anchor in anchors} | set(anchors)
+        selected = [s for s in sections if s.anchor in wanted]
+    else:
+        lines = markdown.splitlines(keepends=True)
+        quotes = [quote.strip().lower() for quote in QUOTE_RE.findall(feedback)]
+        feedback_words = _keywords(feedback)
+        for section in sections:
+            body = "".join(lines[section.start:section.end]).lower()
+            if any(_contains_phrase(body, quote) for quote in quotes):
+                selected.append(section)
+            elif section.title and _keywords(section.title) & feedback_words:
+                selected.append(section)
+
+    # Drop sections already covered by a selected ancestor's subtree
+    result: List[Section] = []
+    for section in sorted(selected, key=lambda s: (s.start, -s.subtree_end)):
+        if result and section.start < result[-1].subtree_end:
+            continue
+        result.append(section)
+    return result
+
+
+def section_text(markdown: str, section: Section) -> str:
+    """Full text of a section including nested subsections"""
+    lines = markdown.splitlines(keepends=True)
+    return "".join(lines[section.start:section.subtree_end])
+
+
+def splice_sections(
+    markdown: str,
+    replacements: List[Tuple[Section, str]],
+) -> str:
+    """Replace section subtrees with new text, keeping surrounding whitespace"""
+    lines = markdown.splitlines(keepends=True)
+    parts: List[str] = []
+    cursor = 0
+    for section, text in sorted(replacements, key=lambda item: item[0].start):
+        original = "".join(lines[section.start:section.subtree_end])
+        trailing = original[len(original.rstrip()):]
+        parts.extend(lines[cursor:section.start])
+        parts.append(text.strip() + (trailing or "\n"))
+        cursor = section.subtree_end
+    parts.extend(lines[cursor:])
+    return "".join(parts)
+
+
+def outline(sections: List[Section]) -> str:
+    """Heading outline used to give the model whole-post context cheaply"""
+    return "\n".join(
+        f"{'#' * s.level} {s.title}" for s in sections if s.level > 0
+    )
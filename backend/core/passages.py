@@ -0,0 +1,97 @@
+"""Query-time passage extraction for search snippets"""
+
+import re
+from dataclasses import dataclass
+from typing import List
+
+
+TERM_RE = re.compile(r"\w{2,}")
+
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "how", "in",
+    "is", "it", "of", "on", "or", "that", "the", "this", "to", "was", "what",
+    "when", "where", "which", "who", "why", "with",
+}
+
+
+@dataclass
+class Passage:
+    """A window of a chunk; ``start``/``end`` are character offsets into it"""
+
+    text: str
+    start: int
+    end: int
+    score: float
+
+
+def query_terms(query: str) -> List[str]:
+    """Distinct lowercase query terms without stopwords"""
+    terms = []
+    for term in TERM_RE.findall(query.lower()):
+        if term not in _STOPWORDS and term not in terms:
+            terms.append(term)
+    return terms
+
+
+def _snap(text: str, start: int, end: int) -> tuple:
+    """Pull window edges in to the nearest word boundary"""
+    if start > 0:
+        space = text.find(" ", start, min(len(text), start + 40))
+        start = space + 1 if space != -1 else start
+    if end < len(text):
+        space = text.rfind(" ", max(start, end - 40), end)
+        end = space if space > start else end
+    return start, end
+
+
+def best_passages(text: str, query: str, size: int, count: int) -> List[Passage]:
+    """The ``count`` best non-overlapping windows of about ``size`` chars.
+
+    Windows are anchored shortly before each query-term match and scored by
+    distinct terms covered (weighted) plus total matches. Returned in text
+    order. Without any match the leading window is returned with score 0.
+    """
+    terms = query_terms(query)
+    lowered = text.lower()
+    matches = []
+    if terms:
+        pattern = re.compile("|".join(rf"\b{re.escape(term)}" for term in terms))
+        matches = [(m.start(), m.group(0)) for m in pattern.finditer(lowered)]
+
+    if len(text) <= size:
+        found = [term for _, term in matches]
+        return [Passage(text, 0, len(text), 2.0 * len(set(found)) + len(found))]
+    if not matches:
+        start, end = _snap(text, 0, size)
+        return [Passage(text[start:end].strip(), start, end, 0.0)]
+
+    lead = size // 4
+    candidates = []
+    right = 0
+    for left, (position, _) in enumerate(matches):
+        start = max(0, min(position - lead, len(text) - size))
+        end = start + size
+        # Two pointers over the sorted match positions inside [start, end)
+        right = max(right, left)
+        while right < len(matches) and matches[right][0] < end:
+            right += 1
+        first = left
+        while first > 0 and matches[first - 1][0] >= start:
+            first -= 1
+        inside = [term for pos, term in matches[first:right]]
+        score = 2.0 * len(set(inside)) + len(inside)
+        candidates.append((score, start, end))
+
+    candidates.sort(key=lambda item: (-item[0], item[1]))
+    chosen: List[Passage] = []
+    for score, start, end in candidates:
+        if any(start < passage.end and passage.start < end for passage in chosen):
+            continue
+        snapped_start, snapped_end = _snap(text, start, end)
+        chosen.append(
+            Passage(text[snapped_start:snapped_end].strip(), snapped_start, snapped_end, score)
+        )
+        if len(chosen) == count:
+            break
+    chosen.sort(key=lambda passage: passage.start)
+    return chosen
@@ -0,0 +1,300 @@
+"""Structure-aware PDF layout extraction and chunking"""
+
+import json
+import os
+import re
+import zlib
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+# Bump when extraction or classification changes so cached layouts are re-parsed
+LAYOUT_VERSION = 1
+
+BULLET_RE = re.compile(r"^\s*(?:[•◦▪▫‣∙·\-\*–]|\(?\d{1,3}[.)]|\(?[a-zA-Z][.)])\s+")
+
+_HEADING_SIZE_RATIO = 1.15
+_HEADING_MAX_CHARS = 200
+_HEADING_MAX_LINES = 3
+_BOLD_FLAG = 16
+
+
+@dataclass
+class Block:
+    """One structural unit of a page.
+
+    ``kind`` is ``heading``, ``list``, ``table`` or ``text``; ``level`` is
+    the heading depth (1 = largest font) and 0 for everything else.
+    """
+
+    kind: str
+    text: str
+    page: int
+    level: int = 0
+
+
+@dataclass
+class RawBlock:
+    """A text block before classification, with its dominant font"""
+
+    lines: List[str]
+    page: int
+    size: Optional[float] = None  # None for OCR text, which has no font info
+    bold: bool = False
+    table: bool = False
+
+
+def _inside(bbox: Tuple[float, ...], rect: Tuple[float, ...]) -> bool:
+    x0, y0, x1, y1 = bbox
+    cx, cy = (x0 + x1) / 2, (y0 + y1) / 2
+    return rect[0] <= cx <= rect[2] and rect[1] <= cy <= rect[3]
+
+
+def extract_page(page, page_number: int) -> List[RawBlock]:
+    """Text blocks and tables of a PyMuPDF page in reading order"""
+    items: List[Tuple[float, float, RawBlock]] = []
+
+    tables = []
+    try:
+        tables = list(page.find_tables().tables)
+    except Exception:  # Older PyMuPDF or unparsable page graphics
+        tables = []
+    table_rects = [tuple(table.bbox) for table in tables]
+    for table, rect in zip(tables, table_rects, strict=True):
+        rows = [
+            " | ".join((cell or "").replace("\n", " ").strip() for cell in row)
+            for row in table.extract()
+        ]
+        rows = [row for row in rows if row.strip(" |")]
+        if rows:
+            items.append((rect[1], rect[0], RawBlock(rows, page_number, table=True)))
+
+    for block in page.get_text("dict", sort=True).get("blocks", []):
+        if block.get("type") != 0:
+            continue
+        bbox = tuple(block["bbox"])
+        if any(_inside(bbox, rect) for rect in table_rects):
+            continue
+        lines: List[str] = []
+        sizes: Counter = Counter()
+        bold = True
+        for line in block.get("lines", []):
+            spans = [span for span in line.get("spans", []) if span["text"].strip()]
+            if not spans:
+                continue
+            lines.append("".join(span["text"] for span in line["spans"]).strip())
+            for span in spans:
+                sizes[round(span["size"] * 2) / 2] += len(span["text"])
+                bold = bold and bool(span["flags"] & _BOLD_FLAG)
+        if lines:
+            size = sizes.most_common(1)[0][0]
+            items.append((bbox[1], bbox[0], RawBlock(lines, page_number, size, bold)))
+
+    items.sort(key=lambda item: (item[0], item[1]))
+    return [block for _, _, block in items]
+
+
+def ocr_blocks(text: str, page_number: int) -> List[RawBlock]:
+    """Paragraph blocks for OCR output of a scanned page"""
+    blocks = []
+    for paragraph in re.split(r"\n\s*\n", text):
+        lines = [line.strip() for line in paragraph.splitlines() if line.strip()]
+        if lines:
+            blocks.append(RawBlock(lines, page_number))
+    return blocks
+
+
+def _join_lines(lines: List[str]) -> str:
+    text = ""
+    for line in lines:
+        if text.endswith("-") and line[:1].islower():
+            text = text[:-1] + line
+        else:
+            text = f"{text} {line}" if text else line
+    return text
+
+
+def classify(raw_blocks: Iterable[RawBlock]) -> List[Block]:
+    """Turn raw blocks into headings, lists, tables and text.
+
+    The body font is the size covering the most characters; larger (or bold
+    body-size) short blocks are headings, ranked by size into levels.
+    """
+    raw_blocks = list(raw_blocks)
+    weights: Counter = Counter()
+    for raw in raw_blocks:
+        if raw.size is not None and not raw.table:
+            weights[raw.size] += sum(len(line) for line in raw.lines)
+    body_size = weights.most_common(1)[0][0] if weights else 0.0
+
+    def is_heading(raw: RawBlock) -> bool:
+        if raw.size is None or raw.table or not body_size:
+            return False
+        text = " ".join(raw.lines)
+        if len(raw.lines) > _HEADING_MAX_LINES or len(text) > _HEADING_MAX_CHARS:
+            return False
+        if BULLET_RE.match(raw.lines[0]) and raw.size < body_size * _HEADING_SIZE_RATIO:
+            return False
+        return raw.size >= body_size * _HEADING_SIZE_RATIO or (
+            raw.bold and raw.size >= body_size and not text.endswith(".")
+        )
+
+    heading_sizes = sorted({raw.size for raw in raw_blocks if is_heading(raw)}, reverse=True)
+    levels: Dict[float, int] = {size: min(i + 1, 6) for i, size in enumerate(heading_sizes)}
+
+    blocks: List[Block] = []
+    for raw in raw_blocks:
+        if raw.table:
+            blocks.append(Block("table", "\n".join(raw.lines), raw.page))
+        elif is_heading(raw):
+            blocks.append(Block("heading", _join_lines(raw.lines), raw.page, levels[raw.size]))
+        elif BULLET_RE.match(raw.lines[0]):
+            # Continuation lines are folded into the item they wrap from
+            items: List[List[str]] = []
+            for line in raw.lines:
+                if BULLET_RE.match(line) or not items:
+                    items.append([line])
+                else:
+                    items[-1].append(line)
+            text = "\n".join(_join_lines(item) for item in items)
+            if blocks and blocks[-1].kind == "list" and blocks[-1].page == raw.page:
+                # Items laid out as separate blocks still form one list
+                blocks[-1].text += "\n" + text
+            else:
+                blocks.append(Block("list", text, raw.page))
+        else:
+            blocks.append(Block("text", _join_lines(raw.lines), raw.page))
+    return blocks
+
+
+def _split_oversized(block: Block, chunk_size: int, chunk_overlap: int) -> List[str]:
+    if block.kind in ("table", "list"):
+        # Keep rows/items whole; tables repeat their header row in every piece
+        rows = block.text.split("\n")
+        header = rows[0] if block.kind == "table" else None
+        pieces: List[str] = []
+        current: List[str] = []
+        for row in rows[1:] if header else rows:
+            candidate = "\n".join(([header] if header else []) + current + [row])
+            if current and len(candidate) > chunk_size:
+                pieces.append("\n".join(([header] if header else []) + current))
+                current = []
+            current.append(row)
+        if current:
+            pieces.append("\n".join(([header] if header else []) + current))
+        if all(len(piece) <= chunk_size for piece in pieces):
+            return pieces
+
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    return splitter.split_text(block.text)
+
+
+def chunk_blocks(
+    blocks: List[Block],
+    chunk_size: int,
+    chunk_overlap: int,
+) -> List[Tuple[str, dict]]:
+    """Pack blocks into chunks that never straddle a heading.
+
+    Returns ``(text, metadata)`` pairs; metadata holds the heading path as
+    ``section`` and the first/last page numbers (1-based). Overlap between
+    chunks of the same section is made of whole trailing blocks.
+    """
+    chunks: List[Tuple[str, dict]] = []
+    path: List[Tuple[int, str]] = []
+    current: List[Tuple[Block, str]] = []
+
+    def has_body() -> bool:
+        return any(block.kind != "heading" for block, _ in current)
+
+    def size() -> int:
+        return sum(len(text) + 2 for _, text in current)
+
+    def flush():
+        chunks.append(
+            (
+                "\n\n".join(text for _, text in current),
+                {
+                    "section": " > ".join(title for _, title in path),
+                    "page": current[0][0].page + 1,
+                    "page_end": current[-1][0].page + 1,
+                },
+            )
+        )
+
+    for block in blocks:
+        if block.kind == "heading":
+            if has_body():
+                flush()
+                current = []
+            while path and path[-1][0] >= block.level:
+                path.pop()
+            path.append((block.level, block.text))
+            current.append((block, block.text))
+            continue
+
+        if len(block.text) > chunk_size:
+            pieces = _split_oversized(block, chunk_size, chunk_overlap)
+        else:
+            pieces = [block.text]
+        for piece in pieces:
+            if has_body() and size() + len(piece) > chunk_size:
+                flush()
+                overlap: List[Tuple[Block, str]] = []
+                carried = 0
+                for previous in reversed(current):
+                    carried += len(previous[1]) + 2
+                    if previous[0].kind == "heading" or carried > chunk_overlap:
+                        break
+                    overlap.insert(0, previous)
+                current = overlap
+            current.append((block, piece))
+
+    if current:
+        flush()
+    return chunks
+
+
+def to_rows(blocks: List[Block]) -> List[list]:
+    """Blocks as compact ``[kind, level, page, text]`` rows"""
+    return [[block.kind, block.level, block.page, block.text] for block in blocks]
+
+
+def from_rows(rows: Iterable[list]) -> List[Block]:
+    """Inverse of ``to_rows``"""
+    return [Block(kind, text, page, level) for kind, level, page, text in rows]
+
+
+def encode_layout(blocks: List[Block]) -> bytes:
+    """Compact on-disk form: zlib-compressed JSON rows"""
+    payload = {"version": LAYOUT_VERSION, "blocks": to_rows(blocks)}
+    raw = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return zlib.compress(raw, 6)
+
+
+def decode_layout(data: bytes) -> Optional[List[Block]]:
+    """Inverse of ``encode_layout``; ``None`` for layouts of another version"""
+    payload = json.loads(zlib.decompress(data))
+    if payload.get("version") != LAYOUT_VERSION:
+        return None
+    return from_rows(payload["blocks"])
+
+
+def read_layout(path: Path) -> Optional[List[Block]]:
+    """Load a cached layout, ``None`` when missing or unreadable"""
+    try:
+        return decode_layout(path.read_bytes())
+    except (OSError, ValueError, zlib.error):
+        return None
+
+
+def write_layout(path: Path, blocks: List[Block]):
+    """Atomically store a layout"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp_path.write_bytes(encode_layout(blocks))
+    tmp_path.replace(path)
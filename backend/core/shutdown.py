@@ -0,0 +1,67 @@
+"""Graceful shutdown: stop fan-out, drain background generation, close connections"""
+
+import asyncio
+import time
+from typing import Optional, Set
+
+from backend.config import settings
+from backend.core.cold_store import cold_store
+from backend.core.database import db
+
+
+async def drain_tasks(tasks: Set[asyncio.Task], timeout: float) -> int:
+    """Wait up to ``timeout`` seconds for ``tasks``, then cancel the rest.
+
+    Returns the number of tasks that had to be cancelled.
+    """
+    pending = {task for task in tasks if not task.done()}
+    if not pending:
+        return 0
+    _, pending = await asyncio.wait(pending, timeout=timeout)
+    for task in pending:
+        task.cancel()
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+    return len(pending)
+
+
+async def shutdown(timeout: Optional[float] = None):
+    """Release the worker's resources once uvicorn has stopped serving requests.
+
+    Generation started by requests (resumable streams, batches, new
+    drafts) runs in background tasks; it gets ``SHUTDOWN_TIMEOUT_SECONDS``
+    to finish and is then cancelled, which records an error event for
+    clients still following it (and fails the draft). Connections are
+    closed last.
+    """
+    from backend.api.v1.websocket import manager
+    from backend.services.batch_service import batch_service
+    from backend.services.blog_service import blog_service
+    from backend.services.gc_service import gc_service
+    from backend.services.stream_service import stream_service
+    from backend.services.tiering_service import tiering_service
+
+    timeout = settings.SHUTDOWN_TIMEOUT_SECONDS if timeout is None else timeout
+    started = time.perf_counter()
+
+    await manager.stop()
+    await gc_service.stop()
+    await tiering_service.stop()
+
+    running = len(batch_service.tasks) + len(blog_service.tasks) + len(stream_service.tasks)
+    if running:
+        print(f"⏳ Waiting up to {timeout:g}s for {running} background generation task(s)")
+    cancelled = sum(
+        await asyncio.gather(
+            drain_tasks(batch_service.tasks, timeout),
+            drain_tasks(blog_service.tasks, timeout),
+            drain_tasks(stream_service.tasks, timeout),
+        )
+    )
+
+    await db.close()
+    cold_store.close()
+
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    status = f"{cancelled} task(s) cancelled" if cancelled else "drained"
+    print(f"✅ Shutdown finished in {elapsed_ms:.0f} ms ({status})")
@@ -0,0 +1,39 @@
+"""Server-sent event frames, encoded with orjson straight to bytes"""
+
+from typing import Union
+
+import orjson
+
+
+_DATA = b"data: "
+_END = b"\n\n"
+
+_ID = b"id: "
+_ID_DATA = b"\ndata: "
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "X-Accel-Buffering": "no",
+}
+
+
+def event_frame(event: dict) -> bytes:
+    """``data: <json>`` frame for an arbitrary event"""
+    return _DATA + orjson.dumps(event) + _END
+
+
+def error_frame(message: str) -> bytes:
+    return event_frame({"type": "error", "message": message})
+
+
+def id_frame(event_id: str, data: Union[bytes, str]) -> bytes:
+    """``id: <event_id>`` frame around already-encoded JSON ``data``"""
+    if isinstance(data, str):
+        data = data.encode()
+    return _ID + event_id.encode() + _ID_DATA + data + _END
+
+
+def retry_frame(milliseconds: int) -> bytes:
+    """Reconnection delay for EventSource clients"""
+    return f"retry: {milliseconds}\n\n".encode()
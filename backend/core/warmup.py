@@ -0,0 +1,134 @@
+"""Startup warm-up: connect, validate and pre-load subsystems before serving"""
+
+import asyncio
+import importlib
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from backend.config import settings
+from backend.core.database import db
+
+
+# Imported on first use by request handlers; loading them here moves the
+# cost out of the first request. Missing optional modules are skipped.
+HEAVY_MODULES = (
+    "openai",
+    "fitz",
+    "langchain_text_splitters",
+    "langchain_openai",
+    "jose",
+)
+
+
+async def warm_redis():
+    """Open and validate ``REDIS_WARM_CONNECTIONS`` pooled connections"""
+
+    def connect():
+        pool = db.redis.connection_pool
+        connections = [pool.get_connection("PING") for _ in range(settings.REDIS_WARM_CONNECTIONS)]
+        try:
+            for connection in connections:
+                connection.send_command("PING")
+                connection.read_response()
+        finally:
+            for connection in connections:
+                pool.release(connection)
+
+    await asyncio.to_thread(connect)
+
+
+async def warm_elasticsearch() -> Optional[str]:
+    if not db.elasticsearch:
+        return "not configured"
+    info = await db.elasticsearch.info()
+    from backend.services.search_index import search_index
+
+    if not await search_index.ensure():
+        raise RuntimeError("chunk index unavailable")
+    return f"version {info['version']['number']}"
+
+
+async def warm_imports() -> str:
+    def load():
+        loaded = []
+        for name in HEAVY_MODULES:
+            try:
+                importlib.import_module(name)
+                loaded.append(name)
+            except ImportError:
+                pass
+            except Exception as e:
+                print(f"⚠️  Warm-up could not import {name}: {e}")
+        return ", ".join(loaded)
+
+    return await asyncio.to_thread(load)
+
+
+async def warm_caches() -> Optional[str]:
+    if not settings.EMBEDDINGS_ENABLED:
+        return "embeddings disabled"
+    from backend.services.embedding_service import embedding_service
+
+    # Builds the key index of the on-disk embedding store
+    store = await asyncio.to_thread(lambda: embedding_service.store)
+    return f"{len(store._index)} cached embeddings"
+
+
+class Warmup:
+    """Runs the warm-up steps in parallel and records how each went.
+
+    Readiness requires every step in ``REQUIRED`` to succeed; the others
+    (ElasticSearch falls back to Redis search) only degrade the service.
+    """
+
+    STEPS: Dict[str, Callable[[], Awaitable[Optional[str]]]] = {
+        "redis": warm_redis,
+        "elasticsearch": warm_elasticsearch,
+        "imports": warm_imports,
+        "caches": warm_caches,
+    }
+    REQUIRED = ("redis",)
+
+    def __init__(self):
+        self.done = False
+        self.seconds: Optional[float] = None
+        self.components: Dict[str, dict] = {}
+
+    @property
+    def ready(self) -> bool:
+        return self.done and all(
+            self.components.get(name, {}).get("status") == "ok" for name in self.REQUIRED
+        )
+
+    async def _step(self, name: str, step: Callable[[], Awaitable[Optional[str]]]):
+        started = time.perf_counter()
+        try:
+            detail = await asyncio.wait_for(step(), settings.WARMUP_TIMEOUT_SECONDS)
+            status = "ok"
+        except Exception as e:
+            detail = str(e) or type(e).__name__
+            status = "failed"
+        elapsed = time.perf_counter() - started
+        self.components[name] = {"status": status, "seconds": round(elapsed, 3), "detail": detail}
+        icon = "✅" if status == "ok" else "⚠️ "
+        print(f"{icon} Warm-up {name}: {status} in {elapsed * 1000:.0f} ms" + (f" ({detail})" if detail else ""))
+
+    async def run(self, steps: Optional[List[str]] = None):
+        started = time.perf_counter()
+        names = steps or list(self.STEPS)
+        await asyncio.gather(*(self._step(name, self.STEPS[name]) for name in names))
+        self.seconds = round(time.perf_counter() - started, 3)
+        self.done = True
+        print(f"{'✅' if self.ready else '❌'} Warm-up finished in {self.seconds * 1000:.0f} ms (ready: {self.ready})")
+
+    def status(self) -> dict:
+        return {
+            "ready": self.ready,
+            "warming_up": not self.done,
+            "seconds": self.seconds,
+            "components": self.components,
+        }
+
+
+# Global warm-up state
+warmup = Warmup()
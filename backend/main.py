@@ -1,11 +1,16 @@
 """FastAPI application entry point"""
 
+import asyncio
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 
 from backend.config import settings
+from backend.core.shutdown import shutdown
+from backend.core.warmup import warmup
+from backend.services.gc_service import gc_service
+from backend.services.tiering_service import tiering_service
 
 
 @asynccontextmanager
@@ -16,10 +21,21 @@ async def lifespan(app: FastAPI):
     print(f"📝 Environment: {settings.ENVIRONMENT}")
     print(f"🔧 Debug mode: {settings.DEBUG}")
 
+    # Warm up in the background; /ready reports once it has finished
+    warmup_task = asyncio.create_task(warmup.run())
+    # Relay WebSocket messages between worker processes
+    await websocket.manager.start()
+    # Periodic Redis garbage collection (one worker per interval)
+    gc_service.start()
+    # Periodic moves of idle content to the cold store
+    tiering_service.start()
+
     yield
 
     # Shutdown
     print(f"👋 {settings.APP_NAME} shutting down...")
+    warmup_task.cancel()
+    await shutdown()
 
 
 # Create FastAPI app
@@ -30,6 +46,7 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # CORS middleware
@@ -54,6 +71,14 @@ async def health_check():
     }
 
 
+# Readiness endpoint
+@app.get("/ready", tags=["Health"])
+async def readiness_check():
+    """Readiness endpoint: 503 until start-up warm-up has finished"""
+    status = warmup.status()
+    return JSONResponse(status_code=200 if status["ready"] else 503, content=status)
+
+
 # Root endpoint
 @app.get("/", tags=["Root"])
 async def root():
@@ -110,6 +135,7 @@ async def system_status():
 
 
 if __name__ == "__main__":
+    # Single development process; use ``python -m backend.serve`` in production
     import uvicorn
 
     uvicorn.run(
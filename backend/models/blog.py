@@ -15,18 +15,93 @@ class BlogStatus(str, Enum):
     FAILED = "failed"
 
 
+class GenerationMode(str, Enum):
+    """How a post is generated"""
+    SEQUENTIAL = "sequential"
+    PARALLEL = "parallel"
+
+
 class BlogGenerateRequest(BaseModel):
     """Request to generate a blog post"""
     document_ids: List[str] = Field(..., description="Document IDs to use as source")
     title: Optional[str] = Field(None, description="Blog post title")
     instructions: Optional[str] = Field(None, description="Additional instructions for generation")
+    mode: GenerationMode = Field(
+        GenerationMode.SEQUENTIAL,
+        description="sequential (single completion) or parallel (outline, then sections concurrently)",
+    )
     categories: Optional[List[str]] = Field(default_factory=list)
     tags: Optional[List[str]] = Field(default_factory=list)
 
 
+class RefineMode(str, Enum):
+    """How much of the draft a refinement rewrites"""
+    FULL = "full"
+    SECTION = "section"
+
+
 class BlogRefineRequest(BaseModel):
     """Request to refine a blog draft"""
     feedback: str = Field(..., description="User feedback for refinement")
+    mode: RefineMode = Field(RefineMode.FULL, description="Rewrite the full post or only matching sections")
+    anchors: Optional[List[str]] = Field(
+        None, description="Heading anchors or titles to refine (section mode)"
+    )
+
+
+class BlogBatchItem(BaseModel):
+    """Single post within a batch generation request"""
+    title: str = Field(..., description="Blog post title")
+    instructions: Optional[str] = Field(None, description="Additional instructions for generation")
+    document_ids: Optional[List[str]] = Field(
+        None, description="Override the batch document IDs for this item"
+    )
+    categories: Optional[List[str]] = Field(default_factory=list)
+    tags: Optional[List[str]] = Field(default_factory=list)
+
+
+class BlogBatchRequest(BaseModel):
+    """Request to generate many blog posts from a shared set of documents"""
+    document_ids: List[str] = Field(..., description="Document IDs shared by all items")
+    items: List[BlogBatchItem] = Field(..., min_length=1, description="Posts to generate")
+
+
+class BatchStatus(str, Enum):
+    """Batch and batch item status"""
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class BlogBatchItemStatus(BaseModel):
+    """Progress of a single batch item"""
+    index: int
+    title: str
+    draft_id: str
+    status: BatchStatus = BatchStatus.PENDING
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    latency_ms: Optional[float] = None
+    error: Optional[str] = None
+
+
+class BlogBatch(BaseModel):
+    """Batch generation progress"""
+    id: str
+    user_id: str
+    session_id: str
+    status: BatchStatus
+    total: int
+    completed: int = 0
+    failed: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    latency_ms: float = 0.0
+    context_passes: int = 0
+    items: List[BlogBatchItemStatus] = Field(default_factory=list)
+    created_at: datetime
+    finished_at: Optional[datetime] = None
 
 
 class BlogDraft(BaseModel):
@@ -58,6 +133,29 @@ class BlogDraftUpdate(BaseModel):
     tags: Optional[List[str]] = None
 
 
+class DraftVersionInfo(BaseModel):
+    """Stored draft version summary"""
+    version: int
+    kind: str = Field(..., description="snapshot or delta")
+    length: int = Field(..., description="Content length in characters")
+    stored_bytes: int = Field(..., description="Encoded size in storage")
+    created_at: datetime
+
+
+class DraftVersion(BaseModel):
+    """Reconstructed draft version"""
+    version: int
+    content: str
+    created_at: datetime
+
+
+class DraftVersionDiff(BaseModel):
+    """Unified diff between two draft versions"""
+    from_version: int
+    to_version: int
+    diff: str
+
+
 class BlogExportRequest(BaseModel):
     """Request to export blog"""
     format: str = Field("markdown", description="Export format (markdown, html)")
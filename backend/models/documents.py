@@ -32,6 +32,24 @@ class DocumentUpload(BaseModel):
     status: ProcessingStatus = ProcessingStatus.PENDING
 
 
+class UploadInitRequest(BaseModel):
+    """Start a chunked, resumable upload"""
+    filename: str = Field(..., description="Original filename")
+    size: Optional[int] = Field(None, description="Total size in bytes, if known")
+    sha256: Optional[str] = Field(None, description="Expected SHA-256 hex digest, verified on completion")
+
+
+class UploadSession(BaseModel):
+    """Chunked upload progress"""
+    id: str
+    filename: str
+    file_type: DocumentType
+    received_bytes: int = 0
+    expected_size: Optional[int] = None
+    chunk_size: int = Field(..., description="Suggested bytes per append request")
+    created_at: datetime
+
+
 class DocumentMetadata(BaseModel):
     """Document metadata"""
     title: Optional[str] = None
@@ -72,6 +90,19 @@ class DocumentSearch(BaseModel):
     query: str = Field(..., description="Search query")
     document_ids: Optional[List[str]] = Field(None, description="Filter by document IDs")
     top_k: int = Field(5, description="Number of results to return")
+    snippets: Optional[int] = Field(
+        None, ge=1, le=10, description="Return this many best-matching passages per chunk instead of the whole chunk"
+    )
+    snippet_size: Optional[int] = Field(None, ge=50, le=5000, description="Passage length in characters")
+    rerank: Optional[bool] = Field(None, description="Rescore over-fetched candidates (default: RERANK_ENABLED)")
+
+
+class Snippet(BaseModel):
+    """Best-matching passage of a chunk"""
+    text: str
+    start: Optional[int] = Field(None, description="Character offset into the chunk (local scorer only)")
+    end: Optional[int] = None
+    score: float = 0.0
 
 
 class SearchResult(BaseModel):
@@ -81,6 +112,7 @@ class SearchResult(BaseModel):
     document_name: str
     score: float
     metadata: dict = Field(default_factory=dict)
+    snippets: List[Snippet] = Field(default_factory=list)
 
 
 class SearchResponse(BaseModel):
@@ -43,6 +43,8 @@ class ChatMessage(BaseModel):
 
 
 class ChatHistory(BaseModel):
-    """Chat history for a session"""
+    """Chat history for a session (one page, oldest first)"""
     session_id: str
     messages: List[ChatMessage]
+    total: Optional[int] = Field(None, description="Total messages in the session")
+    has_more: bool = Field(False, description="Older messages exist before this page")
@@ -0,0 +1,69 @@
+"""Production server entry point: several uvicorn worker processes
+
+    python -m backend.serve --workers 4
+
+Each worker is a separate process with its own event loop and its own copy
+of the module-level services. State shared between requests (drafts,
+sessions, resumable streams, batches) lives in Redis, and WebSocket messages
+are relayed between workers over Redis pub/sub, so any worker can serve any
+request. uvloop and httptools are used when installed (``uvicorn[standard]``
+ships them on Linux and macOS).
+"""
+
+import argparse
+import importlib.util
+import os
+from typing import List, Optional
+
+import uvicorn
+
+from backend.config import settings
+
+
+def _available(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def default_workers() -> int:
+    return settings.WORKERS or os.cpu_count() or 1
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Run the API with multiple worker processes")
+    parser.add_argument("--host", default=settings.HOST)
+    parser.add_argument("--port", type=int, default=settings.PORT)
+    parser.add_argument("--workers", type=int, default=default_workers(), help="Default: WORKERS or one per CPU")
+    parser.add_argument("--backlog", type=int, default=2048, help="Pending connections queued by the kernel")
+    parser.add_argument(
+        "--limit-concurrency",
+        type=int,
+        default=None,
+        help="Per worker; requests beyond this get 503 instead of queueing",
+    )
+    parser.add_argument("--access-log", action="store_true", help="Log every request (off: the proxy logs them)")
+    args = parser.parse_args(argv)
+
+    loop = "uvloop" if _available("uvloop") else "asyncio"
+    http = "httptools" if _available("httptools") else "h11"
+    print(f"🚀 Serving on {args.host}:{args.port} with {args.workers} worker(s) (loop: {loop}, http: {http})")
+
+    uvicorn.run(
+        "backend.main:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        loop=loop,
+        http=http,
+        backlog=args.backlog,
+        limit_concurrency=args.limit_concurrency,
+        timeout_keep_alive=settings.KEEPALIVE_SECONDS,
+        # Open requests (including SSE followers) get this long on SIGTERM;
+        # background generation then gets the same again in the lifespan.
+        timeout_graceful_shutdown=int(settings.SHUTDOWN_TIMEOUT_SECONDS),
+        access_log=args.access_log,
+        proxy_headers=True,
+    )
+
+
+if __name__ == "__main__":
+    main()
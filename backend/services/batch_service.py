@@ -0,0 +1,341 @@
+"""Batch blog generation service"""
+
+import asyncio
+import json
+import logging
+import time
+import uuid
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from backend.config import settings
+from backend.core.database import db
+from backend.models.blog import (
+    BatchStatus,
+    BlogBatch,
+    BlogBatchItemStatus,
+    BlogBatchRequest,
+    BlogGenerateRequest,
+    BlogStatus,
+)
+from backend.services.blog_service import blog_service
+
+
+logger = logging.getLogger(__name__)
+
+
+class BatchService:
+    """Runs many draft generations from one request through a bounded worker pool.
+
+    Batch state lives in Redis so progress can be read from any process:
+
+    - ``batch:{id}`` hash with metadata and aggregate counters
+    - ``batch:{id}:items`` hash of item index -> item status JSON
+    - ``batch:{id}:events`` list of JSON events consumed by the SSE stream
+    """
+
+    def __init__(self):
+        self.redis = db.redis
+        self._tasks: Set[asyncio.Task] = set()
+
+    @property
+    def tasks(self) -> Set[asyncio.Task]:
+        """Background tasks still running in this process"""
+        return self._tasks
+
+    async def create_batch(
+        self,
+        user_id: str,
+        session_id: str,
+        request: BlogBatchRequest,
+    ) -> BlogBatch:
+        """Create drafts for every item and start generating them in the background"""
+        if len(request.items) > settings.BATCH_MAX_ITEMS:
+            raise ValueError(f"Too many items. Max per batch: {settings.BATCH_MAX_ITEMS}")
+
+        batch_id = str(uuid.uuid4())
+        created_at = datetime.utcnow()
+
+        items: List[BlogBatchItemStatus] = []
+        plans: List[Tuple[BlogBatchItemStatus, List[str], Optional[str]]] = []
+        for index, item in enumerate(request.items):
+            document_ids = item.document_ids or request.document_ids
+            draft = await blog_service.create_draft(
+                user_id,
+                session_id,
+                BlogGenerateRequest(
+                    document_ids=document_ids,
+                    title=item.title,
+                    instructions=item.instructions,
+                    categories=item.categories,
+                    tags=item.tags,
+                ),
+            )
+            status = BlogBatchItemStatus(index=index, title=draft.title, draft_id=draft.id)
+            items.append(status)
+            plans.append((status, document_ids, item.instructions))
+
+        batch_key = f"batch:{batch_id}"
+        self.redis.hset(
+            batch_key,
+            mapping={
+                "id": batch_id,
+                "user_id": user_id,
+                "session_id": session_id,
+                "status": BatchStatus.PENDING.value,
+                "total": str(len(items)),
+                "completed": "0",
+                "failed": "0",
+                "prompt_tokens": "0",
+                "completion_tokens": "0",
+                "latency_ms": "0",
+                "context_passes": "0",
+                "created_at": created_at.isoformat(),
+            },
+        )
+        self.redis.hset(
+            f"{batch_key}:items",
+            mapping={str(item.index): item.model_dump_json() for item in items},
+        )
+        self.redis.expire(batch_key, settings.BATCH_RESULT_TTL_SECONDS)
+        self.redis.expire(f"{batch_key}:items", settings.BATCH_RESULT_TTL_SECONDS)
+        self.redis.sadd(f"user:{user_id}:batches", batch_id)
+
+        # Keep a reference so the task is not garbage collected mid-run
+        task = asyncio.create_task(self._run_batch(batch_id, user_id, plans))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+        return BlogBatch(
+            id=batch_id,
+            user_id=user_id,
+            session_id=session_id,
+            status=BatchStatus.PENDING,
+            total=len(items),
+            items=items,
+            created_at=created_at,
+        )
+
+    async def get_batch(self, batch_id: str) -> Optional[BlogBatch]:
+        """Get batch progress by ID"""
+        batch_data = self.redis.hgetall(f"batch:{batch_id}")
+        if not batch_data:
+            return None
+
+        raw_items = self.redis.hgetall(f"batch:{batch_id}:items")
+        items = sorted(
+            (BlogBatchItemStatus.model_validate_json(raw) for raw in raw_items.values()),
+            key=lambda item: item.index,
+        )
+
+        return BlogBatch(
+            id=batch_id,
+            user_id=batch_data["user_id"],
+            session_id=batch_data["session_id"],
+            status=BatchStatus(batch_data["status"]),
+            total=int(batch_data["total"]),
+            completed=int(batch_data.get("completed", "0")),
+            failed=int(batch_data.get("failed", "0")),
+            prompt_tokens=int(batch_data.get("prompt_tokens", "0")),
+            completion_tokens=int(batch_data.get("completion_tokens", "0")),
+            latency_ms=float(batch_data.get("latency_ms", "0")),
+            context_passes=int(batch_data.get("context_passes", "0")),
+            items=items,
+            created_at=datetime.fromisoformat(batch_data["created_at"]),
+            finished_at=datetime.fromisoformat(batch_data["finished_at"])
+            if batch_data.get("finished_at")
+            else None,
+        )
+
+    async def stream_events(
+        self,
+        batch_id: str,
+        poll_interval: float = 0.5,
+    ) -> AsyncIterator[dict]:
+        """Yield batch events as they are recorded, ending with the ``done`` event.
+
+        Also ends once the batch is finished and its events are drained, and
+        with an ``error`` event when nothing was recorded for
+        ``GC_STALE_MINUTES`` (the process running it went away).
+        """
+        events_key = f"batch:{batch_id}:events"
+        cursor = 0
+        last_event = time.monotonic()
+
+        while True:
+            raw_events = self.redis.lrange(events_key, cursor, -1)
+            cursor += len(raw_events)
+            for raw in raw_events:
+                event = json.loads(raw)
+                yield event
+                if event.get("type") == "done":
+                    return
+
+            if raw_events:
+                last_event = time.monotonic()
+            else:
+                status = self.redis.hget(f"batch:{batch_id}", "status")
+                if status is None or status in (BatchStatus.COMPLETED.value, BatchStatus.FAILED.value):
+                    return
+                if time.monotonic() - last_event > settings.GC_STALE_MINUTES * 60:
+                    yield {"type": "error", "message": "Batch stopped making progress"}
+                    return
+            await asyncio.sleep(poll_interval)
+
+    async def _run_batch(
+        self,
+        batch_id: str,
+        user_id: str,
+        plans: List[Tuple[BlogBatchItemStatus, List[str], Optional[str]]],
+    ):
+        batch_key = f"batch:{batch_id}"
+        started = time.perf_counter()
+        self.redis.hset(batch_key, "status", BatchStatus.RUNNING.value)
+
+        try:
+            contexts = await self._build_shared_contexts(user_id, plans)
+            self.redis.hset(batch_key, "context_passes", str(len(contexts)))
+
+            queue: asyncio.Queue = asyncio.Queue()
+            for plan in plans:
+                queue.put_nowait(plan)
+
+            async def worker():
+                while True:
+                    try:
+                        item, document_ids, instructions = queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        return
+                    await self._run_item(
+                        batch_id,
+                        item,
+                        instructions,
+                        contexts[self._context_key(document_ids)],
+                    )
+
+            pool_size = max(1, min(settings.BATCH_MAX_CONCURRENCY, len(plans)))
+            await asyncio.gather(*(worker() for _ in range(pool_size)))
+
+            failed = int(self.redis.hget(batch_key, "failed") or 0)
+            final_status = BatchStatus.FAILED if failed == len(plans) else BatchStatus.COMPLETED
+        except asyncio.CancelledError:
+            # Shutdown deadline passed; don't leave the batch "running" forever
+            logger.warning("Batch %s interrupted by shutdown", batch_id)
+            self._fail_unfinished(batch_id, plans, "Interrupted by shutdown")
+            await self._finish_batch(batch_id, BatchStatus.FAILED, started)
+            raise
+        except Exception as exc:
+            logger.error("Batch %s failed: %s", batch_id, exc)
+            self._fail_unfinished(batch_id, plans, str(exc))
+            final_status = BatchStatus.FAILED
+
+        await self._finish_batch(batch_id, final_status, started)
+
+    async def _finish_batch(self, batch_id: str, final_status: BatchStatus, started: float):
+        batch_key = f"batch:{batch_id}"
+        self.redis.hset(
+            batch_key,
+            mapping={
+                "status": final_status.value,
+                "latency_ms": f"{(time.perf_counter() - started) * 1000:.1f}",
+                "finished_at": datetime.utcnow().isoformat(),
+            },
+        )
+
+        batch = await self.get_batch(batch_id)
+        summary = batch.model_dump(mode="json", exclude={"items"}) if batch else {}
+        self._push_event(batch_id, {"type": "done", "batch": summary})
+
+    def _fail_unfinished(
+        self,
+        batch_id: str,
+        plans: List[Tuple[BlogBatchItemStatus, List[str], Optional[str]]],
+        error: str,
+    ):
+        """Mark items (and their drafts) that never finished as failed"""
+        for item, _, _ in plans:
+            if item.status in (BatchStatus.COMPLETED, BatchStatus.FAILED):
+                continue
+            item.status = BatchStatus.FAILED
+            item.error = error
+            self.redis.hincrby(f"batch:{batch_id}", "failed", 1)
+            self._save_item(batch_id, item)
+            blog_service._set_status(item.draft_id, BlogStatus.FAILED)
+            self._push_event(batch_id, {"type": "item", **item.model_dump(mode="json")})
+
+    async def _build_shared_contexts(
+        self,
+        user_id: str,
+        plans: List[Tuple[BlogBatchItemStatus, List[str], Optional[str]]],
+    ) -> Dict[Tuple[str, ...], str]:
+        """Run one retrieval and packing pass per distinct document set"""
+        queries: Dict[Tuple[str, ...], List[str]] = {}
+        for item, document_ids, instructions in plans:
+            queries.setdefault(self._context_key(document_ids), []).append(
+                instructions or item.title
+            )
+
+        contexts: Dict[Tuple[str, ...], str] = {}
+        for key, item_queries in queries.items():
+            query = " ".join(dict.fromkeys(item_queries))[:1000]
+            contexts[key] = await blog_service.build_document_context(user_id, list(key), query)
+        return contexts
+
+    async def _run_item(
+        self,
+        batch_id: str,
+        item: BlogBatchItemStatus,
+        instructions: Optional[str],
+        doc_context: str,
+    ):
+        batch_key = f"batch:{batch_id}"
+        usage: Dict[str, int] = {}
+        parts: List[str] = []
+
+        item.status = BatchStatus.RUNNING
+        self._save_item(batch_id, item)
+
+        started = time.perf_counter()
+        try:
+            async for chunk in blog_service.generate_content(
+                item.draft_id,
+                instructions,
+                doc_context=doc_context,
+                usage=usage,
+            ):
+                parts.append(chunk)
+            item.status = BatchStatus.COMPLETED
+            self.redis.hincrby(batch_key, "completed", 1)
+        except Exception as exc:
+            logger.error("Error generating batch item %s (draft %s): %s", item.index, item.draft_id, exc)
+            item.status = BatchStatus.FAILED
+            item.error = str(exc)
+            self.redis.hincrby(batch_key, "failed", 1)
+
+        item.latency_ms = round((time.perf_counter() - started) * 1000, 1)
+        item.prompt_tokens = usage.get("prompt_tokens", 0)
+        item.completion_tokens = usage.get("completion_tokens", 0)
+        self.redis.hincrby(batch_key, "prompt_tokens", item.prompt_tokens)
+        self.redis.hincrby(batch_key, "completion_tokens", item.completion_tokens)
+        self._save_item(batch_id, item)
+
+        event = {"type": "item", **item.model_dump(mode="json")}
+        if item.status == BatchStatus.COMPLETED:
+            event["content"] = "".join(parts)
+        self._push_event(batch_id, event)
+
+    def _save_item(self, batch_id: str, item: BlogBatchItemStatus):
+        self.redis.hset(f"batch:{batch_id}:items", str(item.index), item.model_dump_json())
+
+    def _push_event(self, batch_id: str, event: dict):
+        events_key = f"batch:{batch_id}:events"
+        self.redis.rpush(events_key, json.dumps(event))
+        self.redis.expire(events_key, settings.BATCH_RESULT_TTL_SECONDS)
+
+    @staticmethod
+    def _context_key(document_ids: List[str]) -> Tuple[str, ...]:
+        return tuple(sorted(set(document_ids)))
+
+
+# Global service instance
+batch_service = BatchService()
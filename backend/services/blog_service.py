@@ -1,26 +1,82 @@
 """Blog generation service"""
 
+import asyncio
+import logging
 import uuid
 from datetime import datetime
-from typing import Optional, List, AsyncIterator
+from typing import Optional, List, AsyncIterator, Dict, Set
+from redis.exceptions import WatchError
+
 from backend.core.database import db
+from backend.core.markdown_sections import (
+    outline,
+    parse_sections,
+    section_text,
+    select_sections,
+    splice_sections,
+)
 from backend.config import settings
 from backend.services.document_service import document_service
+from backend.services.draft_history_service import draft_history_service
+from backend.services.tiering_service import TIER_FIELD, COLD_TIER, tiering_service
 from backend.models.blog import (
     BlogDraft,
     BlogStatus,
     BlogGenerateRequest,
     BlogRefineRequest,
     BlogDraftUpdate,
+    GenerationMode,
 )
 
 
+logger = logging.getLogger(__name__)
+
+
 class BlogService:
     """Handles blog generation and management"""
 
     def __init__(self):
         self.redis = db.redis
         self.max_context_chars = 8000
+        self._tasks: Set[asyncio.Task] = set()
+
+    @property
+    def tasks(self) -> Set[asyncio.Task]:
+        """Background generations still running in this process"""
+        return self._tasks
+
+    def start_generation(
+        self,
+        draft_id: str,
+        instructions: Optional[str] = None,
+        mode: GenerationMode = GenerationMode.SEQUENTIAL,
+    ) -> asyncio.Task:
+        """Generate a draft's content in the background; the result lands in Redis"""
+        task = asyncio.create_task(self._generate_in_background(draft_id, instructions, mode))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _generate_in_background(
+        self,
+        draft_id: str,
+        instructions: Optional[str],
+        mode: GenerationMode,
+    ):
+        generate = (
+            self.generate_content_parallel
+            if mode == GenerationMode.PARALLEL
+            else self.generate_content
+        )
+        try:
+            async for _ in generate(draft_id, instructions):
+                pass  # Consume the generator to completion
+        except asyncio.CancelledError:
+            # Cancelled at shutdown: the draft must not stay "generating"
+            self._set_status(draft_id, BlogStatus.FAILED)
+            raise
+        except Exception as e:
+            logger.error("Error generating content for draft %s: %s", draft_id, e)
 
     async def create_draft(
         self,
@@ -50,6 +106,7 @@ class BlogService:
         self.redis.hset(f"draft:{draft_id}", mapping=draft)
         self.redis.sadd(f"user:{user_id}:drafts", draft_id)
         self.redis.sadd(f"session:{session_id}:drafts", draft_id)
+        draft_history_service.record_version(draft_id, 1, "")
 
         return BlogDraft(
             id=draft_id,
@@ -66,11 +123,28 @@ class BlogService:
             updated_at=datetime.utcnow(),
         )
 
-    async def get_draft(self, draft_id: str) -> Optional[BlogDraft]:
-        """Get draft by ID"""
+    def _set_status(self, draft_id: str, status: BlogStatus):
+        # status_at lets the garbage collector spot generations abandoned mid-way
+        self.redis.hset(
+            f"draft:{draft_id}",
+            mapping={"status": status.value, "status_at": datetime.utcnow().isoformat()},
+        )
+
+    async def get_draft(self, draft_id: str, promote: bool = True) -> Optional[BlogDraft]:
+        """Get draft by ID.
+
+        ``promote`` counts the read as an access: the body of a cold draft
+        moves back into Redis. Listings pass False and read it from disk.
+        """
         draft_data = self.redis.hgetall(f"draft:{draft_id}")
         if not draft_data:
             return None
+        if draft_data.get(TIER_FIELD) == COLD_TIER:
+            draft_data["content"] = (
+                await asyncio.to_thread(tiering_service.read_draft, draft_id, promote) or ""
+            )
+        elif promote:
+            tiering_service.touch(f"draft:{draft_id}", draft_data.get("accessed_at"))
 
         return BlogDraft(
             id=draft_id,
@@ -102,12 +176,32 @@ class BlogService:
         draft_id: str,
         update: BlogDraftUpdate,
     ) -> BlogDraft:
-        """Update draft content"""
-        draft = await self.get_draft(draft_id)
-        if not draft:
-            raise ValueError("Draft not found")
+        """Update draft content.
+
+        The fields, the version bump and the version record commit in one
+        WATCH/MULTI transaction, retried when the draft changed meanwhile,
+        so concurrent updates never both delta against the same base.
+        """
+        draft_key = f"draft:{draft_id}"
+        while True:
+            with self.redis.pipeline() as pipe:
+                try:
+                    pipe.watch(draft_key, draft_history_service.key(draft_id))
+                    draft = await self.get_draft(draft_id)
+                    if not draft:
+                        raise ValueError("Draft not found")
+                    pipe.multi()
+                    self._stage_update(pipe, draft, update)
+                    pipe.execute()
+                    break
+                except WatchError:
+                    continue
+
+        # Return updated draft
+        return await self.get_draft(draft_id)
 
-        # Prepare updates
+    def _stage_update(self, pipe, draft: BlogDraft, update: BlogDraftUpdate):
+        draft_key = f"draft:{draft.id}"
         updates = {"updated_at": datetime.utcnow().isoformat()}
 
         if update.title is not None:
@@ -119,36 +213,46 @@ class BlogService:
         if update.tags is not None:
             updates["tags"] = ",".join(update.tags)
 
-        # Update in Redis
-        self.redis.hset(f"draft:{draft_id}", mapping=updates)
-
-        # Return updated draft
-        return await self.get_draft(draft_id)
+        # New content supersedes a cold copy (swept later)
+        pipe.hset(draft_key, mapping=updates)
+        if update.content is not None:
+            pipe.hdel(draft_key, TIER_FIELD)
+
+        # Record a new version when the content actually changed
+        if update.content is not None and update.content != draft.content:
+            draft_history_service.ensure_baseline(draft.id, draft.version, draft.content, pipe=pipe)
+            version = draft.version + 1
+            pipe.hset(draft_key, "version", str(version))
+            draft_history_service.record_version(
+                draft.id, version, update.content, previous=draft.content, pipe=pipe
+            )
 
     async def generate_content(
         self,
         draft_id: str,
         instructions: Optional[str] = None,
+        doc_context: Optional[str] = None,
+        usage: Optional[Dict[str, int]] = None,
     ) -> AsyncIterator[str]:
-        """Generate blog content using OpenAI (streaming)"""
+        """Generate blog content using OpenAI (streaming)
+
+        ``doc_context`` skips retrieval when the caller already packed the
+        document context (batch generation shares one pass across drafts).
+        ``usage`` is filled with token counts reported by the provider.
+        """
         draft = await self.get_draft(draft_id)
         if not draft:
             raise ValueError("Draft not found")
 
         # Update status
-        self.redis.hset(f"draft:{draft_id}", "status", BlogStatus.GENERATING.value)
+        self._set_status(draft_id, BlogStatus.GENERATING)
 
         try:
-            import openai
-            from backend.config import settings
-
-            # Configure OpenAI
-            client = openai.AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
-
             # Build the prompt
             prompt = instructions or f"Write a comprehensive blog post titled '{draft.title}'"
 
-            doc_context = await self._collect_document_context(draft, instructions)
+            if doc_context is None:
+                doc_context = await self._collect_document_context(draft, instructions)
 
             system_prompt = """You are a professional blog writer. Create engaging, well-structured blog content.
 Use markdown formatting with proper headings, paragraphs, and bullet points where appropriate.
@@ -156,25 +260,12 @@ Make the content informative, engaging, and easy to read."""
 
             if doc_context:
                 system_prompt += f"\n\nUse the following document content as reference:\n{doc_context}"
-            
+
             # Stream response from OpenAI
             full_content = ""
-            stream = await client.chat.completions.create(
-                model=settings.DEFAULT_LLM_MODEL or "gpt-4-turbo-preview",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": prompt}
-                ],
-                stream=True,
-                max_tokens=4000,
-                temperature=0.7,
-            )
-            
-            async for chunk in stream:
-                if chunk.choices and chunk.choices[0].delta.content:
-                    content = chunk.choices[0].delta.content
-                    full_content += content
-                    yield content
+            async for content in self._stream_completion(system_prompt, prompt, usage):
+                full_content += content
+                yield content
 
             # Update draft with generated content
             await self.update_draft(
@@ -183,13 +274,148 @@ Make the content informative, engaging, and easy to read."""
             )
 
             # Update status
-            self.redis.hset(f"draft:{draft_id}", "status", BlogStatus.COMPLETED.value)
+            self._set_status(draft_id, BlogStatus.COMPLETED)
 
         except Exception as e:
             # Mark as failed
-            self.redis.hset(f"draft:{draft_id}", "status", BlogStatus.FAILED.value)
+            self._set_status(draft_id, BlogStatus.FAILED)
             raise
 
+    async def generate_content_parallel(
+        self,
+        draft_id: str,
+        instructions: Optional[str] = None,
+        usage: Optional[Dict[str, int]] = None,
+    ) -> AsyncIterator[str]:
+        """Generate an outline, then write its sections concurrently (streaming)
+
+        Sections run under ``GENERATION_SECTION_CONCURRENCY``, each with its own
+        retrieved context, and are streamed in outline order: the section at
+        the head of the stream is forwarded live while later ones buffer, so
+        a long post takes about as long as its slowest section.
+        Falls back to :meth:`generate_content` when no outline is produced.
+        """
+        draft = await self.get_draft(draft_id)
+        if not draft:
+            raise ValueError("Draft not found")
+
+        self._set_status(draft_id, BlogStatus.GENERATING)
+
+        try:
+            outline_sections = await self._generate_outline(draft, instructions, usage)
+        except Exception:
+            self._set_status(draft_id, BlogStatus.FAILED)
+            raise
+
+        if not outline_sections:
+            async for content in self.generate_content(draft_id, instructions, usage=usage):
+                yield content
+            return
+
+        post_outline = "\n".join(heading for heading, _ in outline_sections)
+        system_prompt = """You are a professional blog writer working on one section of a longer post.
+Write ONLY the requested section: start with its exact heading line, use markdown formatting,
+and do not write an introduction or conclusion for the whole post unless that is the section."""
+
+        semaphore = asyncio.Semaphore(max(1, settings.GENERATION_SECTION_CONCURRENCY))
+        queues: List[asyncio.Queue] = [asyncio.Queue() for _ in outline_sections]
+
+        async def write_section(index: int, heading: str, brief: str):
+            async with semaphore:
+                try:
+                    doc_context = await self.build_document_context(
+                        draft.user_id,
+                        draft.document_ids,
+                        f"{draft.title} {heading.lstrip('#').strip()}",
+                    )
+                    user_prompt = f"""Post title: {draft.title}
+{f"Instructions: {instructions}" if instructions else ""}
+
+Post outline:
+{post_outline}
+
+Write this section:
+{brief}"""
+                    if doc_context:
+                        user_prompt += f"\n\nUse the following document content as reference:\n{doc_context}"
+
+                    async for chunk in self._stream_completion(
+                        system_prompt,
+                        user_prompt,
+                        usage,
+                        max_tokens=settings.GENERATION_SECTION_MAX_TOKENS,
+                    ):
+                        queues[index].put_nowait(chunk)
+                    queues[index].put_nowait(None)
+                except Exception as exc:
+                    queues[index].put_nowait(exc)
+
+        tasks = [
+            asyncio.create_task(write_section(index, heading, brief))
+            for index, (heading, brief) in enumerate(outline_sections)
+        ]
+
+        try:
+            header = f"# {draft.title}\n\n"
+            full_content = header
+            yield header
+
+            for queue in queues:
+                while True:
+                    item = await queue.get()
+                    if item is None:
+                        break
+                    if isinstance(item, Exception):
+                        raise item
+                    full_content += item
+                    yield item
+                full_content += "\n\n"
+                yield "\n\n"
+
+            await self.update_draft(
+                draft_id,
+                BlogDraftUpdate(content=full_content.rstrip() + "\n"),
+            )
+            self._set_status(draft_id, BlogStatus.COMPLETED)
+
+        except Exception:
+            self._set_status(draft_id, BlogStatus.FAILED)
+            raise
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _generate_outline(
+        self,
+        draft: BlogDraft,
+        instructions: Optional[str],
+        usage: Optional[Dict[str, int]] = None,
+    ) -> List[tuple]:
+        """Ask for a section outline and return ``(heading line, section brief)`` pairs"""
+        system_prompt = f"""You are a professional blog writer planning a post.
+Output only an outline in markdown: one "## " heading per section (at most {settings.GENERATION_MAX_SECTIONS}),
+each followed by one or two bullet points describing what the section covers."""
+        user_prompt = f"Plan a blog post titled '{draft.title}'."
+        if instructions:
+            user_prompt += f"\n\nInstructions:\n{instructions}"
+
+        outline_markdown = ""
+        async for chunk in self._stream_completion(system_prompt, user_prompt, usage, max_tokens=600):
+            outline_markdown += chunk
+
+        sections = [s for s in parse_sections(outline_markdown) if s.level > 0]
+        if not sections:
+            return []
+        top_level = min(s.level for s in sections)
+        return [
+            (
+                f"{'#' * max(2, s.level)} {s.title}",
+                section_text(outline_markdown, s).strip(),
+            )
+            for s in sections
+            if s.level == top_level
+        ][: settings.GENERATION_MAX_SECTIONS]
+
     async def refine_content(
         self,
         draft_id: str,
@@ -201,49 +427,16 @@ Make the content informative, engaging, and easy to read."""
             raise ValueError("Draft not found")
 
         # Update status
-        self.redis.hset(f"draft:{draft_id}", "status", BlogStatus.GENERATING.value)
+        self._set_status(draft_id, BlogStatus.GENERATING)
 
         try:
-            import openai
-            from backend.config import settings
-            
-            # Configure OpenAI
-            client = openai.AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
-            
-            # Build the refinement prompt with current content
-            system_prompt = """You are a professional blog editor. Your task is to refine and improve blog content based on feedback.
-Maintain the overall structure and topic while incorporating the requested changes.
-Output the complete revised blog post in markdown format."""
-            
-            user_prompt = f"""Here is the current blog post:
-
-{draft.content}
+            system_prompt, user_prompt = self._full_refine_prompts(draft.content, feedback)
 
----
-
-Please refine this blog post based on the following feedback:
-{feedback}
-
-Provide the complete revised blog post:"""
-            
             # Stream response from OpenAI
             full_content = ""
-            stream = await client.chat.completions.create(
-                model=settings.DEFAULT_LLM_MODEL or "gpt-4-turbo-preview",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                stream=True,
-                max_tokens=4000,
-                temperature=0.7,
-            )
-            
-            async for chunk in stream:
-                if chunk.choices and chunk.choices[0].delta.content:
-                    content = chunk.choices[0].delta.content
-                    full_content += content
-                    yield content
+            async for content in self._stream_completion(system_prompt, user_prompt):
+                full_content += content
+                yield content
 
             # Update draft with refined content
             await self.update_draft(
@@ -252,20 +445,172 @@ Provide the complete revised blog post:"""
             )
 
             # Update status
-            self.redis.hset(f"draft:{draft_id}", "status", BlogStatus.COMPLETED.value)
+            self._set_status(draft_id, BlogStatus.COMPLETED)
 
         except Exception as e:
             # Mark as failed
-            self.redis.hset(f"draft:{draft_id}", "status", BlogStatus.FAILED.value)
+            self._set_status(draft_id, BlogStatus.FAILED)
+            raise
+
+    async def refine_sections(
+        self,
+        draft_id: str,
+        feedback: str,
+        anchors: Optional[List[str]] = None,
+    ) -> AsyncIterator[dict]:
+        """Refine only the sections matching the feedback or anchors (streaming events)
+
+        Yields ``plan``, ``section_start``, ``content``, ``section_done`` and a
+        final ``done`` event carrying token accounting against a full-rewrite
+        refine. Falls back to a full refine when no section matches.
+        """
+        draft = await self.get_draft(draft_id)
+        if not draft:
+            raise ValueError("Draft not found")
+
+        sections = parse_sections(draft.content)
+        targets = select_sections(draft.content, sections, feedback, anchors)
+        if not targets:
+            yield {"type": "plan", "mode": "full", "sections": []}
+            async for chunk in self.refine_content(draft_id, feedback):
+                yield {"type": "content", "anchor": None, "content": chunk}
+            yield {"type": "done", "mode": "full"}
+            return
+
+        yield {
+            "type": "plan",
+            "mode": "section",
+            "sections": [target.anchor for target in targets],
+        }
+
+        self._set_status(draft_id, BlogStatus.GENERATING)
+
+        system_prompt = """You are a professional blog editor. You are revising ONE section of a longer blog post.
+Apply the feedback to this section only, keep its heading line and markdown formatting,
+and output only the revised section with no commentary."""
+        post_outline = outline(sections)
+
+        try:
+            usage: Dict[str, int] = {}
+            scoped_estimate = 0
+            replacements = []
+            for target in targets:
+                original = section_text(draft.content, target)
+                user_prompt = f"""Post title: {draft.title}
+
+Post outline:
+{post_outline}
+
+Section to revise:
+{original}
+
+---
+
+Feedback:
+{feedback}
+
+Provide the revised section:"""
+
+                yield {"type": "section_start", "anchor": target.anchor, "title": target.title}
+                revised = ""
+                async for chunk in self._stream_completion(system_prompt, user_prompt, usage):
+                    revised += chunk
+                    yield {"type": "content", "anchor": target.anchor, "content": chunk}
+                yield {"type": "section_done", "anchor": target.anchor}
+
+                scoped_estimate += self._estimate_tokens(system_prompt + user_prompt + revised)
+                replacements.append((target, revised))
+
+            await self.update_draft(
+                draft_id,
+                BlogDraftUpdate(content=splice_sections(draft.content, replacements)),
+            )
+            self._set_status(draft_id, BlogStatus.COMPLETED)
+
+        except Exception:
+            self._set_status(draft_id, BlogStatus.FAILED)
             raise
 
+        # A full rewrite sends the whole post and receives it back in full
+        full_system, full_user = self._full_refine_prompts(draft.content, feedback)
+        full_estimate = self._estimate_tokens(full_system + full_user + draft.content)
+        yield {
+            "type": "done",
+            "mode": "section",
+            "tokens": {
+                "full_rewrite_estimate": full_estimate,
+                "scoped_estimate": scoped_estimate,
+                "saved": max(0, full_estimate - scoped_estimate),
+                "reported_usage": usage,
+            },
+        }
+
+    @staticmethod
+    def _full_refine_prompts(content: str, feedback: str):
+        """System and user prompts for a full-rewrite refine"""
+        system_prompt = """You are a professional blog editor. Your task is to refine and improve blog content based on feedback.
+Maintain the overall structure and topic while incorporating the requested changes.
+Output the complete revised blog post in markdown format."""
+
+        user_prompt = f"""Here is the current blog post:
+
+{content}
+
+---
+
+Please refine this blog post based on the following feedback:
+{feedback}
+
+Provide the complete revised blog post:"""
+
+        return system_prompt, user_prompt
+
+    @staticmethod
+    def _estimate_tokens(text: str) -> int:
+        """Rough token estimate (~4 characters per token)"""
+        return (len(text) + 3) // 4
+
+    async def _stream_completion(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        usage: Optional[Dict[str, int]] = None,
+        max_tokens: int = 4000,
+    ) -> AsyncIterator[str]:
+        """Stream a chat completion, accumulating token usage when requested."""
+        import openai
+
+        client = openai.AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+        extra = {"stream_options": {"include_usage": True}} if usage is not None else {}
+
+        stream = await client.chat.completions.create(
+            model=settings.DEFAULT_LLM_MODEL or "gpt-4-turbo-preview",
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            stream=True,
+            max_tokens=max_tokens,
+            temperature=0.7,
+            **extra,
+        )
+
+        async for chunk in stream:
+            if usage is not None and getattr(chunk, "usage", None):
+                usage["prompt_tokens"] = usage.get("prompt_tokens", 0) + chunk.usage.prompt_tokens
+                usage["completion_tokens"] = (
+                    usage.get("completion_tokens", 0) + chunk.usage.completion_tokens
+                )
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
     async def list_drafts(self, user_id: str) -> List[BlogDraft]:
         """List user's drafts"""
         draft_ids = self.redis.smembers(f"user:{user_id}:drafts")
         drafts = []
 
         for draft_id in draft_ids:
-            draft = await self.get_draft(draft_id)
+            draft = await self.get_draft(draft_id, promote=False)
             if draft:
                 drafts.append(draft)
 
@@ -279,14 +624,16 @@ Provide the complete revised blog post:"""
         if not self.redis.sismember(f"user:{user_id}:drafts", draft_id):
             return False
 
-        draft = await self.get_draft(draft_id)
+        draft = await self.get_draft(draft_id, promote=False)
         if draft:
             # Remove from session
             self.redis.srem(f"session:{draft.session_id}:drafts", draft_id)
 
-        # Delete from Redis
-        self.redis.delete(f"draft:{draft_id}")
+        # Delete from Redis (UNLINK frees large values off the main thread)
+        await asyncio.to_thread(tiering_service.forget, f"draft:{draft_id}")
+        self.redis.unlink(f"draft:{draft_id}")
         self.redis.srem(f"user:{user_id}:drafts", draft_id)
+        draft_history_service.delete_history(draft_id)
 
         return True
 
@@ -301,11 +648,25 @@ Provide the complete revised blog post:"""
             return ""
 
         query = instructions or draft.title or "blog content"
+        return await self.build_document_context(draft.user_id, draft.document_ids, query)
+
+    async def build_document_context(
+        self,
+        user_id: str,
+        document_ids: List[str],
+        query: str,
+    ) -> str:
+        """Retrieve and pack document context for a query over ``document_ids``."""
+
+        if not document_ids:
+            return ""
+
         results = await document_service.search_document_chunks(
-            user_id=draft.user_id,
+            user_id=user_id,
             query=query,
-            document_ids=draft.document_ids,
+            document_ids=document_ids,
             top_k=settings.TOP_K_RESULTS,
+            snippets=settings.CONTEXT_SNIPPETS or None,
         )
 
         if results:
@@ -321,13 +682,14 @@ Provide the complete revised blog post:"""
                 joined = "\n\n".join(context_blocks)
                 return joined[: self.max_context_chars]
 
-        # Fallback to previously stored extracted text
+        # Fallback to the start of each document's stored chunks
         context = ""
-        for doc_id in draft.document_ids:
-            doc_data = self.redis.hgetall(f"document:{doc_id}")
-            if doc_data and doc_data.get("extracted_text"):
-                context += f"\n\n--- Document: {doc_data.get('filename', doc_id)} ---\n"
-                context += doc_data.get("extracted_text", "")[:2000]
+        for doc_id in document_ids:
+            filename = self.redis.hget(f"document:{doc_id}", "filename")
+            excerpt = await document_service.get_document_excerpt(doc_id, 2000) if filename else ""
+            if excerpt:
+                context += f"\n\n--- Document: {filename} ---\n"
+                context += excerpt
 
         return context[: self.max_context_chars]
 
@@ -1,40 +1,86 @@
 """Document processing service with RAG indexing support"""
 
+import asyncio
+import contextlib
+import hashlib
+import json
 import logging
 import os
-import shutil
+import time
 import uuid
+import zlib
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple
 
 from fastapi import UploadFile
-from langchain_core.documents import Document as LCDocument
-from langchain_text_splitters import RecursiveCharacterTextSplitter
+from redis.exceptions import ResponseError
 
 from backend.config import settings
+from backend.core import chunk_codec, pdf_layout
+from backend.core.passages import best_passages
 from backend.core.database import db
+from backend.services.embedding_service import embedding_service
+from backend.services.ocr_service import ocr_service
+from backend.services.rerank_service import rerank_service
+from backend.services.search_index import search_index
+from backend.services.tiering_service import TIER_FIELD, COLD_TIER, tiering_service
+from backend.services.transcription_service import transcription_service
 from backend.models.documents import (
     Document,
     DocumentType,
     ProcessingStatus,
     SearchResult,
+    Snippet,
+    UploadSession,
 )
 
+if TYPE_CHECKING:  # LangChain is imported on first chunking, not at startup
+    from langchain_core.documents import Document as LCDocument
+
 
 logger = logging.getLogger(__name__)
 
+_COPY_CHUNK_SIZE = 1024 * 1024
+# Document ids per terms query when carrying chunks over during a reindex
+_REINDEX_COPY_BATCH = 5000
+_SNIPPET_SEPARATOR = "\n...\n"
+# Hash fields a Document is built from; HMGET skips everything else
+_DOCUMENT_FIELDS = (
+    "user_id",
+    "filename",
+    "file_type",
+    "file_path",
+    "size",
+    "status",
+    "created_at",
+    "processed_at",
+    "chunk_count",
+)
+
+
+class UploadConflictError(ValueError):
+    """Chunked upload is not at the state the request assumed"""
+
+    def __init__(self, expected: int, message: Optional[str] = None):
+        super().__init__(message or f"Upload offset mismatch. Resume from byte {expected}")
+        self.expected = expected
+
 
 class DocumentService:
     """Handles document upload and processing"""
 
     def __init__(self):
         self.redis = db.redis
-        self.elasticsearch = db.elasticsearch
+        self.raw_redis = db.raw_redis
         self.upload_dir = Path(settings.UPLOAD_DIR)
         self.upload_dir.mkdir(parents=True, exist_ok=True)
-        self._es_index = "documents"
-        self._es_index_ready = False
+        # Incremental SHA-256 state per in-flight chunked upload: (hasher, offset, last used)
+        self._upload_hashers: Dict[str, tuple] = {}
+
+    @property
+    def elasticsearch(self):
+        return db.elasticsearch
 
     def _get_document_type(self, filename: str) -> DocumentType:
         """Determine document type from filename"""
@@ -55,10 +101,15 @@ class DocumentService:
     async def upload_document(
         self, user_id: str, file: UploadFile
     ) -> Document:
-        """Upload and save a document"""
+        """Upload and save a document
+
+        The body is copied in fixed-size chunks with writes off the event
+        loop; the size limit and content hash are enforced as bytes arrive
+        rather than trusting ``file.size``.
+        """
         doc_id = str(uuid.uuid4())
 
-        # Validate file size
+        # Validate declared file size early
         if file.size and file.size > settings.MAX_UPLOAD_SIZE:
             raise ValueError(f"File too large. Max size: {settings.MAX_UPLOAD_SIZE} bytes")
 
@@ -69,19 +120,47 @@ class DocumentService:
         file_path = self.upload_dir / user_id / doc_id / file.filename
         file_path.parent.mkdir(parents=True, exist_ok=True)
 
-        with open(file_path, "wb") as f:
-            shutil.copyfileobj(file.file, f)
+        hasher = hashlib.sha256()
+        size = 0
+        out = await asyncio.to_thread(open, file_path, "wb")
+        try:
+            while chunk := await file.read(_COPY_CHUNK_SIZE):
+                size += len(chunk)
+                if size > settings.MAX_UPLOAD_SIZE:
+                    raise ValueError(f"File too large. Max size: {settings.MAX_UPLOAD_SIZE} bytes")
+                hasher.update(chunk)
+                await asyncio.to_thread(out.write, chunk)
+        except Exception:
+            await asyncio.to_thread(out.close)
+            file_path.unlink(missing_ok=True)
+            raise
+        await asyncio.to_thread(out.close)
+
+        return self._create_document_record(
+            doc_id, user_id, file.filename, file_type, file_path, size, hasher.hexdigest()
+        )
 
-        # Create document record
+    def _create_document_record(
+        self,
+        doc_id: str,
+        user_id: str,
+        filename: str,
+        file_type: DocumentType,
+        file_path: Path,
+        size: int,
+        content_hash: str,
+    ) -> Document:
+        created_at = datetime.utcnow()
         document = {
             "id": doc_id,
             "user_id": user_id,
-            "filename": file.filename,
+            "filename": filename,
             "file_type": file_type.value,
             "file_path": str(file_path),
-            "size": file.size or os.path.getsize(file_path),
+            "size": size,
+            "content_hash": content_hash,
             "status": ProcessingStatus.PENDING.value,
-            "created_at": datetime.utcnow().isoformat(),
+            "created_at": created_at.isoformat(),
         }
 
         # Store in Redis
@@ -91,19 +170,236 @@ class DocumentService:
         return Document(
             id=doc_id,
             user_id=user_id,
-            filename=file.filename,
+            filename=filename,
             file_type=file_type,
             file_path=str(file_path),
-            size=document["size"],
+            size=size,
             status=ProcessingStatus.PENDING,
-            created_at=datetime.utcnow(),
+            created_at=created_at,
+        )
+
+    async def init_upload(
+        self,
+        user_id: str,
+        filename: str,
+        size: Optional[int] = None,
+        sha256: Optional[str] = None,
+    ) -> UploadSession:
+        """Start a resumable chunked upload"""
+        if size is not None and size > settings.MAX_UPLOAD_SIZE:
+            raise ValueError(f"File too large. Max size: {settings.MAX_UPLOAD_SIZE} bytes")
+
+        file_type = self._get_document_type(filename)
+        upload_id = str(uuid.uuid4())
+        part_path = self.upload_dir / user_id / upload_id / f"{Path(filename).name}.part"
+        part_path.parent.mkdir(parents=True, exist_ok=True)
+        part_path.touch()
+
+        created_at = datetime.utcnow()
+        upload = {
+            "id": upload_id,
+            "user_id": user_id,
+            "filename": Path(filename).name,
+            "file_type": file_type.value,
+            "part_path": str(part_path),
+            "received": "0",
+            "expected_size": str(size) if size is not None else "",
+            "sha256": (sha256 or "").lower(),
+            "created_at": created_at.isoformat(),
+        }
+        self.redis.hset(f"upload:{upload_id}", mapping=upload)
+        self.redis.expire(f"upload:{upload_id}", settings.UPLOAD_SESSION_TTL_SECONDS)
+        self._remember_hasher(upload_id, hashlib.sha256(), 0)
+
+        return self._upload_session(upload)
+
+    async def get_upload(self, user_id: str, upload_id: str) -> Optional[UploadSession]:
+        """Get chunked upload progress (used by clients to resume)"""
+        upload = self._load_upload(user_id, upload_id)
+        return self._upload_session(upload) if upload else None
+
+    async def append_upload(
+        self,
+        user_id: str,
+        upload_id: str,
+        offset: int,
+        chunks: AsyncIterator[bytes],
+    ) -> Optional[UploadSession]:
+        """Append streamed bytes at ``offset``
+
+        Bytes are written as they arrive. If the stream breaks, everything
+        received so far is kept, so the client resumes from
+        ``received_bytes`` instead of restarting the upload.
+        """
+        upload = self._load_upload(user_id, upload_id)
+        if not upload:
+            return None
+
+        lock_key = self._lock_upload(upload_id, int(upload["received"]))
+        try:
+            # Another append may have committed between the read and the lock
+            upload = self._load_upload(user_id, upload_id)
+            if not upload:
+                return None
+            received = int(upload["received"])
+            if offset != received:
+                raise UploadConflictError(received)
+
+            part_path = Path(upload["part_path"])
+            hasher = await self._upload_hasher(upload_id, part_path, received)
+            limit = settings.MAX_UPLOAD_SIZE
+            if upload["expected_size"]:
+                limit = min(limit, int(upload["expected_size"]))
+            out = await asyncio.to_thread(open, part_path, "r+b")
+        except BaseException:
+            self.redis.delete(lock_key)
+            raise
+
+        try:
+            await asyncio.to_thread(out.seek, received)
+            async for chunk in chunks:
+                if not chunk:
+                    continue
+                if received + len(chunk) > limit:
+                    raise ValueError(f"Upload exceeds allowed size of {limit} bytes")
+                await asyncio.to_thread(out.write, chunk)
+                hasher.update(chunk)
+                received += len(chunk)
+        finally:
+            # Keep whatever arrived intact; drop any bytes past the committed offset
+            await asyncio.to_thread(out.truncate, received)
+            await asyncio.to_thread(out.close)
+            self._remember_hasher(upload_id, hasher, received)
+            self.redis.hset(f"upload:{upload_id}", "received", str(received))
+            self.redis.delete(lock_key)
+
+        upload["received"] = str(received)
+        return self._upload_session(upload)
+
+    async def complete_upload(self, user_id: str, upload_id: str) -> Optional[Document]:
+        """Verify size and hash, then register the uploaded file as a document"""
+        upload = self._load_upload(user_id, upload_id)
+        if not upload:
+            return None
+
+        lock_key = self._lock_upload(upload_id, int(upload["received"]))
+        try:
+            # A concurrent complete may have finished while we waited
+            upload = self._load_upload(user_id, upload_id)
+            if not upload:
+                return None
+            received = int(upload["received"])
+            if upload["expected_size"] and received != int(upload["expected_size"]):
+                raise UploadConflictError(received, f"Upload incomplete. Resume from byte {received}")
+
+            part_path = Path(upload["part_path"])
+            hasher = await self._upload_hasher(upload_id, part_path, received)
+            content_hash = hasher.hexdigest()
+            if upload["sha256"] and upload["sha256"] != content_hash:
+                raise ValueError("Content hash mismatch")
+
+            file_path = part_path.with_name(upload["filename"])
+            await asyncio.to_thread(part_path.rename, file_path)
+
+            self.redis.delete(f"upload:{upload_id}")
+            self._upload_hashers.pop(upload_id, None)
+        finally:
+            self.redis.delete(lock_key)
+
+        return self._create_document_record(
+            upload_id,
+            user_id,
+            upload["filename"],
+            DocumentType(upload["file_type"]),
+            file_path,
+            received,
+            content_hash,
         )
 
+    async def abort_upload(self, user_id: str, upload_id: str) -> bool:
+        """Cancel a chunked upload and remove its partial file"""
+        upload = self._load_upload(user_id, upload_id)
+        if not upload:
+            return False
+
+        part_path = Path(upload["part_path"])
+        part_path.unlink(missing_ok=True)
+        try:
+            part_path.parent.rmdir()
+        except OSError:
+            pass
+        self.redis.delete(f"upload:{upload_id}")
+        self._upload_hashers.pop(upload_id, None)
+        return True
+
+    def _lock_upload(self, upload_id: str, received: int) -> str:
+        """Take the per-upload lock shared by append and complete"""
+        lock_key = f"upload:{upload_id}:lock"
+        if not self.redis.set(lock_key, "1", nx=True, ex=300):
+            raise UploadConflictError(received, "Another request is in progress for this upload")
+        return lock_key
+
+    def _remember_hasher(self, upload_id: str, hasher, received: int):
+        """Keep hash state for the next part, dropping uploads idle past their TTL"""
+        now = time.monotonic()
+        expired = [
+            key
+            for key, (_, _, used_at) in self._upload_hashers.items()
+            if now - used_at > settings.UPLOAD_SESSION_TTL_SECONDS
+        ]
+        for key in expired:
+            del self._upload_hashers[key]
+        self._upload_hashers[upload_id] = (hasher, received, now)
+
+    def _load_upload(self, user_id: str, upload_id: str) -> Optional[dict]:
+        upload = self.redis.hgetall(f"upload:{upload_id}")
+        if not upload or upload.get("user_id") != user_id:
+            return None
+        return upload
+
+    def _upload_session(self, upload: dict) -> UploadSession:
+        return UploadSession(
+            id=upload["id"],
+            filename=upload["filename"],
+            file_type=DocumentType(upload["file_type"]),
+            received_bytes=int(upload["received"]),
+            expected_size=int(upload["expected_size"]) if upload.get("expected_size") else None,
+            chunk_size=settings.UPLOAD_CHUNK_SIZE,
+            created_at=datetime.fromisoformat(upload["created_at"]),
+        )
+
+    async def _upload_hasher(self, upload_id: str, part_path: Path, received: int):
+        """Incremental hasher positioned at ``received`` bytes.
+
+        Rebuilt from the partial file when this process has no state for the
+        upload (restart, or the previous part went to another worker).
+        """
+        hasher, offset, _ = self._upload_hashers.get(upload_id, (None, -1, 0))
+        if hasher is not None and offset == received:
+            return hasher
+
+        def rehash():
+            rebuilt = hashlib.sha256()
+            with open(part_path, "rb") as partial:
+                remaining = received
+                while remaining > 0:
+                    block = partial.read(min(_COPY_CHUNK_SIZE, remaining))
+                    if not block:
+                        break
+                    rebuilt.update(block)
+                    remaining -= len(block)
+            return rebuilt
+
+        hasher = await asyncio.to_thread(rehash)
+        self._remember_hasher(upload_id, hasher, received)
+        return hasher
+
     async def get_document(self, doc_id: str) -> Optional[Document]:
         """Get document by ID"""
-        doc_data = self.redis.hgetall(f"document:{doc_id}")
-        if not doc_data:
+        values = self.redis.hmget(f"document:{doc_id}", _DOCUMENT_FIELDS)
+        if values[0] is None:
             return None
+        doc_data = dict(zip(_DOCUMENT_FIELDS, values, strict=True))
 
         return Document(
             id=doc_id,
@@ -145,66 +441,43 @@ class DocumentService:
         # Get document data
         doc = await self.get_document(doc_id)
         if doc:
-            # Delete file
-            try:
+            # Delete file (it might already be gone) and its directory if empty
+            with contextlib.suppress(OSError):
                 Path(doc.file_path).unlink()
-                # Try to delete parent directories if empty
                 Path(doc.file_path).parent.rmdir()
-            except Exception:
-                pass  # File might already be deleted
 
-        # Delete from Redis and search index
-        self.redis.delete(f"document:{doc_id}")
-        self.redis.delete(f"document:{doc_id}:content")
+        # Delete from Redis and search index (UNLINK frees the chunks off the main thread)
+        await asyncio.to_thread(tiering_service.forget, f"document:{doc_id}")
+        self.redis.unlink(f"document:{doc_id}", f"document:{doc_id}:content")
+        self._extraction_path(doc_id).unlink(missing_ok=True)
         self.redis.srem(f"user:{user_id}:documents", doc_id)
 
-        await self._delete_indexed_chunks(doc_id)
+        await self._delete_indexed_chunks(doc_id, user_id)
 
         return True
 
     async def process_document(self, doc_id: str):
         """Process document (extract, chunk, index)"""
         # Update status
-        self.redis.hset(f"document:{doc_id}", "status", ProcessingStatus.PROCESSING.value)
+        self.redis.hset(
+            f"document:{doc_id}",
+            mapping={
+                "status": ProcessingStatus.PROCESSING.value,
+                "processing_started_at": datetime.utcnow().isoformat(),
+            },
+        )
 
         try:
             doc = await self.get_document(doc_id)
             if not doc:
                 raise ValueError("Document not found")
 
-            chunks = await self._extract_and_chunk(doc)
-
-            # Store chunk content for quick retrieval
-            self.redis.delete(f"document:{doc_id}:content")
-            chunk_texts = []
-            for i, chunk in enumerate(chunks):
-                content = (chunk.page_content or "").strip()
-                if not content:
-                    continue
-                chunk_texts.append(content)
-                self.redis.hset(
-                    f"document:{doc_id}:content",
-                    f"chunk_{i}",
-                    content,
-                )
-
-            extracted_text = "\n\n".join(chunk_texts)
-            chunk_count = len(chunk_texts)
-
-            # Update metadata on the document itself
-            self.redis.hset(
-                f"document:{doc_id}",
-                mapping={
-                    "status": ProcessingStatus.COMPLETED.value,
-                    "processed_at": datetime.utcnow().isoformat(),
-                    "chunk_count": str(chunk_count),
-                    "extracted_text": extracted_text[:50000],
-                },
-            )
+            extraction = await self._extract(doc)
+            await asyncio.to_thread(self._save_extraction, doc_id, extraction)
 
-            # Index chunks for ElasticSearch-backed retrieval
-            if chunk_texts:
-                await self._index_chunks(doc, chunk_texts)
+            chunks = await asyncio.to_thread(self._chunk_extraction, extraction, doc.file_path)
+            await self._delete_indexed_chunks(doc_id, doc.user_id)
+            await self._store_chunks(doc, chunks)
 
         except Exception as e:
             # Mark as failed
@@ -213,18 +486,183 @@ class DocumentService:
                 mapping={
                     "status": ProcessingStatus.FAILED.value,
                     "error_message": str(e),
+                    "failed_at": datetime.utcnow().isoformat(),
                 },
             )
             raise
 
+    async def _store_chunks(
+        self,
+        doc: Document,
+        chunks: List["LCDocument"],
+        refresh: bool = True,
+        stamp_field: str = "processed_at",
+    ) -> int:
+        """Swap in a document's chunks and index them; returns the chunk count.
+
+        Chunks are packed into one compressed blob (see
+        ``backend.core.chunk_codec``) and swapped in with a single SET, so
+        readers never see a half-written set.
+        """
+        chunk_texts = []
+        chunk_metadata = []
+        for chunk in chunks:
+            content = (chunk.page_content or "").strip()
+            if content:
+                chunk_texts.append(content)
+                chunk_metadata.append(chunk.metadata)
+
+        content_key = f"document:{doc.id}:content"
+        pipe = self.redis.pipeline()
+        if chunk_texts:
+            pipe.set(content_key, chunk_codec.encode_chunks(chunk_texts))
+        else:
+            pipe.delete(content_key)
+
+        # Update metadata on the document itself
+        pipe.hset(
+            f"document:{doc.id}",
+            mapping={
+                "status": ProcessingStatus.COMPLETED.value,
+                stamp_field: datetime.utcnow().isoformat(),
+                "chunk_count": str(len(chunk_texts)),
+            },
+        )
+        # extracted_text was written by earlier versions; the chunks hold the same
+        # text. A cold copy left by tiering is stale now and gets swept.
+        pipe.hdel(f"document:{doc.id}", "extracted_text", TIER_FIELD)
+        pipe.execute()
+
+        # Index chunks for ElasticSearch-backed retrieval
+        if chunk_texts:
+            await self._index_chunks(doc, chunk_texts, chunk_metadata, refresh=refresh)
+        if chunk_texts and settings.EMBEDDINGS_ENABLED:
+            # Unchanged chunks are cache hits, so re-processing costs no embedding calls
+            try:
+                await embedding_service.embed(chunk_texts)
+            except Exception as e:
+                logger.warning("Embedding chunks of %s failed: %s", doc.id, e)
+        return len(chunk_texts)
+
+    async def reindex_documents(
+        self, concurrency: Optional[int] = None, force: bool = False
+    ) -> Dict[str, Any]:
+        """Re-chunk every processed document from its stored extraction.
+
+        Uses the current ``CHUNK_SIZE``/``CHUNK_OVERLAP`` without touching the
+        original files. With ElasticSearch, chunks are bulk-loaded into a new
+        index version that also receives new writes during the run, and the
+        read alias is flipped to it in one atomic step at the end. Documents
+        that cannot be re-chunked (no stored extraction, or still processing)
+        keep their existing chunks, copied over from the live index. If any
+        document fails, the new version is abandoned unless ``force`` is set.
+        """
+        started = time.perf_counter()
+        started_at = datetime.utcnow().isoformat()
+        concurrency = concurrency or settings.REINDEX_CONCURRENCY
+
+        doc_ids = []
+        for key in self.redis.scan_iter(match="user:*:documents", count=500):
+            doc_ids.extend(self.redis.smembers(key))
+
+        target_index = None
+        if self.elasticsearch and await search_index.ensure():
+            target_index = await search_index.create_version()
+            await search_index.begin(target_index)
+        semaphore = asyncio.Semaphore(concurrency)
+        report: Dict[str, Any] = {
+            "documents": 0,
+            "chunks": 0,
+            "skipped": [],
+            "in_flight": [],
+            "failed": [],
+        }
+
+        async def reindex_one(doc_id: str):
+            async with semaphore:
+                doc = await self.get_document(doc_id)
+                if not doc or doc.status == ProcessingStatus.FAILED:
+                    return
+                if doc.status != ProcessingStatus.COMPLETED:
+                    report["in_flight"].append(doc_id)
+                    return
+                extraction = await asyncio.to_thread(self._load_extraction, doc_id)
+                if extraction is None:
+                    # Processed before extractions were stored
+                    report["skipped"].append(doc_id)
+                    return
+                try:
+                    chunks = await asyncio.to_thread(
+                        self._chunk_extraction, extraction, doc.file_path
+                    )
+                    report["chunks"] += await self._store_chunks(
+                        doc, chunks, refresh=False, stamp_field="reindexed_at"
+                    )
+                    report["documents"] += 1
+                except Exception as exc:
+                    logger.warning("Reindex failed for %s: %s", doc_id, exc)
+                    report["failed"].append(doc_id)
+
+        await asyncio.gather(*(reindex_one(doc_id) for doc_id in doc_ids))
+
+        report["promoted"] = False
+        if target_index:
+            report["copied"] = 0
+            carried = report["skipped"] + report["in_flight"]
+            try:
+                for start in range(0, len(carried), _REINDEX_COPY_BATCH):
+                    batch = carried[start:start + _REINDEX_COPY_BATCH]
+                    report["copied"] += await search_index.copy(
+                        search_index.read_alias, target_index, {"terms": {"document_id": batch}}
+                    )
+            except Exception as exc:
+                logger.warning("Copying unchanged chunks into %s failed: %s", target_index, exc)
+                report["failed"].extend(carried)
+
+            if report["failed"] and not force:
+                # Keep serving the old version; documents processed during the run go back to it
+                processed = await asyncio.to_thread(self._processed_since, doc_ids, started_at)
+                await search_index.abort(
+                    target_index,
+                    restore={"terms": {"document_id": processed}} if processed else None,
+                )
+            else:
+                await search_index.finish(target_index)
+                await search_index.promote(target_index)
+                report["promoted"] = True
+
+        elapsed = time.perf_counter() - started
+        report.update(
+            index=target_index,
+            chunk_size=settings.CHUNK_SIZE,
+            chunk_overlap=settings.CHUNK_OVERLAP,
+            seconds=round(elapsed, 3),
+            documents_per_second=round(report["documents"] / elapsed, 2) if elapsed else 0.0,
+            chunks_per_second=round(report["chunks"] / elapsed, 2) if elapsed else 0.0,
+        )
+        return report
+
     async def search_document_chunks(
         self,
         user_id: str,
         query: str,
         document_ids: Optional[List[str]] = None,
         top_k: int = settings.TOP_K_RESULTS,
+        snippets: Optional[int] = None,
+        snippet_size: Optional[int] = None,
+        rerank: Optional[bool] = None,
     ) -> List[SearchResult]:
-        """Search processed document chunks for RAG."""
+        """Search processed document chunks for RAG.
+
+        With ``snippets``, each result carries only its best-matching
+        passages (about ``snippet_size`` chars each) instead of the whole
+        chunk; ``content`` is then those passages joined. With ``rerank``
+        (default ``RERANK_ENABLED``), ``RERANK_CANDIDATES`` hits are fetched
+        and rescored before the top ``top_k`` are returned.
+        """
+        snippet_size = snippet_size or settings.SNIPPET_SIZE
+        rerank = settings.RERANK_ENABLED if rerank is None else rerank
+        fetch_k = max(top_k, settings.RERANK_CANDIDATES) if rerank else top_k
 
         user_documents = self.redis.smembers(f"user:{user_id}:documents")
         if not user_documents:
@@ -240,45 +678,143 @@ class DocumentService:
             results = await self._search_with_elasticsearch(
                 query=query,
                 user_id=user_id,
-                document_ids=allowed_docs,
-                top_k=top_k,
+                # Searching everything the user owns needs no document filter
+                document_ids=allowed_docs if len(allowed_docs) < len(user_documents) else None,
+                top_k=fetch_k,
+                snippets=snippets,
+                snippet_size=snippet_size,
             )
             if results:
+                if rerank:
+                    return await rerank_service.rerank(query, results, top_k)
                 return results
 
         # Fallback to Redis-based keyword search
-        return await self._fallback_search(query, allowed_docs, top_k)
+        results = await self._fallback_search(query, allowed_docs, fetch_k)
+        if snippets:
+            for result in results:
+                passages = best_passages(result.content, query, snippet_size, snippets)
+                result.snippets = [
+                    Snippet(text=p.text, start=p.start, end=p.end, score=p.score)
+                    for p in passages
+                ]
+                result.content = _SNIPPET_SEPARATOR.join(p.text for p in passages)
+        if rerank:
+            return await rerank_service.rerank(query, results, top_k)
+        return results
 
+    async def _load_chunks(
+        self, doc_id: str, lazy: bool = False, promote: bool = True
+    ) -> Iterable[str]:
+        """A document's chunks in order (packed blob, legacy hash or cold store).
+
+        ``lazy`` decompresses chunk by chunk as the caller iterates.
+        ``promote`` counts the read as an access: a cold document moves back
+        into Redis.
+        """
+        content_key = f"document:{doc_id}:content"
+        pipe = self.raw_redis.pipeline(transaction=False)
+        pipe.get(content_key)
+        pipe.hmget(f"document:{doc_id}", "user_id", TIER_FIELD, "accessed_at")
+        blob, (user_id, tier, accessed_at) = pipe.execute(raise_on_error=False)
+        cold = blob is None and tier == COLD_TIER.encode()
+        if promote and user_id and not cold:
+            tiering_service.touch(f"document:{doc_id}", accessed_at)
+        if isinstance(blob, ResponseError):  # WRONGTYPE: one hash field per chunk, until re-processed
+            content_data = self.redis.hgetall(content_key)
+            return [
+                chunk
+                for _, chunk in sorted(
+                    content_data.items(),
+                    key=lambda item: int(item[0].split("_")[1]),
+                )
+            ]
+        if cold:
+            blob = await asyncio.to_thread(tiering_service.read_document, doc_id, promote)
+        if not blob:
+            return []
+        return chunk_codec.iter_chunks(blob) if lazy else chunk_codec.decode_chunks(blob)
 
     async def get_document_content(self, doc_id: str) -> str:
         """Get full document content from Redis."""
-        content_data = self.redis.hgetall(f"document:{doc_id}:content")
-        if not content_data:
-            return ""
+        return "\n\n".join(await self._load_chunks(doc_id))
 
-        chunks = sorted(
-            content_data.items(),
-            key=lambda item: int(item[0].split("_")[1]),
-        )
-        return "\n\n".join(chunk for _, chunk in chunks)
+    async def get_document_excerpt(self, doc_id: str, max_chars: int) -> str:
+        """Leading ``max_chars`` of a document, decompressing only what is needed"""
+        parts: List[str] = []
+        size = 0
+        for chunk in await self._load_chunks(doc_id, lazy=True):
+            parts.append(chunk)
+            size += len(chunk) + 2
+            if size >= max_chars:
+                break
+        return "\n\n".join(parts)[:max_chars]
+
+    async def _extract(self, doc: Document) -> Dict[str, Any]:
+        """Extract a document into a re-chunkable form.
 
-    async def _extract_and_chunk(self, doc: Document) -> List[LCDocument]:
+        ``text`` extractions hold plain text, ``layout`` the classified PDF
+        blocks, and ``segments`` timestamped transcript segments.
+        """
         path = Path(doc.file_path)
 
-        if doc.file_type == DocumentType.MARKDOWN:
-            return self._split_text(path.read_text(encoding="utf-8"), path)
-        if doc.file_type == DocumentType.TEXT:
-            return self._split_text(path.read_text(encoding="utf-8"), path)
+        if doc.file_type in (DocumentType.MARKDOWN, DocumentType.TEXT):
+            text = await asyncio.to_thread(path.read_text, encoding="utf-8")
+            return {"kind": "text", "text": text}
         if doc.file_type == DocumentType.PDF:
-            return await self._process_pdf(path)
+            content_hash = self.redis.hget(f"document:{doc.id}", "content_hash")
+            blocks = await self._extract_pdf(path, content_hash)
+            return {"kind": "layout", "blocks": pdf_layout.to_rows(blocks)}
         if doc.file_type == DocumentType.AUDIO:
-            return [self._placeholder_chunk(doc.filename, "audio")]
+            segments = await self._extract_audio(path, doc.filename)
+            if not segments:
+                return {"kind": "text", "text": self._placeholder_text(doc.filename, "audio")}
+            return {"kind": "segments", "segments": segments}
         if doc.file_type == DocumentType.IMAGE:
-            return [self._placeholder_chunk(doc.filename, "image")]
+            return {"kind": "text", "text": await self._extract_image(path, doc.filename)}
 
         raise ValueError(f"Processing not implemented for {doc.file_type}")
 
-    def _split_text(self, text: str, path: Path) -> List[LCDocument]:
+    def _chunk_extraction(self, extraction: Dict[str, Any], source: str) -> List["LCDocument"]:
+        """Split a stored extraction with the current chunking settings"""
+        from langchain_core.documents import Document as LCDocument
+
+        kind = extraction["kind"]
+        if kind == "text":
+            return self._split_text(extraction["text"], Path(source))
+        if kind == "layout":
+            blocks = pdf_layout.from_rows(extraction["blocks"])
+            return [
+                LCDocument(page_content=text, metadata={"source": source, **metadata})
+                for text, metadata in pdf_layout.chunk_blocks(
+                    blocks, settings.CHUNK_SIZE, settings.CHUNK_OVERLAP
+                )
+            ]
+        if kind == "segments":
+            return self._chunk_segments(extraction["segments"], source)
+        raise ValueError(f"Unknown extraction kind: {kind}")
+
+    def _extraction_path(self, doc_id: str) -> Path:
+        return Path(settings.EXTRACTION_DIR) / doc_id[:2] / f"{doc_id}.json.z"
+
+    def _save_extraction(self, doc_id: str, extraction: Dict[str, Any]):
+        path = self._extraction_path(doc_id)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        raw = json.dumps(extraction, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_bytes(zlib.compress(raw, 6))
+        tmp_path.replace(path)
+
+    def _load_extraction(self, doc_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            return json.loads(zlib.decompress(self._extraction_path(doc_id).read_bytes()))
+        except (OSError, ValueError, zlib.error):
+            return None
+
+    def _split_text(self, text: str, path: Path) -> List["LCDocument"]:
+        from langchain_core.documents import Document as LCDocument
+        from langchain_text_splitters import RecursiveCharacterTextSplitter
+
         splitter = RecursiveCharacterTextSplitter(
             chunk_size=settings.CHUNK_SIZE,
             chunk_overlap=settings.CHUNK_OVERLAP,
@@ -286,28 +822,177 @@ class DocumentService:
         base_doc = LCDocument(page_content=text, metadata={"source": str(path)})
         return splitter.split_documents([base_doc])
 
-    async def _process_pdf(self, path: Path) -> List[LCDocument]:
+    async def _extract_pdf(
+        self, path: Path, content_hash: Optional[str] = None
+    ) -> List[pdf_layout.Block]:
+        """Classified layout blocks of a PDF.
+
+        The parsed layout is cached per content hash, so re-processing the
+        same file never re-parses it. Layouts missing OCR text because OCR
+        failed are not cached, so the next run retries the scanned pages.
+        """
+        if not content_hash:
+            content_hash = await asyncio.to_thread(self._file_sha256, path)
+        ocr_tag = f"ocr-{ocr_service.cache_tag}" if settings.OCR_ENABLED else "ocr0"
+        cache_path = (
+            Path(settings.PDF_LAYOUT_CACHE_DIR)
+            / content_hash[:2]
+            / f"{content_hash}-{ocr_tag}.layout"
+        )
+        blocks = await asyncio.to_thread(pdf_layout.read_layout, cache_path)
+        if blocks is None:
+            blocks, complete = await self._parse_pdf_layout(path)
+            if complete:
+                await asyncio.to_thread(pdf_layout.write_layout, cache_path, blocks)
+        return blocks
+
+    async def _parse_pdf_layout(self, path: Path) -> Tuple[List[pdf_layout.Block], bool]:
+        """Classified blocks, and whether every scanned page was OCR'd"""
         try:
             try:
                 import fitz  # type: ignore
             except ImportError:
                 import pymupdf as fitz  # type: ignore
-
-            doc = fitz.open(str(path))
-            text = "".join(page.get_text() for page in doc)
-            doc.close()
-            return self._split_text(text, path)
         except ImportError as exc:
             raise ValueError("PyMuPDF not installed for PDF processing") from exc
 
-    def _placeholder_chunk(self, filename: str, kind: str) -> LCDocument:
-        message = f"[{kind.capitalize()} content from {filename}]"
-        return LCDocument(page_content=message, metadata={"source": filename})
+        complete = True
+        doc = fitz.open(str(path))
+        try:
+            pages = await asyncio.to_thread(
+                lambda: [pdf_layout.extract_page(page, i) for i, page in enumerate(doc)]
+            )
+
+            # Pages without a text layer are scans; OCR them page by page
+            scanned = [i for i, blocks in enumerate(pages) if not blocks]
+            if scanned and settings.OCR_ENABLED:
+
+                def render(page_number: int) -> bytes:
+                    return doc[page_number].get_pixmap(dpi=settings.OCR_PDF_DPI).tobytes("png")
+
+                async def rendered():
+                    # Rasterizing is CPU-bound; one page per thread call keeps the loop free
+                    for page_number in scanned:
+                        yield await asyncio.to_thread(render, page_number)
+
+                try:
+                    async for position, text in ocr_service.recognize_stream(rendered()):
+                        page_number = scanned[position]
+                        pages[page_number] = pdf_layout.ocr_blocks(text, page_number)
+                except Exception as exc:
+                    logger.warning("OCR failed for scanned pages in %s: %s", path.name, exc)
+                    complete = False
+        finally:
+            doc.close()
+        return pdf_layout.classify(block for page in pages for block in page), complete
+
+    @staticmethod
+    def _file_sha256(path: Path) -> str:
+        hasher = hashlib.sha256()
+        with path.open("rb") as handle:
+            for chunk in iter(lambda: handle.read(_COPY_CHUNK_SIZE), b""):
+                hasher.update(chunk)
+        return hasher.hexdigest()
+
+    async def _extract_image(self, path: Path, filename: str) -> str:
+        if not settings.OCR_ENABLED:
+            return self._placeholder_text(filename, "image")
+        try:
+            text = await ocr_service.recognize(await asyncio.to_thread(path.read_bytes))
+        except Exception as exc:
+            logger.warning("OCR failed for %s: %s", filename, exc)
+            return self._placeholder_text(filename, "image")
+        if not text.strip():
+            return self._placeholder_text(filename, "image")
+        return text
+
+    async def _extract_audio(self, path: Path, filename: str) -> List[list]:
+        """Transcript segments as ``[start, end, text]``, empty on failure"""
+        if not settings.TRANSCRIPTION_ENABLED:
+            return []
+        segments = []
+        try:
+            async for start, end, text in transcription_service.transcribe(path):
+                segments.append([round(start, 2), round(end, 2), text])
+        except Exception as exc:
+            logger.warning("Transcription failed for %s: %s", filename, exc)
+            return []
+        return segments
+
+    def _chunk_segments(self, segments: List[list], source: str) -> List["LCDocument"]:
+        """Pack whole transcript segments into chunks, keeping their time span"""
+        from langchain_core.documents import Document as LCDocument
+
+        chunks: List[LCDocument] = []
+        current: List[list] = []
+        size = 0
+
+        def flush():
+            chunks.append(
+                LCDocument(
+                    page_content=" ".join(text for _, _, text in current),
+                    metadata={
+                        "source": source,
+                        "start_time": current[0][0],
+                        "end_time": current[-1][1],
+                    },
+                )
+            )
+
+        for segment in segments:
+            if current and size + len(segment[2]) > settings.CHUNK_SIZE:
+                flush()
+                # Carry trailing segments over as overlap
+                overlap: List[list] = []
+                carried = 0
+                for previous in reversed(current):
+                    carried += len(previous[2]) + 1
+                    if carried > settings.CHUNK_OVERLAP:
+                        break
+                    overlap.insert(0, previous)
+                current = overlap
+                size = sum(len(text) + 1 for _, _, text in current)
+            current.append(segment)
+            size += len(segment[2]) + 1
 
-    async def _index_chunks(self, doc: Document, chunks: List[str]):
+        if current:
+            flush()
+        return chunks
+
+    def _placeholder_text(self, filename: str, kind: str) -> str:
+        return f"[{kind.capitalize()} content from {filename}]"
+
+    def _processed_since(self, doc_ids: List[str], since: str) -> List[str]:
+        """Documents (re)processed normally at or after the ISO time ``since``"""
+        pipe = self.redis.pipeline(transaction=False)
+        for doc_id in doc_ids:
+            pipe.hget(f"document:{doc_id}", "processed_at")
+        return [
+            doc_id
+            for doc_id, processed_at in zip(doc_ids, pipe.execute(), strict=True)
+            if processed_at and processed_at >= since
+        ]
+
+    async def _index_chunks(
+        self,
+        doc: Document,
+        chunks: List[str],
+        metadata: Optional[List[dict]] = None,
+        refresh: bool = True,
+    ):
+        """Bulk-index a document's chunks, routed by owner.
+
+        Raises if the request fails or any chunk is rejected, so callers
+        never treat a partly indexed document as done. A tenant's dedicated
+        index is not versioned and is rewritten in place, so chunks left
+        over from a longer earlier chunking are deleted there.
+        """
         if not self.elasticsearch:
             return
         await self._ensure_index()
+        index = await search_index.tenant_index(doc.user_id, for_write=True)
+        operations: List[dict] = []
+        created_at = datetime.utcnow().isoformat()
         for idx, content in enumerate(chunks):
             body = {
                 "document_id": doc.id,
@@ -315,50 +1000,60 @@ class DocumentService:
                 "user_id": doc.user_id,
                 "chunk_index": idx,
                 "content": content,
-                "created_at": datetime.utcnow().isoformat(),
+                "created_at": created_at,
             }
-            try:
-                await self.elasticsearch.index(
-                    index=self._es_index,
-                    id=f"{doc.id}_{idx}",
-                    document=body,
-                    refresh="wait_for",
-                )
-            except Exception as exc:
-                logger.warning("Failed to index chunk %s_%s: %s", doc.id, idx, exc)
-                break
+            if metadata:
+                for field in ("start_time", "end_time"):
+                    if field in metadata[idx]:
+                        body[field] = metadata[idx][field]
+            operations.append({"index": {"_id": f"{doc.id}_{idx}"}})
+            operations.append(body)
+        response = await self.elasticsearch.bulk(
+            index=index or search_index.write_alias,
+            operations=operations,
+            routing=doc.user_id,
+            # Not "wait_for": an index being bulk-loaded has refreshes disabled
+            refresh=refresh,
+        )
+        if response.get("errors"):
+            errors = [
+                result["error"]
+                for item in response.get("items", [])
+                for result in item.values()
+                if result.get("error")
+            ]
+            raise RuntimeError(f"{len(errors)} chunks of {doc.id} failed to index: {errors[:1]}")
+        if index:
+            await self.elasticsearch.delete_by_query(
+                index=index,
+                query={
+                    "bool": {
+                        "filter": [
+                            {"term": {"document_id": doc.id}},
+                            {"range": {"chunk_index": {"gte": len(chunks)}}},
+                        ]
+                    }
+                },
+                routing=doc.user_id,
+                conflicts="proceed",
+                refresh=refresh,
+            )
 
     async def _ensure_index(self):
-        if not self.elasticsearch or self._es_index_ready:
-            return
-        try:
-            exists = await self.elasticsearch.indices.exists(index=self._es_index)
-            if not exists:
-                await self.elasticsearch.indices.create(
-                    index=self._es_index,
-                    mappings={
-                        "properties": {
-                            "document_id": {"type": "keyword"},
-                            "document_name": {"type": "keyword"},
-                            "user_id": {"type": "keyword"},
-                            "chunk_index": {"type": "integer"},
-                            "content": {"type": "text"},
-                            "created_at": {"type": "date"},
-                        }
-                    },
-                )
-            self._es_index_ready = True
-        except Exception as exc:
-            logger.warning("Unable to ensure ElasticSearch index: %s", exc)
+        await search_index.ensure()
 
-    async def _delete_indexed_chunks(self, doc_id: str):
+    async def _delete_indexed_chunks(self, doc_id: str, user_id: str):
         if not self.elasticsearch:
             return
         await self._ensure_index()
+        # Both aliases, in case a new index version is being filled
+        indices = [search_index.read_alias, search_index.write_alias]
+        indices.extend(await search_index.tenant_indices(user_id))
         try:
             await self.elasticsearch.delete_by_query(
-                index=self._es_index,
+                index=indices,
                 query={"term": {"document_id": doc_id}},
+                routing=user_id,
                 conflicts="proceed",
             )
         except Exception as exc:
@@ -369,17 +1064,47 @@ class DocumentService:
         *,
         query: str,
         user_id: str,
-        document_ids: List[str],
+        document_ids: Optional[List[str]],
         top_k: int,
+        snippets: Optional[int] = None,
+        snippet_size: int = settings.SNIPPET_SIZE,
     ) -> List[SearchResult]:
         if not self.elasticsearch:
             return []
         await self._ensure_index()
         user_query = query.strip() or "relevant context"
+
+        # Routing confines the query to the shard holding this tenant; the
+        # user filter is still needed because shards are shared.
+        filters: List[dict] = [{"term": {"user_id": user_id}}]
+        if document_ids:
+            # Sorted so repeated selections hit the same cached filter
+            filters.append({"terms": {"document_id": sorted(document_ids)}})
+        index = await search_index.tenant_index(user_id) or search_index.read_alias
+
+        extra: Dict[str, Any] = {}
+        if snippets:
+            # Only the highlighted fragments come back, not the chunk text
+            extra["source_excludes"] = ["content"]
+            extra["highlight"] = {
+                "pre_tags": [""],
+                "post_tags": [""],
+                "order": "score",
+                "fields": {
+                    "content": {
+                        "type": "unified",
+                        "fragment_size": snippet_size,
+                        "number_of_fragments": snippets,
+                        "no_match_size": snippet_size,
+                    }
+                },
+            }
         try:
             response = await self.elasticsearch.search(
-                index=self._es_index,
+                index=index,
+                routing=user_id,
                 size=top_k,
+                **extra,
                 query={
                     "bool": {
                         "must": [
@@ -390,10 +1115,7 @@ class DocumentService:
                                 }
                             }
                         ],
-                        "filter": [
-                            {"term": {"user_id": user_id}},
-                            {"terms": {"document_id": document_ids}},
-                        ],
+                        "filter": filters,
                     }
                 },
             )
@@ -405,13 +1127,27 @@ class DocumentService:
         results: List[SearchResult] = []
         for hit in hits:
             source = hit.get("_source", {})
+            score = float(hit.get("_score", 0.0))
+            content = source.get("content", "")
+            fragments: List[Snippet] = []
+            if snippets:
+                fragments = [
+                    Snippet(text=fragment, score=score)
+                    for fragment in hit.get("highlight", {}).get("content", [])
+                ]
+                content = _SNIPPET_SEPARATOR.join(fragment.text for fragment in fragments)
             results.append(
                 SearchResult(
-                    content=source.get("content", ""),
+                    content=content,
                     document_id=source.get("document_id", ""),
                     document_name=source.get("document_name", "unknown"),
-                    score=float(hit.get("_score", 0.0)),
-                    metadata={"chunk_index": source.get("chunk_index")},
+                    score=score,
+                    metadata={
+                        key: source[key]
+                        for key in ("chunk_index", "start_time", "end_time")
+                        if key in source
+                    },
+                    snippets=fragments,
                 )
             )
         return results
@@ -426,9 +1162,9 @@ class DocumentService:
         results: List[SearchResult] = []
 
         for doc_id in document_ids:
-            doc_meta = self.redis.hgetall(f"document:{doc_id}")
-            chunks = self.redis.hgetall(f"document:{doc_id}:content")
-            for chunk_key, content in chunks.items():
+            filename = self.redis.hget(f"document:{doc_id}", "filename")
+            # A scan over every document is no reason to bring cold ones back
+            for index, content in enumerate(await self._load_chunks(doc_id, promote=False)):
                 if not content:
                     continue
                 score = (
@@ -442,9 +1178,9 @@ class DocumentService:
                     SearchResult(
                         content=content,
                         document_id=doc_id,
-                        document_name=doc_meta.get("filename", doc_id),
+                        document_name=filename or doc_id,
                         score=float(score),
-                        metadata={"chunk_key": chunk_key},
+                        metadata={"chunk_key": f"chunk_{index}"},
                     )
                 )
 
@@ -0,0 +1,188 @@
+"""Draft version history stored as compressed line deltas"""
+
+import base64
+import difflib
+import json
+import zlib
+from datetime import datetime
+from typing import List, Optional
+
+from backend.config import settings
+from backend.core.database import db
+from backend.models.blog import DraftVersion, DraftVersionDiff, DraftVersionInfo
+
+
+SNAPSHOT = "snapshot"
+DELTA = "delta"
+
+
+def _encode(payload) -> str:
+    raw = payload.encode("utf-8") if isinstance(payload, str) else json.dumps(payload).encode("utf-8")
+    return base64.b64encode(zlib.compress(raw, 6)).decode("ascii")
+
+
+def _decode(data: str) -> bytes:
+    return zlib.decompress(base64.b64decode(data))
+
+
+def make_delta(previous: str, current: str) -> list:
+    """Build a line delta turning ``previous`` into ``current``.
+
+    Ops are ``["c", start, end]`` (copy lines from previous) and
+    ``["i", text]`` (insert new text), so the delta size tracks the edit,
+    not the length of the post.
+    """
+    old_lines = previous.splitlines(keepends=True)
+    new_lines = current.splitlines(keepends=True)
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+
+    ops: list = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            ops.append(["c", i1, i2])
+        elif tag in ("replace", "insert"):
+            ops.append(["i", "".join(new_lines[j1:j2])])
+    return ops
+
+
+def apply_delta(previous: str, ops: list) -> str:
+    """Apply a delta produced by :func:`make_delta`"""
+    old_lines = previous.splitlines(keepends=True)
+    parts: List[str] = []
+    for op in ops:
+        if op[0] == "c":
+            parts.extend(old_lines[op[1]:op[2]])
+        else:
+            parts.append(op[1])
+    return "".join(parts)
+
+
+class DraftHistoryService:
+    """Per-draft version history.
+
+    Versions live in the ``draft:{id}:versions`` hash, one field per version
+    number. Every ``DRAFT_SNAPSHOT_INTERVAL`` versions (or whenever a delta
+    would not be smaller) a full compressed snapshot is written, so
+    rebuilding any version walks at most one snapshot interval of deltas.
+    """
+
+    def __init__(self):
+        self.redis = db.redis
+
+    def key(self, draft_id: str) -> str:
+        return f"draft:{draft_id}:versions"
+
+    def record_version(
+        self,
+        draft_id: str,
+        version: int,
+        content: str,
+        previous: Optional[str] = None,
+        pipe=None,
+    ):
+        """Store ``content`` as ``version``, delta-encoded against ``previous``.
+
+        ``pipe`` queues the write on a transaction instead of sending it.
+        """
+        snapshot = _encode(content)
+        record = {"kind": SNAPSHOT, "data": snapshot}
+
+        interval = max(1, settings.DRAFT_SNAPSHOT_INTERVAL)
+        if previous is not None and (version - 1) % interval != 0:
+            delta = _encode(make_delta(previous, content))
+            if len(delta) < len(snapshot):
+                record = {"kind": DELTA, "data": delta}
+
+        record.update(
+            {
+                "created_at": datetime.utcnow().isoformat(),
+                "length": len(content),
+            }
+        )
+        (pipe or self.redis).hset(self.key(draft_id), str(version), json.dumps(record))
+
+    def ensure_baseline(self, draft_id: str, version: int, content: str, pipe=None):
+        """Snapshot the current content of drafts created before history existed"""
+        if not self.redis.hexists(self.key(draft_id), str(version)):
+            self.record_version(draft_id, version, content, pipe=pipe)
+
+    async def list_versions(self, draft_id: str) -> List[DraftVersionInfo]:
+        """List stored versions, newest first"""
+        records = self.redis.hgetall(self.key(draft_id))
+        versions = []
+        for field, raw in records.items():
+            record = json.loads(raw)
+            versions.append(
+                DraftVersionInfo(
+                    version=int(field),
+                    kind=record["kind"],
+                    length=record.get("length", 0),
+                    stored_bytes=len(record["data"]),
+                    created_at=datetime.fromisoformat(record["created_at"]),
+                )
+            )
+        versions.sort(key=lambda item: item.version, reverse=True)
+        return versions
+
+    async def get_version(self, draft_id: str, version: int) -> Optional[DraftVersion]:
+        """Rebuild a version from the nearest snapshot and the deltas after it"""
+        key = self.key(draft_id)
+        interval = max(1, settings.DRAFT_SNAPSHOT_INTERVAL)
+
+        chain: List[dict] = []
+        cursor = version
+        while cursor >= 1:
+            fields = [str(v) for v in range(cursor, max(0, cursor - interval), -1)]
+            for raw in self.redis.hmget(key, fields):
+                if raw is None:
+                    return None
+                chain.append(json.loads(raw))
+                if chain[-1]["kind"] == SNAPSHOT:
+                    return self._rebuild(version, chain)
+            cursor -= interval
+        return None
+
+    async def diff_versions(
+        self,
+        draft_id: str,
+        from_version: int,
+        to_version: int,
+    ) -> Optional[DraftVersionDiff]:
+        """Unified diff between two versions"""
+        old = await self.get_version(draft_id, from_version)
+        new = await self.get_version(draft_id, to_version)
+        if not old or not new:
+            return None
+
+        diff = difflib.unified_diff(
+            old.content.splitlines(keepends=True),
+            new.content.splitlines(keepends=True),
+            fromfile=f"v{from_version}",
+            tofile=f"v{to_version}",
+        )
+        return DraftVersionDiff(
+            from_version=from_version,
+            to_version=to_version,
+            diff="".join(diff),
+        )
+
+    def delete_history(self, draft_id: str):
+        """Remove all stored versions of a draft"""
+        self.redis.unlink(self.key(draft_id))
+
+    @staticmethod
+    def _rebuild(version: int, chain: List[dict]) -> DraftVersion:
+        snapshot = chain[-1]
+        content = _decode(snapshot["data"]).decode("utf-8")
+        for record in reversed(chain[:-1]):
+            content = apply_delta(content, json.loads(_decode(record["data"])))
+
+        return DraftVersion(
+            version=version,
+            content=content,
+            created_at=datetime.fromisoformat(chain[0]["created_at"]),
+        )
+
+
+# Global service instance
+draft_history_service = DraftHistoryService()
@@ -0,0 +1,326 @@
+"""Text embeddings with a two-level (memory + memory-mapped disk) cache"""
+
+import asyncio
+import hashlib
+import importlib
+import logging
+import math
+import mmap
+import re
+import struct
+from collections import Counter, OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process use only
+    fcntl = None
+
+from backend.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+# Built-in embedders; any other value of EMBEDDING_PROVIDER is read as "module:Class"
+EMBEDDERS = {
+    "openai": "backend.services.embedding_service:OpenAIEmbedder",
+    "hashing": "backend.services.embedding_service:HashingEmbedder",
+}
+
+_KEY_SIZE = 32  # SHA-256 digest
+_WORD_RE = re.compile(r"\w+")
+
+
+class OpenAIEmbedder:
+    """OpenAI embeddings API"""
+
+    def __init__(self):
+        self.model = settings.EMBEDDING_MODEL
+        self.dim = settings.EMBEDDING_DIM
+        self.id = f"openai-{self.model}-{self.dim}"
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        import openai
+
+        client = openai.AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+        response = await client.embeddings.create(
+            model=self.model, input=texts, dimensions=self.dim
+        )
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+
+class HashingEmbedder:
+    """Offline embedder: signed feature hashing of words and character trigrams"""
+
+    def __init__(self):
+        self.dim = settings.EMBEDDING_DIM
+        self.id = f"hashing-{self.dim}"
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    def _embed(self, text: str) -> List[float]:
+        vector = [0.0] * self.dim
+        words = _WORD_RE.findall(text.lower())
+        features = Counter(words)
+        joined = f" {' '.join(words)} "
+        for i in range(len(joined) - 2):
+            features[joined[i:i + 3]] += 0.5
+        for feature, weight in features.items():
+            value = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+            vector[value % self.dim] += weight if value >> 63 else -weight
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+
+def _resolve_embedder(spec: str):
+    module_name, _, attr = EMBEDDERS.get(spec, spec).partition(":")
+    return getattr(importlib.import_module(module_name), attr)()
+
+
+class DiskVectorStore:
+    """Append-only float16 segments, memory-mapped for reads.
+
+    Each segment is a ``.vec`` file of fixed-size rows and a ``.keys`` file
+    of the matching SHA-256 digests. When the store grows past ``max_bytes``
+    the oldest segments are deleted; callers give entries read from the
+    oldest segment a second chance by writing them again.
+    """
+
+    def __init__(self, root: Path, dim: int, max_bytes: int, segment_rows: int):
+        self.root = root
+        self.dim = dim
+        self.max_bytes = max_bytes
+        self.segment_rows = segment_rows
+        self.row_format = f"<{dim}e"
+        self.row_size = struct.calcsize(self.row_format)
+        self._index: Dict[bytes, Tuple[int, int]] = {}
+        self._loaded: Dict[int, int] = {}  # segment -> rows indexed
+        self._maps: Dict[int, mmap.mmap] = {}
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.refresh()
+
+    def _paths(self, segment: int) -> Tuple[Path, Path]:
+        stem = self.root / f"seg-{segment:06d}"
+        return stem.with_suffix(".vec"), stem.with_suffix(".keys")
+
+    def segments(self) -> List[int]:
+        return sorted(int(path.stem.split("-")[1]) for path in self.root.glob("seg-*.keys"))
+
+    def refresh(self):
+        """Index rows appended since the last call (possibly by other processes)"""
+        present = self.segments()
+        for segment in list(self._loaded):
+            if segment not in present:
+                self._drop(segment)
+        for segment in present:
+            vec_path, keys_path = self._paths(segment)
+            try:
+                rows = min(keys_path.stat().st_size // _KEY_SIZE, vec_path.stat().st_size // self.row_size)
+            except FileNotFoundError:
+                continue
+            start = self._loaded.get(segment, 0)
+            if rows <= start:
+                continue
+            with keys_path.open("rb") as handle:
+                handle.seek(start * _KEY_SIZE)
+                data = handle.read((rows - start) * _KEY_SIZE)
+            for row in range(start, rows):
+                offset = (row - start) * _KEY_SIZE
+                self._index[data[offset:offset + _KEY_SIZE]] = (segment, row)
+            self._loaded[segment] = rows
+
+    def get(self, key: bytes) -> Optional[List[float]]:
+        location = self._index.get(key)
+        if location is None:
+            return None
+        segment, row = location
+        mapped = self._map(segment, row)
+        if mapped is None:
+            return None
+        return list(struct.unpack_from(self.row_format, mapped, row * self.row_size))
+
+    def is_oldest(self, key: bytes) -> bool:
+        location = self._index.get(key)
+        return bool(location) and len(self._loaded) > 1 and location[0] == min(self._loaded)
+
+    def put_many(self, items: Sequence[Tuple[bytes, Sequence[float]]]):
+        if not items:
+            return
+        with (self.root / "write.lock").open("a+b") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            segments = self.segments()
+            segment = segments[-1] if segments else 1
+            vec_path, keys_path = self._paths(segment)
+            rows = keys_path.stat().st_size // _KEY_SIZE if keys_path.exists() else 0
+            position = 0
+            while position < len(items):
+                if rows >= self.segment_rows:
+                    segment, rows = segment + 1, 0
+                    vec_path, keys_path = self._paths(segment)
+                batch = items[position:position + self.segment_rows - rows]
+                # Vectors before keys: a reader never indexes a row without its data
+                with vec_path.open("ab") as handle:
+                    handle.seek(rows * self.row_size)
+                    handle.truncate()
+                    handle.write(b"".join(struct.pack(self.row_format, *vector) for _, vector in batch))
+                with keys_path.open("ab") as handle:
+                    handle.write(b"".join(key for key, _ in batch))
+                for offset, (key, _) in enumerate(batch):
+                    self._index[key] = (segment, rows + offset)
+                rows += len(batch)
+                self._loaded[segment] = max(self._loaded.get(segment, 0), rows)
+                position += len(batch)
+            self._evict()
+
+    def size_bytes(self) -> int:
+        total = 0
+        for segment in self.segments():
+            for path in self._paths(segment):
+                if path.exists():
+                    total += path.stat().st_size
+        return total
+
+    def _evict(self):
+        segments = self.segments()
+        total = self.size_bytes()
+        while total > self.max_bytes and len(segments) > 1:
+            oldest = segments.pop(0)
+            for path in self._paths(oldest):
+                if path.exists():
+                    total -= path.stat().st_size
+                    path.unlink()
+            self._drop(oldest)
+
+    def _drop(self, segment: int):
+        mapped = self._maps.pop(segment, None)
+        if mapped is not None:
+            mapped.close()
+        self._loaded.pop(segment, None)
+        self._index = {key: loc for key, loc in self._index.items() if loc[0] != segment}
+
+    def _map(self, segment: int, row: int) -> Optional[mmap.mmap]:
+        mapped = self._maps.get(segment)
+        if mapped is None or len(mapped) < (row + 1) * self.row_size:
+            if mapped is not None:
+                mapped.close()
+            vec_path, _ = self._paths(segment)
+            try:
+                with vec_path.open("rb") as handle:
+                    mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+            except (FileNotFoundError, ValueError):
+                return None
+            self._maps[segment] = mapped
+        return mapped
+
+
+class EmbeddingService:
+    """Embeds text through an in-memory LRU and an on-disk float16 store.
+
+    Entries are keyed by (embedder id, SHA-256 of the text), so re-processing
+    unchanged chunks or repeating a query costs no embedding calls. Misses
+    are de-duplicated and embedded in batches of ``EMBEDDING_BATCH_SIZE``.
+    """
+
+    def __init__(self):
+        self._embedder = None
+        self._store: Optional[DiskVectorStore] = None
+        self._memory: "OrderedDict[bytes, List[float]]" = OrderedDict()
+        self.stats: Counter = Counter()
+
+    @property
+    def embedder(self):
+        if self._embedder is None:
+            self._embedder = _resolve_embedder(settings.EMBEDDING_PROVIDER)
+        return self._embedder
+
+    @property
+    def store(self) -> DiskVectorStore:
+        if self._store is None:
+            safe_id = re.sub(r"[^\w.-]", "_", self.embedder.id)
+            self._store = DiskVectorStore(
+                Path(settings.EMBEDDING_CACHE_DIR) / safe_id,
+                self.embedder.dim,
+                settings.EMBEDDING_CACHE_MAX_MB * 1024 * 1024,
+                settings.EMBEDDING_SEGMENT_ROWS,
+            )
+        return self._store
+
+    async def embed(self, texts: Sequence[str]) -> List[List[float]]:
+        """Embedding per text, in order"""
+        keys = [hashlib.sha256(text.encode("utf-8")).digest() for text in texts]
+        vectors: List[Optional[List[float]]] = [None] * len(texts)
+        missing: Dict[bytes, List[int]] = {}
+        promote: List[Tuple[bytes, List[float]]] = []
+
+        def lookup(i: int, key: bytes) -> bool:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+            else:
+                vector = self.store.get(key)
+                if vector is None:
+                    return False
+                self.stats["disk_hits"] += 1
+                self._remember(key, vector)
+                if self.store.is_oldest(key):
+                    promote.append((key, vector))
+            vectors[i] = vector
+            return True
+
+        for i, key in enumerate(keys):
+            if not lookup(i, key):
+                missing.setdefault(key, []).append(i)
+
+        if missing:
+            # Another process may have embedded these meanwhile
+            await asyncio.to_thread(self.store.refresh)
+            for key in list(missing):
+                positions = missing[key]
+                if lookup(positions[0], key):
+                    for i in positions[1:]:
+                        vectors[i] = vectors[positions[0]]
+                    del missing[key]
+
+        pending = list(missing)
+        batch_size = max(1, settings.EMBEDDING_BATCH_SIZE)
+        for offset in range(0, len(pending), batch_size):
+            batch = pending[offset:offset + batch_size]
+            embedded = await self.embedder.embed([texts[missing[key][0]] for key in batch])
+            self.stats["embedder_calls"] += 1
+            self.stats["embedded_texts"] += len(batch)
+            # Kept here, not read back from _memory, which may already have evicted them
+            fresh: List[Tuple[bytes, List[float]]] = []
+            for key, raw in zip(batch, embedded, strict=True):
+                vector = list(raw)
+                fresh.append((key, vector))
+                self._remember(key, vector)
+                for i in missing[key]:
+                    vectors[i] = vector
+            await asyncio.to_thread(self.store.put_many, fresh)
+
+        if promote:
+            await asyncio.to_thread(self.store.put_many, promote)
+        return vectors  # type: ignore[return-value]
+
+    async def embed_query(self, text: str) -> List[float]:
+        return (await self.embed([text]))[0]
+
+    def _remember(self, key: bytes, vector: List[float]):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > settings.EMBEDDING_MEMORY_ITEMS:
+            self._memory.popitem(last=False)
+
+
+def cosine(a: Sequence[float], b: Sequence[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b, strict=True))
+    norm = math.sqrt(sum(x * x for x in a) * sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+# Global service instance
+embedding_service = EmbeddingService()
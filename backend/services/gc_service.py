@@ -0,0 +1,386 @@
+"""Redis garbage collection: orphaned keys, abandoned and failed artifacts"""
+
+import asyncio
+import logging
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from backend.config import settings
+from backend.core.database import db
+from backend.models.blog import BlogStatus
+from backend.models.documents import ProcessingStatus
+from backend.services.document_service import document_service
+from backend.services.tiering_service import TIER_FIELD, COLD_TIER
+
+
+logger = logging.getLogger(__name__)
+
+# Keys that only mean something while their parent hash exists: family -> suffixes
+CHILD_KEYS = {
+    "document": ("content",),
+    "draft": ("versions",),
+    "session": ("chat_history", "chat_summary", "documents", "drafts"),
+    "batch": ("items", "events"),
+    "stream": ("events",),
+}
+
+# user:{id}:<set> -> family of the ids it holds
+USER_SETS = {
+    "documents": "document",
+    "drafts": "draft",
+    "sessions": "session",
+    "batches": "batch",
+    "api_keys": "api_key",
+}
+
+_LOCK_KEY = "gc:lock"
+
+
+def _age(value: Optional[str], now: datetime) -> Optional[timedelta]:
+    if not value:
+        return None
+    try:
+        return now - datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def _days(days: int) -> Optional[timedelta]:
+    return timedelta(days=days) if days > 0 else None
+
+
+class _Collection:
+    """One pass over the keyspace; every write is skipped in a dry run"""
+
+    def __init__(self, redis, dry_run: bool):
+        self.redis = redis
+        self.dry_run = dry_run
+        self.now = datetime.utcnow()
+        self.stale = timedelta(minutes=settings.GC_STALE_MINUTES)
+        self.failed_ttl = _days(settings.GC_FAILED_TTL_DAYS)
+        self.empty_ttl = _days(settings.GC_EMPTY_DRAFT_TTL_DAYS)
+        self.actions: Counter = Counter()
+        self.scanned = 0
+        self.deleted = 0
+        self.reclaimed: Optional[int] = 0  # None once MEMORY USAGE turns out unsupported
+        self._garbage: List[str] = []
+
+    async def page(self, keys: List[str]):
+        """Classify one SCAN page by key shape and check each group"""
+        self.scanned += len(keys)
+        entities: Dict[str, List[str]] = {"draft": [], "document": [], "session": []}
+        children: List[Tuple[str, str]] = []
+        user_sets: List[Tuple[str, str]] = []
+
+        for key in keys:
+            parts = key.split(":")
+            if len(parts) == 2 and parts[0] in entities:
+                entities[parts[0]].append(parts[1])
+            elif len(parts) >= 3 and parts[2] in CHILD_KEYS.get(parts[0], ()):
+                children.append((key, f"{parts[0]}:{parts[1]}"))
+            elif len(parts) == 3 and parts[0] == "user" and parts[2] in USER_SETS:
+                user_sets.append((key, USER_SETS[parts[2]]))
+
+        await self._check_children(children)
+        await self._check_sessions(entities["session"])
+        await self._check_documents(entities["document"])
+        await self._check_drafts(entities["draft"])
+        for key, family in user_sets:
+            await self._check_user_set(key, family)
+
+    async def finish(self):
+        await self._flush()
+
+    # -- checks ---------------------------------------------------------
+
+    async def _check_children(self, children: List[Tuple[str, str]]):
+        exists = self._exists(parent for _, parent in children)
+        for key, parent in children:
+            if not exists[parent]:
+                await self._discard([key], "orphan_key")
+
+    async def _check_sessions(self, session_ids: List[str]):
+        pipe = self.redis.pipeline(transaction=False)
+        for session_id in session_ids:
+            pipe.hget(f"session:{session_id}", "user_id")
+        for session_id, user_id in zip(session_ids, pipe.execute(), strict=True):
+            if not user_id:
+                # Recreated by a late write (e.g. a chat timestamp) after deletion
+                session_key = f"session:{session_id}"
+                keys = [session_key] + [f"{session_key}:{suffix}" for suffix in CHILD_KEYS["session"]]
+                await self._discard(keys, "orphan_key")
+
+    async def _check_documents(self, doc_ids: List[str]):
+        pipe = self.redis.pipeline(transaction=False)
+        for doc_id in doc_ids:
+            pipe.hmget(
+                f"document:{doc_id}",
+                "user_id", "status", "created_at", "processing_started_at", "failed_at",
+            )
+
+        for doc_id, (user_id, status, created_at, started_at, failed_at) in zip(doc_ids, pipe.execute(), strict=True):
+            doc_key = f"document:{doc_id}"
+            if not user_id:
+                await self._discard([doc_key, f"{doc_key}:content"], "orphan_key")
+                continue
+
+            if status in (ProcessingStatus.PENDING.value, ProcessingStatus.PROCESSING.value):
+                age = _age(started_at or created_at, self.now)
+                if age and age > self.stale:
+                    self._update(
+                        doc_key,
+                        {
+                            "status": ProcessingStatus.FAILED.value,
+                            "error_message": "Processing was interrupted",
+                            "failed_at": self.now.isoformat(),
+                        },
+                        "stale_processing",
+                    )
+                continue
+
+            if status == ProcessingStatus.FAILED.value and self.failed_ttl:
+                age = _age(failed_at or created_at, self.now)
+                if age and age > self.failed_ttl:
+                    keys = [doc_key, f"{doc_key}:content"]
+                    self.actions["failed_document"] += 1
+                    self._measure(keys)
+                    existing = sum(self._exists(keys).values())
+                    if self.dry_run:
+                        self.deleted += existing
+                    # Through the service: also removes the file, extraction and indexed chunks
+                    elif await document_service.delete_document(user_id, doc_id):
+                        self.deleted += existing
+                    else:
+                        self._unlink(keys)
+
+    async def _check_drafts(self, draft_ids: List[str]):
+        pipe = self.redis.pipeline(transaction=False)
+        for draft_id in draft_ids:
+            pipe.hmget(
+                f"draft:{draft_id}",
+                "user_id", "session_id", "status", "status_at", "updated_at", "document_ids", TIER_FIELD,
+            )
+            pipe.hstrlen(f"draft:{draft_id}", "content")
+        rows = pipe.execute()
+        drafts = []
+        for i, draft_id in enumerate(draft_ids):
+            *fields, tier = rows[2 * i]
+            # A body moved to the cold store still counts as content
+            drafts.append((draft_id, *fields, rows[2 * i + 1] or tier == COLD_TIER))
+
+        references = []
+        for _, _, session_id, _, _, _, document_ids, _ in drafts:
+            if session_id:
+                references.append(f"session:{session_id}")
+            references.extend(f"document:{doc_id}" for doc_id in (document_ids or "").split(",") if doc_id)
+        exists = self._exists(references)
+
+        for draft_id, user_id, session_id, stored_status, status_at, updated_at, document_ids, content_length in drafts:
+            draft_key = f"draft:{draft_id}"
+            if not user_id:
+                # Recreated by a status write from a generation that outlived its draft
+                await self._discard([draft_key, f"{draft_key}:versions"], "orphan_key")
+                continue
+
+            if session_id and not exists[f"session:{session_id}"]:
+                await self._delete_draft(draft_id, user_id, session_id, "orphan_draft")
+                continue
+
+            status = stored_status  # Becomes failed below if the generation is stale
+            status_age = _age(status_at or updated_at, self.now)
+            if status == BlogStatus.GENERATING.value and status_age and status_age > self.stale:
+                self._update(
+                    draft_key,
+                    {"status": BlogStatus.FAILED.value, "status_at": self.now.isoformat()},
+                    "stale_generation",
+                )
+                status, status_age = BlogStatus.FAILED.value, timedelta(0)
+
+            # Only drafts with no content: a failed refine must not cost the user their post
+            if not content_length:
+                failed_age = status_age if status == BlogStatus.FAILED.value else None
+                if self.failed_ttl and failed_age and failed_age > self.failed_ttl:
+                    await self._delete_draft(draft_id, user_id, session_id, "failed_draft")
+                    continue
+                updated_age = _age(updated_at, self.now)
+                if status == BlogStatus.DRAFT.value and self.empty_ttl and updated_age and updated_age > self.empty_ttl:
+                    await self._delete_draft(draft_id, user_id, session_id, "empty_draft")
+                    continue
+
+            if document_ids:
+                ids = document_ids.split(",")
+                kept = [doc_id for doc_id in ids if doc_id and exists[f"document:{doc_id}"]]
+                if len(kept) != len(ids):
+                    self._update(draft_key, {"document_ids": ",".join(kept)}, "dangling_document_ref")
+
+    async def _check_user_set(self, key: str, family: str):
+        members = list(self.redis.sscan_iter(key, count=settings.GC_SCAN_COUNT))
+        for start in range(0, len(members), settings.GC_SCAN_COUNT):
+            batch = members[start:start + settings.GC_SCAN_COUNT]
+            exists = self._exists(f"{family}:{member}" for member in batch)
+            dangling = [member for member in batch if not exists[f"{family}:{member}"]]
+            if dangling:
+                self.actions["dangling_member"] += len(dangling)
+                if not self.dry_run:
+                    self.redis.srem(key, *dangling)
+
+    # -- actions --------------------------------------------------------
+
+    async def _delete_draft(self, draft_id: str, user_id: str, session_id: Optional[str], reason: str):
+        # Cold copies of deleted drafts are swept by the tiering pass
+        await self._discard([f"draft:{draft_id}", f"draft:{draft_id}:versions"], reason)
+        if not self.dry_run:
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.srem(f"user:{user_id}:drafts", draft_id)
+            if session_id:
+                pipe.srem(f"session:{session_id}:drafts", draft_id)
+            pipe.execute()
+
+    async def _discard(self, keys: List[str], reason: str):
+        """Queue keys for a batched UNLINK"""
+        self.actions[reason] += 1
+        self._garbage.extend(keys)
+        if len(self._garbage) >= settings.GC_DELETE_BATCH:
+            await self._flush()
+
+    async def _flush(self):
+        keys = list(dict.fromkeys(self._garbage))
+        self._garbage.clear()
+        if not keys:
+            return
+        self._measure(keys)
+        if self.dry_run:
+            self.deleted += sum(self._exists(keys).values())
+        else:
+            self._unlink(keys)
+        # Let other work (and other Redis clients) in between batches
+        await asyncio.sleep(0)
+
+    def _update(self, key: str, mapping: Dict[str, str], reason: str):
+        self.actions[reason] += 1
+        if not self.dry_run:
+            self.redis.hset(key, mapping=mapping)
+
+    def _unlink(self, keys: List[str]):
+        # UNLINK returns at once and frees the values on a background thread
+        self.deleted += self.redis.unlink(*keys)
+
+    def _measure(self, keys: List[str]):
+        if self.reclaimed is None:
+            return
+        pipe = self.redis.pipeline(transaction=False)
+        for key in keys:
+            pipe.memory_usage(key)
+        sizes = pipe.execute(raise_on_error=False)
+        if any(isinstance(size, Exception) for size in sizes):
+            self.reclaimed = None  # MEMORY USAGE unsupported (e.g. some managed Redis)
+            return
+        self.reclaimed += sum(size or 0 for size in sizes)
+
+    def _exists(self, keys: Iterable[str]) -> Dict[str, bool]:
+        unique = list(dict.fromkeys(keys))
+        if not unique:
+            return {}
+        pipe = self.redis.pipeline(transaction=False)
+        for key in unique:
+            pipe.exists(key)
+        return {key: bool(found) for key, found in zip(unique, pipe.execute(), strict=True)}
+
+
+class GarbageCollectionService:
+    """Finds and removes Redis data nothing refers to any more.
+
+    One pass walks the keyspace with incremental ``SCAN`` (``GC_SCAN_COUNT``
+    keys per step, ``GC_PAUSE_MS`` apart) and never uses ``KEYS`` or
+    multi-key ``DEL``; deletions go out as ``UNLINK`` batches of
+    ``GC_DELETE_BATCH`` keys. It removes:
+
+    - child keys whose parent hash is gone (``document:{id}:content``,
+      ``draft:{id}:versions``, ``session:{id}:*``, ``batch:{id}:*`` ...)
+    - drafts whose session was deleted, and hashes recreated by late writes
+    - ``user:{id}:*`` set members pointing at deleted objects
+    - document ids on drafts that point at deleted documents
+
+    and applies age limits: generation or processing still running after
+    ``GC_STALE_MINUTES`` is marked failed, failed documents and empty failed
+    drafts are deleted after ``GC_FAILED_TTL_DAYS``, and drafts never written
+    to after ``GC_EMPTY_DRAFT_TTL_DAYS``.
+    """
+
+    def __init__(self):
+        self.redis = db.redis
+        self.worker_id = uuid.uuid4().hex
+        self.last_report: Optional[Dict[str, Any]] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def collect(self, dry_run: bool = False) -> Dict[str, Any]:
+        """Run one pass; returns what was (or, in a dry run, would be) reclaimed"""
+        started = time.perf_counter()
+        used_before = self._used_memory()
+        run = _Collection(self.redis, dry_run)
+
+        cursor = 0
+        while True:
+            cursor, keys = self.redis.scan(cursor, count=settings.GC_SCAN_COUNT)
+            await run.page(keys)
+            if not cursor:
+                break
+            await asyncio.sleep(settings.GC_PAUSE_MS / 1000)
+        await run.finish()
+
+        report = {
+            "dry_run": dry_run,
+            "scanned_keys": run.scanned,
+            "deleted_keys": run.deleted,
+            "reclaimed_bytes": run.reclaimed,
+            "used_memory_before": used_before,
+            "used_memory_after": self._used_memory(),
+            "actions": dict(run.actions),
+            "seconds": round(time.perf_counter() - started, 3),
+        }
+        self.last_report = report
+        return report
+
+    def start(self):
+        """Run ``collect`` every ``GC_INTERVAL_SECONDS`` in the background"""
+        if settings.GC_INTERVAL_SECONDS > 0 and self._task is None:
+            self._task = asyncio.create_task(self._run_periodically())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run_periodically(self):
+        interval = settings.GC_INTERVAL_SECONDS
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                # One worker process collects per interval; the lock just expires
+                if not self.redis.set(_LOCK_KEY, self.worker_id, nx=True, ex=max(1, int(interval * 0.9))):
+                    continue
+                report = await self.collect()
+                logger.info(
+                    "Redis GC: scanned %s keys, deleted %s, reclaimed %s bytes in %ss: %s",
+                    report["scanned_keys"],
+                    report["deleted_keys"],
+                    report["reclaimed_bytes"],
+                    report["seconds"],
+                    report["actions"],
+                )
+            except Exception as e:
+                logger.warning("Redis GC failed: %s", e)
+
+    def _used_memory(self) -> Optional[int]:
+        try:
+            return self.redis.info("memory").get("used_memory")
+        except Exception:
+            return None
+
+
+# Global service instance
+gc_service = GarbageCollectionService()
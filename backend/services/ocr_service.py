@@ -0,0 +1,154 @@
+"""OCR ingestion for images and scanned PDF pages"""
+
+import asyncio
+import hashlib
+import importlib
+import io
+import logging
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import AsyncIterable, AsyncIterator, Callable, Iterable, Optional, Tuple, Union
+
+from backend.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+# Built-in engines; any other value of OCR_ENGINE is read as "module:function"
+ENGINES = {
+    "tesseract": "backend.services.ocr_service:tesseract_engine",
+}
+
+
+def tesseract_engine(image) -> str:
+    """Recognize text with a local Tesseract install (CPU only)"""
+    try:
+        import pytesseract  # type: ignore
+    except ImportError as exc:
+        raise ValueError("pytesseract not installed for OCR") from exc
+    return pytesseract.image_to_string(image, lang=settings.OCR_LANGUAGES)
+
+
+def _resolve_engine(spec: str) -> Callable:
+    module_name, _, attr = ENGINES.get(spec, spec).partition(":")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def _recognize(engine_spec: str, image_bytes: bytes, max_side: int) -> str:
+    """Worker process entry point: downscale, grayscale and recognize one image"""
+    from PIL import Image
+
+    with Image.open(io.BytesIO(image_bytes)) as image:
+        prepared = image.convert("L")
+    prepared.thumbnail((max_side, max_side))
+    return _resolve_engine(engine_spec)(prepared)
+
+
+class OCRService:
+    """Runs OCR in a bounded process pool with an on-disk page cache.
+
+    Results are cached under ``OCR_CACHE_DIR`` keyed by the SHA-256 of the
+    image bytes (plus engine, languages and downscale size), so
+    re-processing a document never recognizes the same page twice.
+    """
+
+    def __init__(self):
+        self.cache_dir = Path(settings.OCR_CACHE_DIR)
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def max_workers(self) -> int:
+        return max(1, settings.OCR_MAX_WORKERS or (os.cpu_count() or 1))
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # Spawned workers do not inherit the server's sockets or event loop
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    @property
+    def cache_tag(self) -> str:
+        """Identifies the settings that change OCR output"""
+        engine = f"{settings.OCR_ENGINE}|{settings.OCR_LANGUAGES}"
+        engine_id = hashlib.blake2b(engine.encode("utf-8"), digest_size=16).hexdigest()
+        return f"{engine_id}-{settings.OCR_MAX_IMAGE_SIDE}"
+
+    def _cache_path(self, digest: str) -> Path:
+        return self.cache_dir / self.cache_tag / digest[:2] / f"{digest}.txt"
+
+    async def recognize(self, image_bytes: bytes) -> str:
+        """OCR one image, using the page cache when possible"""
+        digest = hashlib.sha256(image_bytes).hexdigest()
+        cache_path = self._cache_path(digest)
+        if cache_path.exists():
+            return await asyncio.to_thread(cache_path.read_text, encoding="utf-8")
+
+        loop = asyncio.get_running_loop()
+        text = await loop.run_in_executor(
+            self._get_executor(),
+            _recognize,
+            settings.OCR_ENGINE,
+            image_bytes,
+            settings.OCR_MAX_IMAGE_SIDE,
+        )
+
+        def store():
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_text(text, encoding="utf-8")
+            tmp_path.replace(cache_path)
+
+        await asyncio.to_thread(store)
+        return text
+
+    async def recognize_stream(
+        self,
+        images: Union[Iterable[bytes], AsyncIterable[bytes]],
+    ) -> AsyncIterator[Tuple[int, str]]:
+        """OCR a lazy sequence of page images, yielding ``(index, text)`` in order.
+
+        At most ``2 * max_workers`` pages are in flight, so long scans are
+        rendered and recognized incrementally instead of all up front. Pass
+        an async iterable when producing an image blocks (PDF rendering).
+        """
+        pending: deque = deque()
+        limit = 2 * self.max_workers
+        try:
+            index = 0
+            async for image_bytes in _as_async(images):
+                pending.append((index, asyncio.ensure_future(self.recognize(image_bytes))))
+                index += 1
+                if len(pending) >= limit:
+                    page_index, task = pending.popleft()
+                    yield page_index, await task
+            while pending:
+                page_index, task = pending.popleft()
+                yield page_index, await task
+        finally:
+            for _, task in pending:
+                task.cancel()
+
+    def shutdown(self):
+        """Stop worker processes"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+async def _as_async(items: Union[Iterable[bytes], AsyncIterable[bytes]]) -> AsyncIterator[bytes]:
+    if hasattr(items, "__aiter__"):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+
+# Global service instance
+ocr_service = OCRService()
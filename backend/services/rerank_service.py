@@ -0,0 +1,177 @@
+"""Second-stage reranking of retrieved chunks"""
+
+import asyncio
+import hashlib
+import importlib
+import logging
+import math
+import time
+from collections import Counter, OrderedDict
+from typing import Callable, List, Optional, Sequence
+
+from backend.config import settings
+from backend.core.passages import TERM_RE, query_terms
+from backend.models.documents import SearchResult
+
+
+logger = logging.getLogger(__name__)
+
+# Built-in scorers; any other value of RERANK_SCORER is read as "module:function".
+# A scorer takes a query and a batch of passages and returns one score per passage.
+SCORERS = {
+    "lexical": "backend.services.rerank_service:lexical_scorer",
+    "semantic": "backend.services.rerank_service:semantic_scorer",
+}
+
+
+def _trigrams(text: str) -> Counter:
+    text = f" {' '.join(TERM_RE.findall(text.lower()))} "
+    return Counter(text[i:i + 3] for i in range(len(text) - 2))
+
+
+def _cosine(a: Counter, b: Counter) -> float:
+    if not a or not b:
+        return 0.0
+    dot = sum(count * b[gram] for gram, count in a.items())
+    return dot / math.sqrt(sum(v * v for v in a.values()) * sum(v * v for v in b.values()))
+
+
+def lexical_scorer(query: str, passages: Sequence[str]) -> List[float]:
+    """Offline scorer: term coverage, saturated frequency, proximity and
+    character-trigram similarity (which tolerates inflections and typos).
+
+    Each score depends only on its (query, passage) pair, so scores can be
+    cached and batches split freely.
+    """
+    terms = query_terms(query)
+    query_grams = _trigrams(query)
+    scores = []
+    for passage in passages:
+        tokens = TERM_RE.findall(passage.lower())
+        frequencies = Counter(tokens)
+        matched = [term for term in terms if frequencies[term]]
+        coverage = len(matched) / len(terms) if terms else 0.0
+        saturation = (
+            sum(frequencies[term] / (frequencies[term] + 1.2) for term in matched) / len(terms)
+            if terms
+            else 0.0
+        )
+
+        # Shortest token window containing every matched term
+        proximity = 0.0
+        if len(matched) > 1:
+            wanted = set(matched)
+            window: Counter = Counter()
+            best = len(tokens)
+            left = 0
+            for right, token in enumerate(tokens):
+                if token in wanted:
+                    window[token] += 1
+                while len(window) == len(wanted):
+                    best = min(best, right - left + 1)
+                    if tokens[left] in window:
+                        window[tokens[left]] -= 1
+                        if not window[tokens[left]]:
+                            del window[tokens[left]]
+                    left += 1
+            proximity = len(matched) / best
+        elif matched:
+            proximity = 0.5
+
+        similarity = _cosine(query_grams, _trigrams(passage))
+        scores.append(2.0 * coverage + saturation + proximity + similarity)
+    return scores
+
+
+async def semantic_scorer(query: str, passages: Sequence[str]) -> List[float]:
+    """Cosine similarity of cached embeddings (see ``EMBEDDING_PROVIDER``)"""
+    from backend.services.embedding_service import cosine, embedding_service
+
+    vectors = await embedding_service.embed([query, *passages])
+    return [cosine(vectors[0], vector) for vector in vectors[1:]]
+
+
+def _resolve_scorer(spec: str) -> Callable:
+    module_name, _, attr = SCORERS.get(spec, spec).partition(":")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+class RerankService:
+    """Rescores over-fetched candidates within a time budget.
+
+    Candidates are scored in batches of ``RERANK_BATCH_SIZE``, off the event
+    loop unless the scorer is a coroutine function. Scores are cached per
+    (scorer, query, chunk) in an LRU of ``RERANK_CACHE_SIZE`` entries. If the
+    ``RERANK_TIMEOUT_MS`` budget runs out, the first-stage order is returned.
+    """
+
+    def __init__(self):
+        self._cache: "OrderedDict[tuple, float]" = OrderedDict()
+
+    def _cache_key(self, query: str, content: str) -> tuple:
+        return (
+            settings.RERANK_SCORER,
+            hashlib.blake2b(query.encode("utf-8"), digest_size=16).digest(),
+            hashlib.blake2b(content.encode("utf-8"), digest_size=16).digest(),
+        )
+
+    async def rerank(
+        self,
+        query: str,
+        results: List[SearchResult],
+        top_k: int,
+        timeout_ms: Optional[int] = None,
+    ) -> List[SearchResult]:
+        if len(results) < 2:
+            return results[:top_k]
+        deadline = time.perf_counter() + (timeout_ms or settings.RERANK_TIMEOUT_MS) / 1000
+
+        keys = [self._cache_key(query, result.content) for result in results]
+        scores: List[Optional[float]] = [self._lookup(key) for key in keys]
+        missing = [i for i, score in enumerate(scores) if score is None]
+
+        scorer = _resolve_scorer(settings.RERANK_SCORER)
+        batch_size = max(1, settings.RERANK_BATCH_SIZE)
+        try:
+            for offset in range(0, len(missing), batch_size):
+                batch = missing[offset:offset + batch_size]
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    raise asyncio.TimeoutError
+                passages = [results[i].content for i in batch]
+                if asyncio.iscoroutinefunction(scorer):
+                    pending = scorer(query, passages)
+                else:
+                    pending = asyncio.to_thread(scorer, query, passages)
+                batch_scores = await asyncio.wait_for(pending, remaining)
+                for i, score in zip(batch, batch_scores, strict=True):
+                    scores[i] = float(score)
+                    self._remember(keys[i], scores[i])
+        except asyncio.TimeoutError:
+            logger.info("Rerank budget exceeded; keeping first-stage order")
+            return results[:top_k]
+        except Exception as exc:
+            logger.warning("Rerank failed; keeping first-stage order: %s", exc)
+            return results[:top_k]
+
+        for result, score in zip(results, scores, strict=True):
+            result.metadata["first_stage_score"] = result.score
+            result.score = score
+        # Stable sort keeps first-stage order among equal scores
+        return sorted(results, key=lambda result: result.score, reverse=True)[:top_k]
+
+    def _lookup(self, key: tuple) -> Optional[float]:
+        score = self._cache.get(key)
+        if score is not None:
+            self._cache.move_to_end(key)
+        return score
+
+    def _remember(self, key: tuple, score: float):
+        self._cache[key] = score
+        self._cache.move_to_end(key)
+        while len(self._cache) > settings.RERANK_CACHE_SIZE:
+            self._cache.popitem(last=False)
+
+
+# Global service instance
+rerank_service = RerankService()
@@ -0,0 +1,456 @@
+"""Versioned ElasticSearch indices behind read/write aliases"""
+
+import asyncio
+import json
+import logging
+import re
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from backend.config import settings
+from backend.core.database import db
+
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the mapping or analysis settings change; outdated indices
+# are migrated into a new version behind the aliases.
+SCHEMA_VERSION = 3
+
+# Bulk loads skip replication and periodic refreshes until the index goes live
+_BULK_LOAD_SETTINGS = {"number_of_replicas": 0, "refresh_interval": "-1"}
+
+# Held by whichever process is running ``migrate`` (server or script)
+_MIGRATION_LOCK = "search_index:migration"
+
+# Documents indexed before routing existed get routed by owner
+_ROUTE_BY_OWNER = {"source": "ctx._routing = ctx._source.user_id", "lang": "painless"}
+
+
+def index_mappings() -> dict:
+    return {
+        "_meta": {"schema_version": SCHEMA_VERSION},
+        # Chunks are routed by owner so a tenant's queries touch one shard
+        "_routing": {"required": True},
+        "properties": {
+            "document_id": {"type": "keyword"},
+            "document_name": {"type": "keyword"},
+            "user_id": {"type": "keyword"},
+            "chunk_index": {"type": "integer"},
+            "content": {"type": "text"},
+            "start_time": {"type": "float"},
+            "end_time": {"type": "float"},
+            "created_at": {"type": "date"},
+        },
+    }
+
+
+class SearchIndexManager:
+    """Blue/green management of the chunk index.
+
+    Readers use the ``ES_INDEX_ALIAS`` alias and writers the ``-write``
+    alias. A new version (``documents-v{schema}-{timestamp}``) is created
+    with bulk-load settings, receives new writes while it is back-filled,
+    and then takes over the read alias in one ``update_aliases`` call. The
+    previous ``ES_INDEX_RETAIN`` versions are kept for rollback.
+
+    Chunks are routed by ``user_id``. Large tenants can be moved to a
+    dedicated single-shard index (``promote_tenant``), recorded in the
+    ``search:tenant_indices`` hash. ``migrate`` brings those indices to the
+    current schema as well, before the shared index.
+    """
+
+    _TENANTS_KEY = "search:tenant_indices"
+
+    def __init__(self):
+        self._ready = False
+        self._ensure_lock = asyncio.Lock()
+        self._migration: Optional[asyncio.Task] = None
+
+    @property
+    def es(self):
+        return db.elasticsearch
+
+    @property
+    def read_alias(self) -> str:
+        return settings.ES_INDEX_ALIAS
+
+    @property
+    def write_alias(self) -> str:
+        return f"{settings.ES_INDEX_ALIAS}-write"
+
+    def _serving_settings(self) -> dict:
+        return {
+            "number_of_replicas": settings.ES_NUMBER_OF_REPLICAS,
+            "refresh_interval": settings.ES_REFRESH_INTERVAL,
+        }
+
+    async def ensure(self) -> bool:
+        """Make sure both aliases resolve, migrating an outdated schema.
+
+        Returns ``False`` when ElasticSearch is unavailable.
+        """
+        if self._ready:
+            return True
+        if not self.es:
+            return False
+        async with self._ensure_lock:
+            if self._ready:
+                return True
+            try:
+                current = await self._alias_targets(self.read_alias)
+                if not current and not await self.es.indices.exists(index=self.read_alias):
+                    name = await self.create_version(bulk=False)
+                    await self.es.indices.update_aliases(
+                        actions=[
+                            {"add": {"index": name, "alias": self.read_alias}},
+                            {"add": {"index": name, "alias": self.write_alias, "is_write_index": True}},
+                        ]
+                    )
+                    self._ready = True
+                    return True
+
+                if not await self._alias_targets(self.write_alias):
+                    # Legacy concrete index: keep writing to it until it is migrated
+                    await self.es.indices.update_aliases(
+                        actions=[{"add": {"index": self.read_alias, "alias": self.write_alias}}]
+                    )
+                    current = [self.read_alias]
+                if await self._schema_version(current[0]) < SCHEMA_VERSION and settings.ES_AUTO_MIGRATE:
+                    self._migration = asyncio.create_task(self._migrate_in_background())
+                self._ready = True
+            except Exception as exc:
+                logger.warning("Unable to ensure ElasticSearch index: %s", exc)
+            return self._ready
+
+    async def create_version(self, bulk: bool = True) -> str:
+        """Create an empty index version, tuned for bulk loading by default"""
+        name = f"{self.read_alias}-v{SCHEMA_VERSION}-{datetime.utcnow():%Y%m%d%H%M%S%f}"
+        index_settings = {
+            "number_of_shards": settings.ES_NUMBER_OF_SHARDS,
+            **(_BULK_LOAD_SETTINGS if bulk else self._serving_settings()),
+        }
+        await self.es.indices.create(index=name, mappings=index_mappings(), settings=index_settings)
+        return name
+
+    async def begin(self, name: str):
+        """Route new writes to ``name`` while it is being back-filled"""
+        actions: List[dict] = [
+            {"remove": {"index": old, "alias": self.write_alias}}
+            for old in await self._alias_targets(self.write_alias)
+        ]
+        actions.append({"add": {"index": name, "alias": self.write_alias, "is_write_index": True}})
+        await self.es.indices.update_aliases(actions=actions)
+
+    async def finish(self, name: str):
+        """Restore serving settings and make the back-filled data visible"""
+        await self.es.indices.put_settings(index=name, settings=self._serving_settings())
+        await self.es.indices.refresh(index=name)
+        await self.es.cluster.health(index=name, wait_for_status="yellow", timeout="60s")
+
+    async def promote(self, name: str):
+        """Atomically point both aliases at ``name`` and prune old versions"""
+        actions: List[dict] = []
+        for alias in (self.read_alias, self.write_alias):
+            actions.extend(
+                {"remove": {"index": old, "alias": alias}}
+                for old in await self._alias_targets(alias)
+                if old != name
+            )
+        if not await self.es.indices.exists_alias(name=self.read_alias) and await self.es.indices.exists(
+            index=self.read_alias
+        ):
+            # A legacy concrete index has to go in the same call that creates the alias
+            actions.append({"remove_index": {"index": self.read_alias}})
+        actions.append({"add": {"index": name, "alias": self.read_alias}})
+        actions.append({"add": {"index": name, "alias": self.write_alias, "is_write_index": True}})
+        await self.es.indices.update_aliases(actions=actions)
+        self._ready = True
+        await self._prune(keep=name)
+
+    async def migrate(self) -> Dict[str, Any]:
+        """Copy the live index into a new version with ``_reindex`` and flip to it.
+
+        Dedicated tenant indices on an older schema are migrated first, one
+        at a time (``_migrate_tenant``); a failure there stops the run before
+        the shared index is touched, and tenants already done are skipped
+        when it is retried.
+
+        Only one migration runs at a time across processes. If a step fails
+        before the flip, writes go back to the old index and the new version
+        is dropped.
+        """
+        if not db.redis.set(_MIGRATION_LOCK, "1", nx=True, ex=60 * 60):
+            raise RuntimeError("Another search index migration is in progress")
+        try:
+            tenants = {}
+            for user_id, raw in sorted(db.redis.hgetall(self._TENANTS_KEY).items()):
+                entry = json.loads(raw)
+                if entry["ready"] and await self._schema_version(entry["index"]) < SCHEMA_VERSION:
+                    tenants[user_id] = await self._migrate_tenant(user_id, entry["index"])
+            report = await self._migrate()
+            report["tenants"] = tenants
+            return report
+        finally:
+            db.redis.delete(_MIGRATION_LOCK)
+
+    async def _migrate(self) -> Dict[str, Any]:
+        started = time.perf_counter()
+        started_at = datetime.utcnow().isoformat()
+        sources = await self._alias_targets(self.read_alias) or [self.read_alias]
+        target = await self.create_version()
+        await self.begin(target)
+
+        try:
+            # Writes that reached the new version first win over copied documents
+            task = await self.es.reindex(
+                source={"index": sources},
+                dest={"index": target, "op_type": "create"},
+                script=_ROUTE_BY_OWNER,
+                conflicts="proceed",
+                slices="auto",
+                wait_for_completion=False,
+            )
+            response = await self._wait_for_task(task["task"])
+
+            await self.finish(target)
+            await self.promote(target)
+        except BaseException:
+            if target not in await self._alias_targets(self.read_alias):
+                # Chunks written since the start only exist in the new version
+                await self.abort(target, restore={"range": {"created_at": {"gte": started_at}}})
+            raise
+        elapsed = time.perf_counter() - started
+        copied = response.get("created", 0)
+        return {
+            "index": target,
+            "sources": sources,
+            "copied": copied,
+            "seconds": round(elapsed, 3),
+            "documents_per_second": round(copied / elapsed, 2) if elapsed else 0.0,
+        }
+
+    async def _migrate_tenant(self, user_id: str, source: str) -> Dict[str, Any]:
+        """Copy a tenant index into a new version; reads stay on ``source`` until it is done"""
+        started_at = datetime.utcnow().isoformat()
+        target = f"{self.tenant_index_name(user_id)}-v{SCHEMA_VERSION}"
+        if not await self.es.indices.exists(index=target):
+            await self.es.indices.create(
+                index=target,
+                mappings=index_mappings(),
+                settings={"number_of_shards": 1, **_BULK_LOAD_SETTINGS},
+            )
+        db.redis.hset(
+            self._TENANTS_KEY,
+            user_id,
+            json.dumps({"index": target, "ready": False, "previous": source}),
+        )
+        try:
+            copied = await self.copy(source, target, {"match_all": {}})
+            await self.finish(target)
+        except BaseException:
+            # Chunks written since the start only exist in the new index
+            try:
+                await self.copy(target, source, {"range": {"created_at": {"gte": started_at}}}, op_type="index")
+            except Exception as exc:
+                logger.error("Could not copy writes back from %s, keeping it: %s", target, exc)
+            else:
+                await self.es.indices.delete(index=target, ignore_unavailable=True)
+            db.redis.hset(self._TENANTS_KEY, user_id, json.dumps({"index": source, "ready": True}))
+            raise
+        db.redis.hset(self._TENANTS_KEY, user_id, json.dumps({"index": target, "ready": True}))
+        await self.es.indices.delete(index=source, ignore_unavailable=True)
+        return {"index": target, "copied": copied}
+
+    async def copy(self, source: str, dest: str, query: dict, op_type: str = "create") -> int:
+        """Copy the chunks matching ``query`` between indices; returns the count"""
+        task = await self.es.reindex(
+            source={"index": source, "query": query},
+            dest={"index": dest, "op_type": op_type},
+            script=_ROUTE_BY_OWNER,
+            conflicts="proceed",
+            wait_for_completion=False,
+        )
+        response = await self._wait_for_task(task["task"])
+        return response.get("created", 0) + response.get("updated", 0)
+
+    async def abort(self, name: str, restore: Optional[dict] = None):
+        """Abandon an unpromoted version: writes go back to the live index.
+
+        Chunks matching ``restore`` (those written while ``name`` held the
+        write alias) are copied back first. ``name`` is then deleted, unless
+        that copy failed.
+        """
+        live = await self._alias_targets(self.read_alias) or [self.read_alias]
+        restored = True
+        if restore is not None:
+            try:
+                await self.copy(name, live[0], restore, op_type="index")
+            except Exception as exc:
+                restored = False
+                logger.error("Could not copy writes back from %s, keeping it: %s", name, exc)
+        actions: List[dict] = [
+            {"remove": {"index": old, "alias": self.write_alias}}
+            for old in await self._alias_targets(self.write_alias)
+        ]
+        actions.append({"add": {"index": live[0], "alias": self.write_alias, "is_write_index": True}})
+        await self.es.indices.update_aliases(actions=actions)
+        if restored:
+            await self.es.indices.delete(index=name, ignore_unavailable=True)
+
+    async def tenant_index(self, user_id: str, for_write: bool = False) -> Optional[str]:
+        """Dedicated index of a tenant, if it has one.
+
+        Writes go there as soon as a move starts; reads only once the
+        tenant's existing chunks have been copied. Until then reads use the
+        index being migrated from, or the shared index on a first move.
+        """
+        raw = db.redis.hget(self._TENANTS_KEY, user_id)
+        if not raw:
+            return None
+        entry = json.loads(raw)
+        return entry["index"] if for_write or entry["ready"] else entry.get("previous")
+
+    async def tenant_indices(self, user_id: str) -> List[str]:
+        """Every dedicated index holding the tenant's chunks (two while one is migrated)"""
+        raw = db.redis.hget(self._TENANTS_KEY, user_id)
+        if not raw:
+            return []
+        entry = json.loads(raw)
+        return [entry["index"], *([entry["previous"]] if entry.get("previous") else [])]
+
+    def tenant_index_name(self, user_id: str) -> str:
+        return f"{self.read_alias}-tenant-{re.sub(r'[^a-z0-9_-]', '_', user_id.lower())}"
+
+    async def promote_tenant(self, user_id: str) -> Dict[str, Any]:
+        """Move a tenant's chunks out of the shared index into its own index"""
+        started = time.perf_counter()
+        # A tenant that already has an index (possibly a migrated version) keeps it
+        name = await self.tenant_index(user_id, for_write=True) or self.tenant_index_name(user_id)
+        if not await self.es.indices.exists(index=name):
+            await self.es.indices.create(
+                index=name,
+                mappings=index_mappings(),
+                settings={"number_of_shards": 1, **_BULK_LOAD_SETTINGS},
+            )
+        db.redis.hset(self._TENANTS_KEY, user_id, json.dumps({"index": name, "ready": False}))
+
+        task = await self.es.reindex(
+            source={"index": self.read_alias, "query": {"term": {"user_id": user_id}}},
+            dest={"index": name, "op_type": "create"},
+            conflicts="proceed",
+            wait_for_completion=False,
+        )
+        response = await self._wait_for_task(task["task"])
+        await self.finish(name)
+        db.redis.hset(self._TENANTS_KEY, user_id, json.dumps({"index": name, "ready": True}))
+
+        await self.es.delete_by_query(
+            index=[self.read_alias, self.write_alias],
+            query={"term": {"user_id": user_id}},
+            routing=user_id,
+            conflicts="proceed",
+        )
+        return {
+            "index": name,
+            "copied": response.get("created", 0),
+            "seconds": round(time.perf_counter() - started, 3),
+        }
+
+    async def large_tenants(self) -> List[str]:
+        """Tenants in the shared index with at least ``ES_TENANT_INDEX_MIN_CHUNKS`` chunks"""
+        response = await self.es.search(
+            index=self.read_alias,
+            size=0,
+            aggs={
+                "tenants": {
+                    "terms": {
+                        "field": "user_id",
+                        "min_doc_count": settings.ES_TENANT_INDEX_MIN_CHUNKS,
+                        "size": 1000,
+                    }
+                }
+            },
+        )
+        buckets = response.get("aggregations", {}).get("tenants", {}).get("buckets", [])
+        return [bucket["key"] for bucket in buckets]
+
+    async def rollback(self) -> Optional[str]:
+        """Point the aliases back at the newest retained older version"""
+        current = set(await self._alias_targets(self.read_alias))
+        previous = [name for name in await self.versions() if name not in current]
+        if not previous:
+            return None
+        await self.finish(previous[-1])
+        actions: List[dict] = []
+        for alias in (self.read_alias, self.write_alias):
+            actions.extend(
+                {"remove": {"index": old, "alias": alias}}
+                for old in await self._alias_targets(alias)
+            )
+        actions.append({"add": {"index": previous[-1], "alias": self.read_alias}})
+        actions.append(
+            {"add": {"index": previous[-1], "alias": self.write_alias, "is_write_index": True}}
+        )
+        await self.es.indices.update_aliases(actions=actions)
+        return previous[-1]
+
+    async def status(self) -> Dict[str, Any]:
+        read = await self._alias_targets(self.read_alias)
+        return {
+            "schema_version": SCHEMA_VERSION,
+            "live_schema_version": await self._schema_version(read[0]) if read else None,
+            "read": read,
+            "write": await self._alias_targets(self.write_alias),
+            "versions": await self.versions(),
+            "tenants": {
+                user_id: json.loads(raw)
+                for user_id, raw in db.redis.hgetall(self._TENANTS_KEY).items()
+            },
+        }
+
+    async def versions(self) -> List[str]:
+        """Index versions, oldest first"""
+        indices = await self.es.indices.get(index=f"{self.read_alias}-v*", ignore_unavailable=True)
+        return sorted(indices, key=lambda name: name.rsplit("-", 1)[-1])
+
+    async def _prune(self, keep: str):
+        versions = [name for name in await self.versions() if name != keep]
+        stale = versions[: max(0, len(versions) - settings.ES_INDEX_RETAIN)]
+        for name in stale:
+            await self.es.indices.delete(index=name, ignore_unavailable=True)
+
+    async def _alias_targets(self, alias: str) -> List[str]:
+        if not await self.es.indices.exists_alias(name=alias):
+            return []
+        return sorted(await self.es.indices.get_alias(name=alias))
+
+    async def _schema_version(self, index: str) -> int:
+        mapping = await self.es.indices.get_mapping(index=index)
+        meta = next(iter(mapping.values()), {}).get("mappings", {}).get("_meta", {})
+        return int(meta.get("schema_version", 1))
+
+    async def _wait_for_task(self, task_id: str) -> dict:
+        while True:
+            status = await self.es.tasks.get(task_id=task_id)
+            if status.get("completed"):
+                break
+            await asyncio.sleep(1)
+        response = status.get("response", {})
+        if response.get("failures"):
+            raise RuntimeError(f"Reindex task {task_id} failed: {response['failures'][:3]}")
+        return response
+
+    async def _migrate_in_background(self):
+        if db.redis.exists(_MIGRATION_LOCK):
+            return  # Another process is already migrating
+        try:
+            report = await self.migrate()
+            logger.info("Search index migrated: %s", report)
+        except Exception as exc:
+            logger.error("Search index migration failed: %s", exc)
+
+
+# Global manager instance
+search_index = SearchIndexManager()
@@ -1,10 +1,13 @@
 """Session management service"""
 
+import gzip
 import uuid
-import json
-from datetime import datetime
+from datetime import datetime, timezone
+from pathlib import Path
 from typing import Optional, List
 
+from backend.config import settings
+from backend.core.chat_codec import decode_message, encode_message
 from backend.core.database import db
 from backend.models.sessions import Session, SessionCreate, ChatMessage
 
@@ -14,6 +17,7 @@ class SessionService:
 
     def __init__(self):
         self.redis = db.redis
+        self.archive_dir = Path(settings.CHAT_ARCHIVE_DIR)
 
     async def create_session(
         self,
@@ -89,12 +93,17 @@ class SessionService:
         if not self.redis.sismember(f"user:{user_id}:sessions", session_id):
             return False
 
-        # Delete session data
-        self.redis.delete(f"session:{session_id}")
-        self.redis.delete(f"session:{session_id}:documents")
-        self.redis.delete(f"session:{session_id}:drafts")
-        self.redis.delete(f"session:{session_id}:chat_history")
+        # Delete session data (UNLINK frees long chat histories off the main thread).
+        # The session's drafts are left to the garbage collector (gc_service).
+        self.redis.unlink(
+            f"session:{session_id}",
+            f"session:{session_id}:documents",
+            f"session:{session_id}:drafts",
+            f"session:{session_id}:chat_history",
+            f"session:{session_id}:chat_summary",
+        )
         self.redis.srem(f"user:{user_id}:sessions", session_id)
+        self._archive_path(session_id).unlink(missing_ok=True)
 
         return True
 
@@ -104,16 +113,10 @@ class SessionService:
         message: ChatMessage,
     ):
         """Add a message to session chat history"""
-        message_data = {
-            "role": message.role,
-            "content": message.content,
-            "timestamp": message.timestamp.isoformat(),
-        }
-
         # Append to chat history list
-        self.redis.rpush(
+        length = self.redis.rpush(
             f"session:{session_id}:chat_history",
-            json.dumps(message_data),
+            encode_message(message.role, message.content, message.timestamp),
         )
 
         # Update session timestamp
@@ -123,22 +126,122 @@ class SessionService:
             datetime.utcnow().isoformat(),
         )
 
-    async def get_chat_history(self, session_id: str) -> List[ChatMessage]:
-        """Get session chat history"""
-        messages = []
-        chat_history = self.redis.lrange(f"session:{session_id}:chat_history", 0, -1)
-
-        for message_json in chat_history:
-            message_data = json.loads(message_json)
-            messages.append(
-                ChatMessage(
-                    role=message_data["role"],
-                    content=message_data["content"],
-                    timestamp=datetime.fromisoformat(message_data["timestamp"]),
+        self.archive_overflow(session_id, length)
+
+    async def get_chat_history(
+        self,
+        session_id: str,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        before: Optional[datetime] = None,
+    ) -> List[ChatMessage]:
+        """Get session chat history in chronological order
+
+        With ``limit`` only one page is read: the newest ``limit`` messages
+        after skipping ``offset`` newer ones, or the newest ``limit`` messages
+        sent strictly before ``before``. Pages reaching into archived
+        messages read the compressed cold storage.
+        """
+        total = self.count_chat_messages(session_id)
+        end = total - offset
+        if before is not None:
+            end = min(end, self._index_before(session_id, before))
+        start = 0 if limit is None else max(0, end - limit)
+
+        return [
+            ChatMessage(**message)
+            for message in self._read_range(session_id, start, max(start, end))
+        ]
+
+    def count_chat_messages(self, session_id: str) -> int:
+        """Total messages including archived ones"""
+        return self._archived_count(session_id) + self.redis.llen(
+            f"session:{session_id}:chat_history"
+        )
+
+    def archive_overflow(self, session_id: str, length: Optional[int] = None):
+        """Move the oldest messages to cold storage once the hot list is over its cap"""
+        history_key = f"session:{session_id}:chat_history"
+        if length is None:
+            length = self.redis.llen(history_key)
+        if length <= settings.CHAT_HISTORY_MAX_MESSAGES + settings.CHAT_ARCHIVE_BATCH:
+            return
+
+        # One archiver per session at a time
+        lock_key = f"session:{session_id}:chat_archive_lock"
+        if not self.redis.set(lock_key, "1", nx=True, ex=60):
+            return
+        try:
+            count = length - settings.CHAT_HISTORY_MAX_MESSAGES
+            raw_messages = self.redis.lrange(history_key, 0, count - 1)
+
+            path = self._archive_path(session_id)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Each archival appends one gzip member; readers see a single stream
+            with gzip.open(path, "at", encoding="utf-8") as archive:
+                archive.write("".join(f"{raw}\n" for raw in raw_messages))
+
+            pipe = self.redis.pipeline(transaction=True)
+            pipe.ltrim(history_key, len(raw_messages), -1)
+            pipe.hincrby(f"session:{session_id}", "archived_messages", len(raw_messages))
+            pipe.execute()
+        finally:
+            self.redis.delete(lock_key)
+
+    def _archived_count(self, session_id: str) -> int:
+        return int(self.redis.hget(f"session:{session_id}", "archived_messages") or 0)
+
+    def _archive_path(self, session_id: str) -> Path:
+        return self.archive_dir / f"{session_id}.jsonl.gz"
+
+    def _read_archive(self, session_id: str) -> List[str]:
+        path = self._archive_path(session_id)
+        if not path.exists():
+            return []
+        with gzip.open(path, "rt", encoding="utf-8") as archive:
+            return [line.rstrip("\n") for line in archive if line.strip()]
+
+    def _read_range(self, session_id: str, start: int, end: int) -> List[dict]:
+        """Decode messages with absolute indexes ``[start, end)``"""
+        archived = self._archived_count(session_id)
+        raw_messages: List[str] = []
+        if start < archived:
+            raw_messages.extend(self._read_archive(session_id)[start:min(end, archived)])
+        if end > archived:
+            raw_messages.extend(
+                self.redis.lrange(
+                    f"session:{session_id}:chat_history",
+                    max(0, start - archived),
+                    end - archived - 1,
                 )
             )
-
-        return messages
+        return [decode_message(raw) for raw in raw_messages]
+
+    def _index_before(self, session_id: str, before: datetime) -> int:
+        """Absolute index of the first message sent at or after ``before``"""
+        history_key = f"session:{session_id}:chat_history"
+        archived = self._archived_count(session_id)
+        if before.tzinfo is not None:
+            # Stored timestamps are naive UTC
+            before = before.astimezone(timezone.utc).replace(tzinfo=None)
+
+        low, high = 0, self.redis.llen(history_key)
+        while low < high:
+            middle = (low + high) // 2
+            raw = self.redis.lindex(history_key, middle)
+            if raw is not None and decode_message(raw)["timestamp"] < before:
+                low = middle + 1
+            else:
+                high = middle
+        if low > 0 or archived == 0:
+            return archived + low
+
+        # Everything hot is newer; search the archive (cold path)
+        archive = self._read_archive(session_id)
+        for index, raw in enumerate(archive):
+            if decode_message(raw)["timestamp"] >= before:
+                return index
+        return len(archive)
 
 
 # Global service instance
@@ -0,0 +1,178 @@
+"""Resumable SSE streams for long-running generations"""
+
+import asyncio
+import logging
+import uuid
+from datetime import datetime
+from typing import AsyncIterator, Dict, Optional, Set, Tuple, Union
+
+import orjson
+
+from backend.config import settings
+from backend.core.coalesce import coalesce_events
+from backend.core.database import db
+from backend.core.sse import id_frame, retry_frame
+
+
+logger = logging.getLogger(__name__)
+
+
+def parse_event_id(value: Optional[str]) -> Optional[Tuple[str, int]]:
+    """``"{stream_id}:{seq}"`` (an SSE ``Last-Event-ID``) -> (stream_id, seq)"""
+    if not value:
+        return None
+    stream_id, _, seq = value.strip().rpartition(":")
+    if not stream_id or not seq.isdigit():
+        return None
+    return stream_id, int(seq)
+
+
+async def text_events(chunks: AsyncIterator[str]) -> AsyncIterator[Union[str, dict]]:
+    """Pass a plain text stream through as content deltas and end it with ``done``.
+
+    Deltas stay bare strings through coalescing, so ``encode_event`` builds
+    one dict per written event rather than two per token.
+    """
+    async for chunk in chunks:
+        yield chunk
+    yield {"type": "done"}
+
+
+def encode_event(seq: int, event: Union[str, dict]) -> bytes:
+    """JSON stored for event ``seq``; a bare string is a ``content`` event"""
+    if isinstance(event, str):
+        return orjson.dumps({"seq": seq, "type": "content", "content": event})
+    return orjson.dumps({"seq": seq, **event})
+
+
+class StreamService:
+    """Runs generations detached from the HTTP connection and replays their events.
+
+    Every streaming endpoint speaks one protocol: SSE frames with
+    ``id: {stream_id}:{seq}`` and a JSON ``data`` object carrying ``seq`` and
+    ``type`` (``stream`` first, then ``content``/section events, ending with
+    ``done`` or ``error``). Events are kept in Redis so any process can serve
+    a reconnect:
+
+    - ``stream:{id}`` hash with owner, kind, draft and status
+    - ``stream:{id}:events`` list of JSON events; the index is ``seq``
+
+    Both expire ``STREAM_REPLAY_TTL_SECONDS`` after the last event. A client
+    that reconnects with ``Last-Event-ID`` is served the events it missed and
+    then follows the live stream; the LLM call is never restarted.
+    """
+
+    def __init__(self):
+        self.redis = db.redis
+        self._tasks: Set[asyncio.Task] = set()
+        # Wakes local readers on each new event; other processes poll
+        self._signals: Dict[str, asyncio.Event] = {}
+
+    @property
+    def tasks(self) -> Set[asyncio.Task]:
+        """Background tasks still running in this process"""
+        return self._tasks
+
+    def start(
+        self,
+        user_id: str,
+        kind: str,
+        events: AsyncIterator[Union[str, dict]],
+        draft_id: Optional[str] = None,
+    ) -> str:
+        """Start recording ``events`` in the background; returns the stream id"""
+        stream_id = uuid.uuid4().hex
+        stream_key = f"stream:{stream_id}"
+        self.redis.hset(
+            stream_key,
+            mapping={
+                "user_id": user_id,
+                "kind": kind,
+                "draft_id": draft_id or "",
+                "status": "running",
+                "created_at": datetime.utcnow().isoformat(),
+            },
+        )
+        self.redis.expire(stream_key, settings.STREAM_REPLAY_TTL_SECONDS)
+        self._signals[stream_id] = asyncio.Event()
+        self._append(stream_id, 0, {"type": "stream", "stream_id": stream_id, "kind": kind})
+
+        task = asyncio.create_task(self._run(stream_id, events))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return stream_id
+
+    def owner(self, stream_id: str) -> Optional[str]:
+        """User that started the stream, or None once it has expired"""
+        return self.redis.hget(f"stream:{stream_id}", "user_id")
+
+    def resumable(self, stream_id: str, user_id: str, kind: str, draft_id: Optional[str] = None) -> bool:
+        """Whether the stream is the caller's ``kind`` stream for ``draft_id``"""
+        values = self.redis.hmget(f"stream:{stream_id}", ["user_id", "kind", "draft_id"])
+        return values == [user_id, kind, draft_id or ""]
+
+    async def frames(self, stream_id: str, after: int = -1) -> AsyncIterator[bytes]:
+        """SSE frames for events after sequence ``after``, until the stream ends"""
+        stream_key = f"stream:{stream_id}"
+        events_key = f"{stream_key}:events"
+        cursor = after + 1
+        yield retry_frame(settings.STREAM_RETRY_MS)
+
+        while True:
+            signal = self._signals.get(stream_id)
+            # Read the status first: once finished, the list below is complete
+            status = self.redis.hget(stream_key, "status")
+            raw_events = self.redis.lrange(events_key, cursor, -1)
+            for raw in raw_events:
+                yield id_frame(f"{stream_id}:{cursor}", raw)
+                cursor += 1
+            if raw_events:
+                continue
+            if status != "running":
+                return
+            if signal is not None:
+                try:
+                    await asyncio.wait_for(signal.wait(), settings.STREAM_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+            else:
+                await asyncio.sleep(settings.STREAM_POLL_SECONDS)
+
+    async def _run(self, stream_id: str, events: AsyncIterator[Union[str, dict]]):
+        seq = 1
+        status = "completed"
+        try:
+            async for event in coalesce_events(events):
+                self._append(stream_id, seq, event)
+                seq += 1
+        except asyncio.CancelledError:
+            status = "failed"
+            self._append(stream_id, seq, {"type": "error", "message": "Generation interrupted"})
+            raise
+        except Exception as e:
+            logger.warning("Stream %s failed: %s", stream_id, e)
+            status = "failed"
+            self._append(stream_id, seq, {"type": "error", "message": str(e)})
+        finally:
+            self.redis.hset(f"stream:{stream_id}", "status", status)
+            signal = self._signals.pop(stream_id, None)
+            if signal is not None:
+                signal.set()
+
+    def _append(self, stream_id: str, seq: int, event: Union[str, dict]):
+        stream_key = f"stream:{stream_id}"
+        events_key = f"{stream_key}:events"
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.rpush(events_key, encode_event(seq, event))
+        pipe.expire(events_key, settings.STREAM_REPLAY_TTL_SECONDS)
+        pipe.expire(stream_key, settings.STREAM_REPLAY_TTL_SECONDS)
+        pipe.execute()
+
+        signal = self._signals.get(stream_id)
+        if signal is not None:
+            self._signals[stream_id] = asyncio.Event()
+            signal.set()
+
+
+# Global service instance
+stream_service = StreamService()
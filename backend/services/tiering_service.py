@@ -0,0 +1,325 @@
+"""Tiered storage: idle chunk content and draft bodies move from Redis to disk"""
+
+import asyncio
+import logging
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from redis.exceptions import WatchError
+
+from backend.config import settings
+from backend.core import chunk_codec
+from backend.core.cold_store import cold_store
+from backend.core.database import db
+from backend.models.blog import BlogStatus
+from backend.models.documents import ProcessingStatus
+
+
+logger = logging.getLogger(__name__)
+
+# Set on document:{id} / draft:{id} while the content lives in the cold store
+TIER_FIELD = "tier"
+COLD_TIER = "cold"
+
+_LOCK_KEY = "tier:lock"
+# Cold rows not (or no longer) referenced are removed once this old, so a
+# move still in flight in another process never loses its row
+_SWEEP_GRACE_SECONDS = 60 * 60
+
+
+def _timestamp(value: Union[str, bytes, None]) -> Optional[float]:
+    if not value:
+        return None
+    if isinstance(value, bytes):
+        value = value.decode()
+    try:
+        return (datetime.fromisoformat(value) - datetime(1970, 1, 1)).total_seconds()
+    except ValueError:
+        return None
+
+
+def _last_access(*values: Union[str, bytes, None]) -> float:
+    return max((stamp for stamp in map(_timestamp, values) if stamp is not None), default=0.0)
+
+
+class TieringService:
+    """Moves what nobody reads out of Redis and back in on first access.
+
+    A pass walks the keyspace with incremental ``SCAN`` and moves the chunk
+    blob (``document:{id}:content``) of documents and the body of drafts
+    not accessed for ``TIER_AFTER_DAYS`` into the cold store. With
+    ``TIER_HOT_MAX_MB`` set, least recently accessed content then keeps
+    moving until what is left fits the budget. Each move is a WATCH
+    transaction, so an object read or written meanwhile stays in Redis.
+
+    The object's hash stays in Redis, marked ``tier: cold``; metadata reads
+    never touch disk. ``read_document``/``read_draft`` serve the content
+    from disk and, when promoting, put it back into Redis; they block on
+    SQLite, so async callers run them in a thread. Reads record
+    ``accessed_at`` at most every ``TIER_TOUCH_SECONDS``. Passes hold
+    ``tier:lock`` so only one runs at a time.
+    """
+
+    def __init__(self):
+        self.redis = db.redis
+        self.raw_redis = db.raw_redis
+        self.cold = cold_store
+        self.worker_id = uuid.uuid4().hex
+        self.last_report: Optional[Dict[str, Any]] = None
+        self._task: Optional[asyncio.Task] = None
+
+    # -- access path ----------------------------------------------------
+
+    def touch(self, key: str, accessed_at: Union[str, bytes, None]):
+        """Record a read of ``key``, at most once per TIER_TOUCH_SECONDS"""
+        if time.time() - _last_access(accessed_at) >= settings.TIER_TOUCH_SECONDS:
+            self.redis.hset(key, "accessed_at", datetime.utcnow().isoformat())
+
+    def read_document(self, doc_id: str, promote: bool = True) -> Optional[bytes]:
+        """Chunk blob of a cold document; ``promote`` moves it back into Redis"""
+        content_key = f"document:{doc_id}:content"
+        row = self.cold.get_row(content_key)
+        if row is None:  # promoted by another reader in the meantime
+            return self.raw_redis.get(content_key)
+        blob, stored_at = row
+        if not promote:
+            return blob
+
+        pipe = self.redis.pipeline()
+        # NX: content written by re-processing since the move wins
+        pipe.set(content_key, blob, nx=True)
+        pipe.hdel(f"document:{doc_id}", TIER_FIELD)
+        pipe.hset(f"document:{doc_id}", "accessed_at", datetime.utcnow().isoformat())
+        stored = pipe.execute()[0]
+        # Only the copy read above: the object may have been moved out again since
+        self.cold.delete_rows([(content_key, stored_at)])
+        return blob if stored else self.raw_redis.get(content_key)
+
+    def read_draft(self, draft_id: str, promote: bool = True) -> Optional[str]:
+        """Body of a cold draft; ``promote`` moves it back into Redis"""
+        content_key = f"draft:{draft_id}:content"
+        row = self.cold.get_row(content_key)
+        if row is None:
+            return self.redis.hget(f"draft:{draft_id}", "content")
+        blob, stored_at = row
+        content = "".join(chunk_codec.decode_chunks(blob))
+        if not promote:
+            return content
+
+        draft_key = f"draft:{draft_id}"
+        pipe = self.redis.pipeline()
+        pipe.hsetnx(draft_key, "content", content)
+        pipe.hdel(draft_key, TIER_FIELD)
+        pipe.hset(draft_key, "accessed_at", datetime.utcnow().isoformat())
+        stored = pipe.execute()[0]
+        self.cold.delete_rows([(content_key, stored_at)])
+        return content if stored else self.redis.hget(draft_key, "content")
+
+    def forget(self, owner_key: str):
+        """Drop the cold copy of an object about to be deleted"""
+        if self.redis.hget(owner_key, TIER_FIELD) == COLD_TIER:
+            self.cold.delete([f"{owner_key}:content"])
+
+    # -- moves ----------------------------------------------------------
+
+    def _demote_document(self, doc_id: str) -> Optional[int]:
+        """Move one document's chunks to disk; bytes moved, 0 if skipped, None if raced"""
+        doc_key = f"document:{doc_id}"
+        content_key = f"{doc_key}:content"
+        with self.raw_redis.pipeline() as pipe:
+            try:
+                pipe.watch(doc_key, content_key)
+                tier, status = pipe.hmget(doc_key, TIER_FIELD, "status")
+                if tier or status != ProcessingStatus.COMPLETED.value.encode():
+                    return 0
+                kind = pipe.type(content_key)
+                if kind == b"string":
+                    blob = pipe.get(content_key)
+                elif kind == b"hash":  # written before chunks were packed
+                    fields = pipe.hgetall(content_key)
+                    chunks = sorted(fields.items(), key=lambda item: int(item[0].split(b"_")[1]))
+                    blob = chunk_codec.encode_chunks([value.decode() for _, value in chunks])
+                else:
+                    return 0
+                stored_at = self.cold.put(content_key, blob)
+                pipe.multi()
+                pipe.unlink(content_key)
+                pipe.hset(doc_key, TIER_FIELD, COLD_TIER)
+                pipe.execute()
+                return len(blob)
+            except WatchError:
+                self.cold.delete_rows([(content_key, stored_at)])
+                return None
+
+    def _demote_draft(self, draft_id: str) -> Optional[int]:
+        """Move one draft's body to disk; bytes moved, 0 if skipped, None if raced"""
+        draft_key = f"draft:{draft_id}"
+        content_key = f"{draft_key}:content"
+        with self.raw_redis.pipeline() as pipe:
+            try:
+                pipe.watch(draft_key)
+                tier, status, content = pipe.hmget(draft_key, TIER_FIELD, "status", "content")
+                if tier or not content or status == BlogStatus.GENERATING.value.encode():
+                    return 0
+                blob = chunk_codec.encode_chunks([content.decode()])
+                stored_at = self.cold.put(content_key, blob)
+                pipe.multi()
+                pipe.hdel(draft_key, "content")
+                pipe.hset(draft_key, TIER_FIELD, COLD_TIER)
+                pipe.execute()
+                return len(content)
+            except WatchError:
+                self.cold.delete_rows([(content_key, stored_at)])
+                return None
+
+    def _sweep(self, dry_run: bool) -> int:
+        """Remove cold rows whose object is gone or back in Redis"""
+        removed = 0
+        for rows in self.cold.scan(older_than=time.time() - _SWEEP_GRACE_SECONDS):
+            owners = [key.rsplit(":", 1)[0] for key, _ in rows]
+            pipe = self.redis.pipeline(transaction=False)
+            for owner in owners:
+                pipe.hget(owner, TIER_FIELD)
+            stale = [row for row, tier in zip(rows, pipe.execute(), strict=True) if tier != COLD_TIER]
+            # By (key, stored_at): a row written again by a move since the scan stays
+            removed += len(stale) if dry_run else self.cold.delete_rows(stale)
+        return removed
+
+    # -- passes ---------------------------------------------------------
+
+    async def _candidates(self) -> Tuple[int, List[Tuple[float, str, str, int]]]:
+        """All content still in Redis as ``(last access, family, id, bytes)``"""
+        scanned = 0
+        hot: List[Tuple[float, str, str, int]] = []
+        cursor = 0
+        while True:
+            cursor, keys = self.redis.scan(cursor, count=settings.GC_SCAN_COUNT)
+            scanned += len(keys)
+            ids = [key.split(":") for key in keys if key.count(":") == 1]
+            ids = [(family, object_id) for family, object_id in ids if family in ("document", "draft")]
+
+            pipe = self.redis.pipeline(transaction=False)
+            for family, object_id in ids:
+                key = f"{family}:{object_id}"
+                if family == "document":
+                    pipe.hmget(key, "user_id", "status", TIER_FIELD, "accessed_at", "processed_at", "created_at")
+                    pipe.strlen(f"{key}:content")
+                else:
+                    pipe.hmget(key, "user_id", "status", TIER_FIELD, "accessed_at", "updated_at", "created_at")
+                    pipe.hstrlen(key, "content")
+            rows = pipe.execute(raise_on_error=False)
+
+            for index, (family, object_id) in enumerate(ids):
+                fields, size = rows[2 * index], rows[2 * index + 1]
+                user_id, status, tier, *stamps = fields
+                if not user_id or tier:
+                    continue
+                if family == "document" and status != ProcessingStatus.COMPLETED.value:
+                    continue
+                if family == "draft" and status == BlogStatus.GENERATING.value:
+                    continue
+                if isinstance(size, Exception):
+                    size = 0  # chunk hash from before packing; moved by age only
+                if size or family == "document":
+                    hot.append((_last_access(*stamps), family, object_id, size))
+
+            if not cursor:
+                return scanned, hot
+            await asyncio.sleep(settings.GC_PAUSE_MS / 1000)
+
+    async def run(self, dry_run: bool = False) -> Dict[str, Any]:
+        """Run one pass; returns what was (or, in a dry run, would be) moved"""
+        started = time.perf_counter()
+        scanned, hot = await self._candidates()
+        hot.sort()
+        hot_bytes = sum(size for *_, size in hot)
+
+        chosen = []
+        if settings.TIER_AFTER_DAYS > 0:
+            cutoff = time.time() - timedelta(days=settings.TIER_AFTER_DAYS).total_seconds()
+            chosen = [item for item in hot if item[0] < cutoff]
+        if settings.TIER_HOT_MAX_MB > 0:
+            excess = hot_bytes - sum(size for *_, size in chosen) - settings.TIER_HOT_MAX_MB * 1024 * 1024
+            for item in hot[len(chosen):]:
+                if excess <= 0:
+                    break
+                chosen.append(item)
+                excess -= item[3]
+
+        moved: Counter = Counter()
+        moved_bytes = raced = 0
+        for _, family, object_id, size in chosen:
+            if dry_run:
+                moved[family] += 1
+                moved_bytes += size
+                continue
+            demote = self._demote_document if family == "document" else self._demote_draft
+            result = await asyncio.to_thread(demote, object_id)
+            if result is None:
+                raced += 1
+            elif result:
+                moved[family] += 1
+                moved_bytes += size or result
+
+        swept = await asyncio.to_thread(self._sweep, dry_run)
+        report = {
+            "dry_run": dry_run,
+            "scanned_keys": scanned,
+            "moved": dict(moved),
+            "moved_bytes": moved_bytes,
+            "raced": raced,
+            "swept_rows": swept,
+            "hot_bytes_before": hot_bytes,
+            "hot_bytes_after": hot_bytes - moved_bytes,
+            "cold_store": await asyncio.to_thread(self.cold.stats),
+            "seconds": round(time.perf_counter() - started, 3),
+        }
+        self.last_report = report
+        return report
+
+    def acquire_lock(self, seconds: int) -> bool:
+        """Claim ``tier:lock`` for this process for up to ``seconds``"""
+        return bool(self.redis.set(_LOCK_KEY, self.worker_id, nx=True, ex=max(1, seconds)))
+
+    def release_lock(self):
+        if self.redis.get(_LOCK_KEY) == self.worker_id:
+            self.redis.delete(_LOCK_KEY)
+
+    def start(self):
+        """Run a pass every ``TIER_INTERVAL_SECONDS`` in the background"""
+        enabled = settings.TIER_AFTER_DAYS > 0 or settings.TIER_HOT_MAX_MB > 0
+        if enabled and settings.TIER_INTERVAL_SECONDS > 0 and self._task is None:
+            self._task = asyncio.create_task(self._run_periodically())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run_periodically(self):
+        interval = settings.TIER_INTERVAL_SECONDS
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                # One worker process moves content per interval; the lock just expires
+                if not self.acquire_lock(int(interval * 0.9)):
+                    continue
+                report = await self.run()
+                logger.info(
+                    "Tiering: moved %s (%s bytes) to disk, %s raced, %s stale rows swept in %ss",
+                    report["moved"],
+                    report["moved_bytes"],
+                    report["raced"],
+                    report["swept_rows"],
+                    report["seconds"],
+                )
+            except Exception as e:
+                logger.warning("Tiering pass failed: %s", e)
+
+
+# Global service instance
+tiering_service = TieringService()
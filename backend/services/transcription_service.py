@@ -0,0 +1,183 @@
+"""Offline audio transcription with windowed, parallel decoding"""
+
+import asyncio
+import importlib
+import logging
+import multiprocessing
+import os
+import shutil
+import wave
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import AsyncIterator, Callable, List, Optional, Tuple
+
+from backend.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2  # 16-bit PCM
+
+# Built-in engines; any other value of TRANSCRIPTION_ENGINE is read as "module:function"
+ENGINES = {
+    "faster_whisper": "backend.services.transcription_service:faster_whisper_engine",
+}
+
+Segment = Tuple[float, float, str]
+
+_whisper_model = None
+
+
+def faster_whisper_engine(pcm: bytes, sample_rate: int) -> List[Segment]:
+    """Transcribe 16 kHz mono PCM with faster-whisper on CPU"""
+    global _whisper_model
+    try:
+        import numpy as np  # type: ignore
+        from faster_whisper import WhisperModel  # type: ignore
+    except ImportError as exc:
+        raise ValueError("faster-whisper not installed for transcription") from exc
+    if sample_rate != SAMPLE_RATE:
+        raise ValueError(f"faster-whisper expects {SAMPLE_RATE} Hz audio")
+
+    # One model per worker process, loaded on first use
+    if _whisper_model is None:
+        _whisper_model = WhisperModel(
+            settings.TRANSCRIPTION_MODEL, device="cpu", compute_type="int8"
+        )
+    audio = np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
+    segments, _ = _whisper_model.transcribe(
+        audio,
+        language=settings.TRANSCRIPTION_LANGUAGE or None,
+        vad_filter=True,
+    )
+    return [(segment.start, segment.end, segment.text.strip()) for segment in segments]
+
+
+def _resolve_engine(spec: str) -> Callable:
+    module_name, _, attr = ENGINES.get(spec, spec).partition(":")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def _transcribe(engine_spec: str, pcm: bytes, sample_rate: int) -> List[Segment]:
+    """Worker process entry point: transcribe one window"""
+    return _resolve_engine(engine_spec)(pcm, sample_rate)
+
+
+class TranscriptionService:
+    """Decodes audio in fixed windows and transcribes them in a process pool.
+
+    Windows are decoded incrementally (ffmpeg to 16 kHz mono PCM, or the
+    stdlib ``wave`` reader for matching WAV files), at most
+    ``2 * max_workers`` are in flight, and segments are yielded in time
+    order as soon as the window holding them is done.
+    """
+
+    def __init__(self):
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def max_workers(self) -> int:
+        return max(1, settings.TRANSCRIPTION_MAX_WORKERS or (os.cpu_count() or 1))
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    async def transcribe(self, path: Path) -> AsyncIterator[Segment]:
+        """Yield ``(start, end, text)`` segments with absolute timestamps"""
+        loop = asyncio.get_running_loop()
+        pending: deque = deque()
+        limit = 2 * self.max_workers
+
+        async def drain_one():
+            window_start, task = pending.popleft()
+            for start, end, text in await task:
+                if text:
+                    yield window_start + start, window_start + end, text
+
+        try:
+            async for window_start, pcm, sample_rate in self._decode_windows(path):
+                task = loop.run_in_executor(
+                    self._get_executor(),
+                    _transcribe,
+                    settings.TRANSCRIPTION_ENGINE,
+                    pcm,
+                    sample_rate,
+                )
+                pending.append((window_start, task))
+                if len(pending) >= limit:
+                    async for segment in drain_one():
+                        yield segment
+            while pending:
+                async for segment in drain_one():
+                    yield segment
+        finally:
+            for _, task in pending:
+                task.cancel()
+
+    async def _decode_windows(self, path: Path) -> AsyncIterator[Tuple[float, bytes, int]]:
+        window_seconds = settings.TRANSCRIPTION_WINDOW_SECONDS
+
+        if shutil.which("ffmpeg"):
+            window_bytes = int(window_seconds * SAMPLE_RATE) * SAMPLE_WIDTH
+            process = await asyncio.create_subprocess_exec(
+                "ffmpeg", "-nostdin", "-v", "error", "-i", str(path),
+                "-f", "s16le", "-ac", "1", "-ar", str(SAMPLE_RATE), "-",
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
+            )
+            index = 0
+            try:
+                while True:
+                    try:
+                        pcm = await process.stdout.readexactly(window_bytes)
+                    except asyncio.IncompleteReadError as exc:
+                        pcm = exc.partial
+                    if not pcm:
+                        break
+                    yield index * window_seconds, pcm, SAMPLE_RATE
+                    index += 1
+                    if len(pcm) < window_bytes:
+                        break
+            finally:
+                if process.returncode is None:
+                    process.kill()
+                await process.wait()
+            if process.returncode not in (0, -9) and index == 0:
+                raise ValueError(f"ffmpeg could not decode {path.name}")
+            return
+
+        if path.suffix.lower() != ".wav":
+            raise ValueError("ffmpeg is required to decode compressed audio")
+
+        reader = await asyncio.to_thread(wave.open, str(path), "rb")
+        try:
+            if reader.getnchannels() != 1 or reader.getsampwidth() != SAMPLE_WIDTH:
+                raise ValueError("ffmpeg is required for non-mono or non-16-bit WAV files")
+            sample_rate = reader.getframerate()
+            frames_per_window = int(window_seconds * sample_rate)
+            index = 0
+            while True:
+                pcm = await asyncio.to_thread(reader.readframes, frames_per_window)
+                if not pcm:
+                    break
+                yield index * window_seconds, pcm, sample_rate
+                index += 1
+        finally:
+            reader.close()
+
+    def shutdown(self):
+        """Stop worker processes"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Global service instance
+transcription_service = TranscriptionService()
@@ -0,0 +1,78 @@
+"""Agent chat history tests (the store needs fakeredis)"""
+
+import pytest
+
+from backend.agent.history import SessionHistoryStore, clip_summary
+from backend.config import settings
+from backend.services.session_service import session_service
+
+
+def test_clip_summary_starts_at_a_sentence():
+    summary = "First point here. Second point follows! Third one? Fourth."
+
+    assert clip_summary(summary, 100) == summary
+    assert clip_summary(summary, 30) == "Third one? Fourth."
+    assert clip_summary("Line one\nline two", 12) == "line two"
+    # A single long sentence is cut rather than dropped
+    assert clip_summary("no boundary at all in this text", 10) == "this text"
+
+
+@pytest.fixture
+def store(monkeypatch):
+    fakeredis = pytest.importorskip("fakeredis")
+    fake = fakeredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(session_service, "redis", fake)
+    return SessionHistoryStore(redis=fake, max_cached_sessions=2, window=3, summary_batch=2)
+
+
+def test_cache_reloads_when_another_writer_appends(store):
+    store.append("s1", "user", "hello")
+    first = store.load("s1")
+    assert store.load("s1") is first
+
+    # Another process appends; LLEN no longer matches the cached window
+    other = SessionHistoryStore(redis=store.redis, window=3)
+    other.append("s1", "assistant", "hi there")
+    reloaded = store.load("s1")
+    assert reloaded is not first
+    assert [m["content"] for m in reloaded.window] == ["hello", "hi there"]
+
+
+def test_cache_reloads_when_archival_restores_the_length(store, monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "CHAT_HISTORY_MAX_MESSAGES", 4)
+    monkeypatch.setattr(settings, "CHAT_ARCHIVE_BATCH", 2)
+    monkeypatch.setattr(session_service, "archive_dir", tmp_path)
+    other = SessionHistoryStore(redis=store.redis, window=3)
+
+    for n in range(4):
+        store.append("s1", "user", f"m{n}")
+    cached = store.load("s1")
+    assert cached.length == 4
+
+    # The other writer pushes past the cap; archival trims back to 4 messages
+    for n in range(4, 7):
+        other.append("s1", "assistant", f"m{n}")
+    assert store.redis.llen("session:s1:chat_history") == 4
+
+    reloaded = store.load("s1")
+    assert reloaded is not cached
+    assert reloaded.archived == 3
+    assert [m["content"] for m in reloaded.window] == ["m4", "m5", "m6"]
+
+
+def test_window_summary_and_lru_eviction(store):
+    for n in range(6):
+        store.append("s1", "user", f"m{n}")
+
+    assert [m["content"] for m in store.load("s1").window] == ["m3", "m4", "m5"]
+    messages, upto = store.pending_summary("s1")
+    assert ([m["content"] for m in messages], upto) == (["m0", "m1", "m2"], 3)
+
+    store.update_summary("s1", "Talked about m0 to m2.", upto)
+    assert store.pending_summary("s1") is None
+    assert store.prompt_messages("s1")[0] == "Talked about m0 to m2."
+
+    store.load("s2")
+    store.load("s3")
+    assert "s1" not in store._cache
+    assert store.load("s1").summary == "Talked about m0 to m2."
@@ -0,0 +1,87 @@
+"""Batch generation tests (needs fakeredis)"""
+
+import asyncio
+
+import pytest
+
+from backend.config import settings
+from backend.models.blog import BlogBatchItem, BlogBatchRequest
+from backend.services.batch_service import BatchService
+from backend.services.blog_service import blog_service
+from backend.services.draft_history_service import draft_history_service
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+@pytest.fixture
+def batches(monkeypatch):
+    fake = fakeredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(blog_service, "redis", fake)
+    monkeypatch.setattr(draft_history_service, "redis", fake)
+    contexts = []
+
+    async def build_document_context(user_id, document_ids, query):
+        contexts.append(document_ids)
+        return "context"
+
+    async def generate_content(draft_id, instructions=None, doc_context=None, usage=None):
+        usage.update(prompt_tokens=10, completion_tokens=2)
+        for chunk in ("# Post", " body"):
+            yield chunk
+
+    monkeypatch.setattr(blog_service, "build_document_context", build_document_context)
+    monkeypatch.setattr(blog_service, "generate_content", generate_content)
+    service = BatchService()
+    service.redis = fake
+    service.contexts = contexts
+    return service
+
+
+def _request(*titles):
+    return BlogBatchRequest(document_ids=["d1"], items=[BlogBatchItem(title=title) for title in titles])
+
+
+async def _run(service, request):
+    batch = await service.create_batch("u1", "s1", request)
+    await asyncio.gather(*service.tasks)
+    events = [event async for event in service.stream_events(batch.id, poll_interval=0)]
+    return batch, events
+
+
+def test_batch_shares_one_context_pass(batches):
+    batch, events = asyncio.run(_run(batches, _request("One", "Two")))
+
+    assert batches.contexts == [["d1"]]
+    assert [event["type"] for event in events] == ["item", "item", "done"]
+    assert {event["content"] for event in events[:2]} == {"# Post body"}
+    done = events[-1]["batch"]
+    assert (done["status"], done["completed"], done["prompt_tokens"]) == ("completed", 2, 20)
+
+
+def test_context_failure_fails_items_and_drafts(batches, monkeypatch):
+    async def broken(user_id, document_ids, query):
+        raise RuntimeError("search is down")
+
+    monkeypatch.setattr(blog_service, "build_document_context", broken)
+
+    batch, events = asyncio.run(_run(batches, _request("One", "Two")))
+
+    assert [event["status"] for event in events if event["type"] == "item"] == ["failed", "failed"]
+    assert events[-1]["batch"]["status"] == "failed"
+    result = asyncio.run(batches.get_batch(batch.id))
+    assert result.failed == 2
+    assert {item.error for item in result.items} == {"search is down"}
+    for item in result.items:
+        assert batches.redis.hget(f"draft:{item.draft_id}", "status") == "failed"
+
+
+def test_stream_ends_for_finished_or_abandoned_batches(batches, monkeypatch):
+    async def collect(batch_id):
+        return [event async for event in batches.stream_events(batch_id, poll_interval=0)]
+
+    batches.redis.hset("batch:done", "status", "completed")  # done event already trimmed
+    assert asyncio.run(collect("done")) == []
+
+    monkeypatch.setattr(settings, "GC_STALE_MINUTES", 0)
+    batches.redis.hset("batch:dead", "status", "running")  # owning process died
+    assert asyncio.run(collect("dead")) == [{"type": "error", "message": "Batch stopped making progress"}]
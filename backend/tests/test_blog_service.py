@@ -0,0 +1,62 @@
+"""Background draft generation tests (needs fakeredis)"""
+
+import asyncio
+
+import pytest
+
+from backend.core.shutdown import drain_tasks
+from backend.models.blog import BlogGenerateRequest, BlogStatus
+from backend.services.blog_service import blog_service
+from backend.services.draft_history_service import draft_history_service
+from backend.services.tiering_service import tiering_service
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    fakeredis = pytest.importorskip("fakeredis")
+    fake = fakeredis.FakeRedis(decode_responses=True)
+    for service in (blog_service, draft_history_service, tiering_service):
+        monkeypatch.setattr(service, "redis", fake)
+    return fake
+
+
+def _generator(chunks, hang=False):
+    async def generate_content(draft_id, instructions=None):
+        blog_service._set_status(draft_id, BlogStatus.GENERATING)
+        for chunk in chunks:
+            yield chunk
+        if hang:
+            await asyncio.Event().wait()
+        blog_service._set_status(draft_id, BlogStatus.COMPLETED)
+
+    return generate_content
+
+
+def test_background_generation_is_tracked_until_done(redis, monkeypatch):
+    monkeypatch.setattr(blog_service, "generate_content", _generator(["# Post"]))
+
+    async def run():
+        draft = await blog_service.create_draft("u1", "s1", BlogGenerateRequest(document_ids=[], title="T"))
+        task = blog_service.start_generation(draft.id)
+        assert task in blog_service.tasks
+        await task
+        return draft.id
+
+    draft_id = asyncio.run(run())
+    assert not blog_service.tasks
+    assert redis.hget(f"draft:{draft_id}", "status") == "completed"
+
+
+def test_generation_cancelled_at_shutdown_fails_the_draft(redis, monkeypatch):
+    monkeypatch.setattr(blog_service, "generate_content", _generator(["# Half"], hang=True))
+
+    async def run():
+        draft = await blog_service.create_draft("u1", "s1", BlogGenerateRequest(document_ids=[], title="T"))
+        blog_service.start_generation(draft.id)
+        await asyncio.sleep(0.01)
+        assert await drain_tasks(blog_service.tasks, timeout=0.01) == 1
+        return draft.id
+
+    draft_id = asyncio.run(run())
+    assert redis.hget(f"draft:{draft_id}", "status") == "failed"
+    assert not blog_service.tasks
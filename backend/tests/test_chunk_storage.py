@@ -0,0 +1,69 @@
+"""Packed chunk storage tests (store/load paths need fakeredis)"""
+
+import asyncio
+
+import pytest
+
+from backend.core import chunk_codec
+from backend.models.documents import DocumentType
+from backend.services.document_service import document_service
+from backend.services.tiering_service import tiering_service
+
+
+CHUNKS = ["Intro paragraph. " * 40, "Ünïcödé – second chunk", "", "tail " * 300]
+
+
+def test_codec_round_trip():
+    blob = chunk_codec.encode_chunks(CHUNKS)
+
+    assert chunk_codec.chunk_count(blob) == 4
+    assert chunk_codec.decode_chunks(blob) == CHUNKS
+    assert list(chunk_codec.iter_chunks(blob)) == CHUNKS
+    assert len(blob) < len("".join(CHUNKS).encode()) // 4
+    assert chunk_codec.decode_chunks(chunk_codec.encode_chunks([])) == []
+    with pytest.raises(ValueError):
+        chunk_codec.decode_chunks(b"chunk text")
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    fakeredis = pytest.importorskip("fakeredis")
+    server = fakeredis.FakeServer()
+    fake = fakeredis.FakeRedis(server=server, decode_responses=True)
+    raw = fakeredis.FakeRedis(server=server)
+    for service in (document_service, tiering_service):
+        monkeypatch.setattr(service, "redis", fake)
+        monkeypatch.setattr(service, "raw_redis", raw)
+    monkeypatch.setattr(type(document_service), "elasticsearch", None)
+    return fake
+
+
+def test_chunks_are_stored_packed_and_metadata_stays_small(redis, tmp_path):
+    from langchain_core.documents import Document as LCDocument
+
+    doc = document_service._create_document_record(
+        "d1", "u1", "notes.md", DocumentType.MARKDOWN, tmp_path / "notes.md", 10, "hash"
+    )
+    redis.hset("document:d1", "extracted_text", "left by an older version")
+    chunks = [LCDocument(page_content=text, metadata={}) for text in CHUNKS]
+
+    assert asyncio.run(document_service._store_chunks(doc, chunks)) == 3
+
+    assert redis.type("document:d1:content") == "string"
+    assert not redis.hexists("document:d1", "extracted_text")
+    stored = [text.strip() for text in CHUNKS if text]
+    assert asyncio.run(document_service.get_document_content("d1")) == "\n\n".join(stored)
+    assert asyncio.run(document_service.get_document_excerpt("d1", 100)) == stored[0][:100]
+    fetched = asyncio.run(document_service.get_document("d1"))
+    assert (fetched.filename, fetched.chunk_count) == ("notes.md", 3)
+    results = asyncio.run(document_service._fallback_search("second", ["d1"], 5))
+    assert [(r.content, r.metadata["chunk_key"]) for r in results] == [(stored[1], "chunk_1")]
+
+
+def test_legacy_chunk_hashes_are_still_read(redis):
+    redis.hset("document:old", mapping={"filename": "old.md"})
+    redis.hset("document:old:content", mapping={"chunk_10": "ten", "chunk_2": "two"})
+
+    assert asyncio.run(document_service.get_document_content("old")) == "two\n\nten"
+    assert asyncio.run(document_service.get_document_excerpt("old", 3)) == "two"
+    assert asyncio.run(document_service.get_document("old")) is None  # no user_id
@@ -0,0 +1,78 @@
+"""Stream coalescing tests"""
+
+import asyncio
+
+import pytest
+
+import orjson
+
+from backend.core.coalesce import coalesce_events, coalesce_text
+from backend.services.stream_service import encode_event
+
+
+async def _source(items, gap=0.001, fail=False):
+    for item in items:
+        await asyncio.sleep(gap)
+        yield item
+    if fail:
+        raise RuntimeError("model went away")
+
+
+async def _collect(stream):
+    return [item async for item in stream]
+
+
+def test_first_delta_goes_out_alone_and_the_rest_is_merged():
+    deltas = ["He", "llo", ",", " wor", "ld"]
+    out = asyncio.run(_collect(coalesce_text(_source(deltas), max_delay_ms=500, max_bytes=1024)))
+    assert out == ["He", "llo, world"]
+
+
+def test_byte_limit_and_delay_flush():
+    out = asyncio.run(_collect(coalesce_text(_source(["a"] * 9), max_delay_ms=500, max_bytes=4)))
+    assert out == ["a", "aaaa", "aaaa"]
+
+    slow = asyncio.run(_collect(coalesce_text(_source(["a"] * 4, gap=0.03), max_delay_ms=10)))
+    assert len(slow) == 4
+
+
+def test_events_merge_within_a_section_only():
+    events = [
+        {"type": "plan", "sections": ["a", "b"]},
+        {"type": "content", "anchor": "a", "content": "x"},
+        {"type": "content", "anchor": "a", "content": "y"},
+        {"type": "content", "anchor": "a", "content": "z"},
+        {"type": "section_done", "anchor": "a"},
+        {"type": "content", "anchor": "b", "content": "1"},
+        {"type": "content", "anchor": "b", "content": "2"},
+        {"type": "done"},
+    ]
+    out = asyncio.run(_collect(coalesce_events(_source(events), max_delay_ms=500)))
+    assert [(e["type"], e.get("content")) for e in out] == [
+        ("plan", None),
+        ("content", "x"),
+        ("content", "yz"),
+        ("section_done", None),
+        ("content", "12"),
+        ("done", None),
+    ]
+
+
+def test_bare_text_deltas_merge_as_strings():
+    events = ["a", "b", "c", {"type": "done"}]
+    out = asyncio.run(_collect(coalesce_events(_source(events), max_delay_ms=500)))
+    assert out == ["a", "bc", {"type": "done"}]
+
+    raw = encode_event(7, 'say "hi" \U0001f680')
+    assert orjson.loads(raw) == {"seq": 7, "type": "content", "content": 'say "hi" \U0001f680'}
+
+
+def test_buffered_text_is_delivered_before_a_failure():
+    async def run():
+        received = []
+        with pytest.raises(RuntimeError):
+            async for chunk in coalesce_text(_source(["a", "b", "c"], fail=True), max_delay_ms=500):
+                received.append(chunk)
+        return received
+
+    assert asyncio.run(run()) == ["a", "bc"]
@@ -0,0 +1,86 @@
+"""Draft version history tests (service tests need fakeredis)"""
+
+import asyncio
+
+import pytest
+
+from backend.config import settings
+from backend.models.blog import BlogDraftUpdate, BlogGenerateRequest
+from backend.services.blog_service import blog_service
+from backend.services.draft_history_service import (
+    DELTA,
+    SNAPSHOT,
+    apply_delta,
+    draft_history_service,
+    make_delta,
+)
+from backend.services.tiering_service import tiering_service
+
+
+@pytest.mark.parametrize(
+    "previous, current",
+    [
+        ("", "# Title\n\nBody"),
+        ("# Title\n\nBody\n", ""),
+        ("a\nb\nc\n", "a\nB\nc\nd"),
+        ("no newline", "no newline\nnow two"),
+        ("same\n", "same\n"),
+    ],
+)
+def test_delta_round_trip(previous, current):
+    assert apply_delta(previous, make_delta(previous, current)) == current
+
+
+def test_delta_copies_unchanged_lines():
+    previous = "".join(f"line {i}\n" for i in range(100))
+    current = previous.replace("line 50\n", "changed\n")
+    ops = make_delta(previous, current)
+    assert ops == [["c", 0, 50], ["i", "changed\n"], ["c", 51, 100]]
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    fakeredis = pytest.importorskip("fakeredis")
+    fake = fakeredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(blog_service, "redis", fake)
+    monkeypatch.setattr(draft_history_service, "redis", fake)
+    monkeypatch.setattr(tiering_service, "redis", fake)
+    monkeypatch.setattr(settings, "DRAFT_SNAPSHOT_INTERVAL", 3)
+    return fake
+
+
+def test_versions_rebuild_across_snapshot_intervals(redis):
+    body = "".join(f"Paragraph {n}: {'lorem ipsum ' * (n + 5)}\n" for n in range(40))
+    contents = [f"# Post v{v}\n\n{body}" + "".join(f"extra {n}\n" for n in range(v)) for v in range(1, 9)]
+    for version, content in enumerate(contents, start=1):
+        previous = contents[version - 2] if version > 1 else None
+        draft_history_service.record_version("d1", version, content, previous=previous)
+
+    versions = asyncio.run(draft_history_service.list_versions("d1"))
+    kinds = {info.version: info.kind for info in versions}
+    assert [v for v, kind in sorted(kinds.items()) if kind == SNAPSHOT] == [1, 4, 7]
+    assert kinds[8] == DELTA
+    for version, content in enumerate(contents, start=1):
+        assert asyncio.run(draft_history_service.get_version("d1", version)).content == content
+    assert asyncio.run(draft_history_service.get_version("d1", 9)) is None
+
+
+def test_concurrent_updates_delta_against_the_committed_base(redis, monkeypatch):
+    draft = asyncio.run(blog_service.create_draft("u1", "s1", BlogGenerateRequest(document_ids=[], title="T")))
+    real_get_draft = blog_service.get_draft
+    interleaved = []
+
+    async def get_draft_with_a_racing_writer(draft_id, promote=True):
+        result = await real_get_draft(draft_id, promote)
+        if not interleaved:
+            # Another request commits between our read and our write
+            interleaved.append(True)
+            await blog_service.update_draft(draft_id, BlogDraftUpdate(content="# From B\n"))
+        return result
+
+    monkeypatch.setattr(blog_service, "get_draft", get_draft_with_a_racing_writer)
+    updated = asyncio.run(blog_service.update_draft(draft.id, BlogDraftUpdate(content="# From A\n")))
+
+    assert (updated.version, updated.content) == (3, "# From A\n")
+    history = [asyncio.run(draft_history_service.get_version(draft.id, v)).content for v in (1, 2, 3)]
+    assert history == ["", "# From B\n", "# From A\n"]
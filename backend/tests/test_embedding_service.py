@@ -0,0 +1,52 @@
+"""Embedding cache tests (offline, using the hashing embedder)"""
+
+import asyncio
+
+import pytest
+
+from backend.config import settings
+from backend.services.embedding_service import EmbeddingService, cosine
+
+
+@pytest.fixture
+def embeddings(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "EMBEDDING_PROVIDER", "hashing")
+    monkeypatch.setattr(settings, "EMBEDDING_DIM", 64)
+    monkeypatch.setattr(settings, "EMBEDDING_BATCH_SIZE", 4)
+    monkeypatch.setattr(settings, "EMBEDDING_CACHE_DIR", str(tmp_path / "embedding_cache"))
+    return EmbeddingService()
+
+
+def test_repeated_texts_cost_no_embedding_calls(embeddings):
+    texts = [f"chunk number {i} about retrieval" for i in range(10)]
+
+    first = asyncio.run(embeddings.embed(texts + texts[:3]))
+    assert embeddings.stats["embedder_calls"] == 3  # 10 distinct texts, batches of 4
+    assert embeddings.stats["embedded_texts"] == 10
+
+    # A new service (as in a new process) reads the float16 store from disk
+    fresh = EmbeddingService()
+    fresh._embedder = embeddings.embedder
+    fresh._embedder.embed = lambda texts: pytest.fail("cache miss")
+    second = asyncio.run(fresh.embed(texts))
+    assert fresh.stats["disk_hits"] == 10
+    assert all(cosine(a, b) > 0.999 for a, b in zip(first[: len(texts)], second, strict=True))
+
+
+def test_batches_larger_than_the_memory_cache(embeddings, monkeypatch):
+    monkeypatch.setattr(settings, "EMBEDDING_MEMORY_ITEMS", 0)
+
+    vectors = asyncio.run(embeddings.embed([f"text {i}" for i in range(6)]))
+    assert len(vectors) == 6
+    assert len(embeddings._memory) == 0
+    assert len(embeddings.store._index) == 6
+
+
+def test_store_evicts_oldest_segments(embeddings, monkeypatch):
+    monkeypatch.setattr(settings, "EMBEDDING_SEGMENT_ROWS", 8)
+    monkeypatch.setattr(settings, "EMBEDDING_CACHE_MAX_MB", 0)
+
+    asyncio.run(embeddings.embed([f"text {i}" for i in range(20)]))
+    store = embeddings.store
+    assert store.segments() == [3]
+    assert len(store._index) == 4
@@ -0,0 +1,129 @@
+"""Redis garbage collection tests (needs fakeredis)"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.config import settings
+from backend.services.document_service import document_service
+from backend.services.gc_service import GarbageCollectionService
+from backend.services.tiering_service import tiering_service
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+def _ago(**delta) -> str:
+    return (datetime.utcnow() - timedelta(**delta)).isoformat()
+
+
+def _draft(redis, draft_id, session_id, content="", status="completed", updated=None, status_at=None, document_ids=""):
+    redis.hset(
+        f"draft:{draft_id}",
+        mapping={
+            "user_id": "u1",
+            "session_id": session_id,
+            "content": content,
+            "status": status,
+            "updated_at": updated or _ago(minutes=1),
+            "status_at": status_at or updated or _ago(minutes=1),
+            "document_ids": document_ids,
+        },
+    )
+    redis.hset(f"draft:{draft_id}:versions", "1", "{}")
+    redis.sadd("user:u1:drafts", draft_id)
+    redis.sadd(f"session:{session_id}:drafts", draft_id)
+
+
+def _document(redis, tmp_path, doc_id, status="completed", **fields):
+    path = tmp_path / doc_id / "file.md"
+    path.parent.mkdir(parents=True)
+    path.write_text("text")
+    redis.hset(
+        f"document:{doc_id}",
+        mapping={
+            "id": doc_id,
+            "user_id": "u1",
+            "filename": "file.md",
+            "file_type": "markdown",
+            "file_path": str(path),
+            "size": "4",
+            "status": status,
+            "created_at": _ago(days=20),
+            **fields,
+        },
+    )
+    redis.hset(f"document:{doc_id}:content", mapping={"chunk_0": "text"})
+    redis.sadd("user:u1:documents", doc_id)
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    fake = fakeredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(document_service, "redis", fake)
+    monkeypatch.setattr(tiering_service, "redis", fake)
+    monkeypatch.setattr(settings, "GC_SCAN_COUNT", 3)  # several SCAN steps
+    monkeypatch.setattr(settings, "GC_DELETE_BATCH", 2)
+    monkeypatch.setattr(settings, "GC_PAUSE_MS", 0)
+    return fake
+
+
+@pytest.fixture
+def gc(redis):
+    service = GarbageCollectionService()
+    service.redis = redis
+    return service
+
+
+def test_orphans_and_abandoned_artifacts_are_reclaimed(gc, redis, tmp_path):
+    redis.hset("session:s1", mapping={"user_id": "u1", "name": "live"})
+    redis.sadd("user:u1:sessions", "s1", "gone")
+    redis.rpush("session:gone:chat_history", "[]")  # left by delete_session races
+    _document(redis, tmp_path, "doc1")
+    _document(redis, tmp_path, "doc2", status="processing", processing_started_at=_ago(hours=3))
+    _document(redis, tmp_path, "doc3", status="failed", failed_at=_ago(days=10))
+    redis.hset("document:deleted:content", "chunk_0", "orphan")
+
+    _draft(redis, "live", "s1", content="# Post", document_ids="doc1,deleted")
+    _draft(redis, "orphan", "gone", content="# Session deleted")
+    _draft(redis, "stuck", "s1", content="# Old", status="generating", status_at=_ago(hours=3))
+    _draft(redis, "failed-empty", "s1", status="failed", status_at=_ago(days=10))
+    _draft(redis, "failed-written", "s1", content="# Keep", status="failed", status_at=_ago(days=10))
+    _draft(redis, "untouched", "s1", status="draft", updated=_ago(days=40))
+    redis.hset("draft:zombie", "status", "completed")  # status write after deletion
+
+    report = asyncio.run(gc.collect())
+
+    actions = report["actions"]
+    for reason in ("orphan_draft", "failed_draft", "empty_draft", "stale_generation",
+                   "stale_processing", "failed_document", "dangling_document_ref"):
+        assert actions[reason] == 1, reason
+    # Children of objects deleted earlier in the pass may also count as orphans
+    assert actions["orphan_key"] >= 3
+    assert actions["dangling_member"] >= 1  # session "gone"
+    assert not redis.exists("session:gone:chat_history", "document:deleted:content", "draft:zombie")
+    assert not redis.exists("draft:orphan", "draft:orphan:versions", "draft:failed-empty", "draft:untouched")
+    assert not redis.exists("document:doc3", "document:doc3:content")
+    assert redis.smembers("user:u1:drafts") == {"live", "stuck", "failed-written"}
+    assert redis.smembers("user:u1:documents") == {"doc1", "doc2"}
+    assert redis.smembers("user:u1:sessions") == {"s1"}
+    assert redis.hget("draft:live", "document_ids") == "doc1"
+    assert redis.hget("draft:stuck", "status") == "failed"
+    assert redis.hget("document:doc2", "status") == "failed"
+    assert report["deleted_keys"] >= 11
+    assert report["reclaimed_bytes"] is None  # fakeredis has no MEMORY USAGE
+
+    # Nothing left to do on the next pass
+    assert asyncio.run(gc.collect())["actions"] == {}
+
+
+def test_dry_run_changes_nothing(gc, redis):
+    redis.hset("document:deleted:content", "chunk_0", "orphan")
+    redis.sadd("user:u1:drafts", "missing")
+
+    report = asyncio.run(gc.collect(dry_run=True))
+
+    assert report["actions"] == {"orphan_key": 1, "dangling_member": 1}
+    assert report["deleted_keys"] == 1
+    assert redis.exists("document:deleted:content")
+    assert redis.smembers("user:u1:drafts") == {"missing"}
@@ -0,0 +1,59 @@
+"""Import-time budget for the API entry point (python -X importtime)"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+
+# Loaded on first use (or by the startup warm-up), never by importing the app
+LAZY_MODULES = (
+    "langchain_core",
+    "langchain_text_splitters",
+    "langchain_openai",
+    "langchain_ollama",
+    "elasticsearch",
+    "jose",
+    "openai",
+    "fitz",
+)
+
+# Wall-clock budgets depend on the machine, so the timing check is opt-in
+BUDGET_MS = os.environ.get("IMPORT_TIME_BUDGET_MS")
+
+
+def _import_times(module: str) -> dict:
+    """Cumulative import time in microseconds per module"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_backend_main_imports_heavy_modules_lazily():
+    times = _import_times("backend.main")
+
+    eager = sorted(name for name in times if name.split(".")[0] in LAZY_MODULES)
+    assert not eager, f"heavy modules imported at startup: {eager}"
+
+
+@pytest.mark.skipif(not BUDGET_MS, reason="set IMPORT_TIME_BUDGET_MS to check import time")
+def test_backend_main_imports_within_budget():
+    times = _import_times("backend.main")
+
+    elapsed_ms = times["backend.main"] / 1000
+    slowest = sorted(times.items(), key=lambda item: item[1], reverse=True)[:10]
+    assert elapsed_ms <= float(BUDGET_MS), f"import took {elapsed_ms:.0f} ms; slowest: {slowest}"
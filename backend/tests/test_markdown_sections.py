@@ -0,0 +1,95 @@
+"""Section parsing, selection and splicing tests"""
+
+from backend.core.markdown_sections import (
+    PREAMBLE_ANCHOR,
+    outline,
+    parse_sections,
+    section_text,
+    select_sections,
+    splice_sections,
+)
+
+POST = """Intro line before any heading.
+
+# Guide
+
+Welcome.
+
+## Setup
+
+Install "the command line tools" first.
+
+### Setup on Windows
+
+Use WSL.
+
+## Setup
+
+Second setup section.
+
+```python
+# not a heading
+```
+
+## Posting Schedule
+
+Weekly.
+"""
+
+
+def _by_anchor(markdown=POST):
+    return {section.anchor: section for section in parse_sections(markdown)}
+
+
+def test_parse_nesting_anchors_and_fences():
+    sections = parse_sections(POST)
+
+    assert [s.anchor for s in sections] == [
+        PREAMBLE_ANCHOR, "guide", "setup", "setup-on-windows", "setup-1", "posting-schedule",
+    ]
+    by_anchor = _by_anchor()
+    assert by_anchor["setup-on-windows"].parent == "setup"
+    assert by_anchor["setup"].parent == "guide"
+    # Own body stops at the nested heading; the subtree includes it
+    setup = by_anchor["setup"]
+    assert setup.end == by_anchor["setup-on-windows"].start
+    assert setup.subtree_end == by_anchor["setup-1"].start
+    assert "# not a heading" in section_text(POST, by_anchor["setup-1"])
+    assert outline(sections).splitlines()[0] == "# Guide"
+
+
+def test_explicit_anchors_win_and_nested_matches_collapse():
+    sections = parse_sections(POST)
+
+    picked = select_sections(POST, sections, "anything", anchors=["Setup", "setup-on-windows"])
+    assert [s.anchor for s in picked] == ["setup"]
+    assert select_sections(POST, sections, "ignored", anchors=["missing"]) == []
+
+
+def test_feedback_matches_whole_words_and_quotes():
+    sections = parse_sections(POST)
+
+    def anchors(feedback):
+        return [s.anchor for s in select_sections(POST, sections, feedback)]
+
+    assert anchors("Mention Windows 11 too") == ["setup-on-windows"]
+    assert anchors("The schedule should be monthly") == ["posting-schedule"]
+    # "post" names the whole post and "setups" is not the word "setup"
+    assert anchors("Make the post shorter") == []
+    assert anchors("Fewer setups please") == []
+    assert anchors("Reword 'the command line tools' bit") == ["setup"]
+    assert anchors("Reword 'he command line tool' bit") == []
+
+
+def test_splice_replaces_subtrees_and_keeps_spacing():
+    by_anchor = _by_anchor()
+    spliced = splice_sections(
+        POST,
+        [(by_anchor["posting-schedule"], "## Schedule\n\nDaily."), (by_anchor["setup"], "## Setup\n\nJust run it.\n\n")],
+    )
+
+    assert "Setup on Windows" not in spliced
+    assert "## Setup\n\nJust run it.\n\n## Setup\n\nSecond" in spliced
+    assert spliced.endswith("## Schedule\n\nDaily.\n")
+    assert spliced.startswith("Intro line before any heading.\n\n# Guide")
+    assert splice_sections(POST, []) == POST
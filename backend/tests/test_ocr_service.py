@@ -0,0 +1,98 @@
+"""OCR ingestion tests (offline, using tests/test_image.png)"""
+
+import asyncio
+import io
+from pathlib import Path
+
+import pytest
+
+from backend.config import settings
+from backend.services.ocr_service import OCRService
+
+
+TEST_IMAGE = Path(__file__).resolve().parents[2] / "tests" / "test_image.png"
+
+
+def describe_engine(image) -> str:
+    """Stub engine reporting what the worker handed it"""
+    return f"mode={image.mode} size={image.size[0]}x{image.size[1]}"
+
+
+@pytest.fixture
+def ocr(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "OCR_ENGINE", f"{__name__}:describe_engine")
+    monkeypatch.setattr(settings, "OCR_MAX_IMAGE_SIDE", 400)
+    monkeypatch.setattr(settings, "OCR_MAX_WORKERS", 1)
+    monkeypatch.setattr(settings, "OCR_CACHE_DIR", str(tmp_path / "ocr_cache"))
+    service = OCRService()
+    yield service
+    service.shutdown()
+
+
+def test_recognize_downscales_and_caches(ocr):
+    image_bytes = TEST_IMAGE.read_bytes()
+
+    text = asyncio.run(ocr.recognize(image_bytes))
+    width, height = (int(v) for v in text.split("size=")[1].split("x"))
+    assert "mode=L" in text
+    assert max(width, height) == 400
+
+    # Second pass must be served from the page cache without touching the pool
+    ocr.shutdown()
+    ocr._get_executor = lambda: pytest.fail("cache miss")
+    assert asyncio.run(ocr.recognize(image_bytes)) == text
+
+
+def test_recognize_stream_keeps_page_order(ocr):
+    from PIL import Image
+
+    pages = []
+    for side in (300, 200, 100):
+        buffer = io.BytesIO()
+        Image.new("RGB", (side, side), "white").save(buffer, format="PNG")
+        pages.append(buffer.getvalue())
+
+    async def collect():
+        return [item async for item in ocr.recognize_stream(iter(pages))]
+
+    results = asyncio.run(collect())
+    assert [index for index, _ in results] == [0, 1, 2]
+    assert [text.split("size=")[1] for _, text in results] == ["300x300", "200x200", "100x100"]
+
+
+def test_tesseract_engine_reads_test_image(tmp_path, monkeypatch):
+    pytest.importorskip("pytesseract")
+    monkeypatch.setattr(settings, "OCR_ENGINE", "tesseract")
+    monkeypatch.setattr(settings, "OCR_CACHE_DIR", str(tmp_path / "ocr_cache"))
+    service = OCRService()
+    try:
+        text = asyncio.run(service.recognize(TEST_IMAGE.read_bytes()))
+    except Exception as exc:  # pytesseract present but no tesseract binary
+        pytest.skip(f"tesseract unavailable: {exc}")
+    finally:
+        service.shutdown()
+    assert "Encoder" in text
+
+
+def test_languages_are_part_of_the_cache_key(ocr, monkeypatch):
+    image_bytes = TEST_IMAGE.read_bytes()
+    asyncio.run(ocr.recognize(image_bytes))
+    english = ocr.cache_tag
+
+    monkeypatch.setattr(settings, "OCR_LANGUAGES", "deu")
+    assert ocr.cache_tag != english
+    digest = next(ocr.cache_dir.glob("*/*/*.txt")).stem
+    assert not ocr._cache_path(digest).exists()
+
+
+def test_recognize_stream_accepts_async_pages(ocr):
+    image_bytes = TEST_IMAGE.read_bytes()
+
+    async def pages():
+        for _ in range(2):
+            yield await asyncio.to_thread(lambda: image_bytes)
+
+    async def collect():
+        return [index async for index, _ in ocr.recognize_stream(pages())]
+
+    assert asyncio.run(collect()) == [0, 1]
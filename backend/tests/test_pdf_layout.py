@@ -0,0 +1,76 @@
+"""PDF layout classification and caching tests (no PyMuPDF needed)"""
+
+import asyncio
+
+from backend.config import settings
+from backend.core import pdf_layout
+from backend.core.pdf_layout import RawBlock
+from backend.services.document_service import document_service
+
+
+BODY = "This paragraph is body text long enough to set the body font size."
+
+
+def _kinds(blocks):
+    return [(block.kind, block.level, block.text) for block in blocks]
+
+
+def test_classify_headings_lists_and_tables():
+    raw = [
+        RawBlock(["Report Title"], 0, size=20.0),
+        RawBlock([BODY, BODY], 0, size=10.0),
+        RawBlock(["Methods"], 0, size=14.0),
+        RawBlock(["Bold lead-in"], 0, size=10.0, bold=True),
+        RawBlock(["A sentence in bold."], 0, size=10.0, bold=True),
+        RawBlock(["• first item that wraps onto a", "second line", "• second item"], 0, size=10.0),
+        RawBlock(["- third item"], 0, size=10.0),
+        RawBlock(["Name | Score", "Ada | 9"], 1, table=True),
+        RawBlock(["hyphen-", "ated words"], 1, size=10.0),
+    ]
+
+    assert _kinds(pdf_layout.classify(raw)) == [
+        ("heading", 1, "Report Title"),
+        ("text", 0, f"{BODY} {BODY}"),
+        ("heading", 2, "Methods"),
+        ("heading", 3, "Bold lead-in"),
+        ("text", 0, "A sentence in bold."),
+        ("list", 0, "• first item that wraps onto a second line\n• second item\n- third item"),
+        ("table", 0, "Name | Score\nAda | 9"),
+        ("text", 0, "hyphenated words"),
+    ]
+
+
+def test_ocr_text_is_split_into_paragraphs_and_never_headings():
+    text = "SCANNED TITLE\n\n  First line\nsecond line  \n\n\n\n- item one\n- item two\n"
+    raw = pdf_layout.ocr_blocks(text, 3)
+
+    assert [(block.lines, block.page, block.size) for block in raw] == [
+        (["SCANNED TITLE"], 3, None),
+        (["First line", "second line"], 3, None),
+        (["- item one", "- item two"], 3, None),
+    ]
+    assert _kinds(pdf_layout.classify(raw)) == [
+        ("text", 0, "SCANNED TITLE"),
+        ("text", 0, "First line second line"),
+        ("list", 0, "- item one\n- item two"),
+    ]
+    assert pdf_layout.ocr_blocks(" \n\n ", 0) == []
+
+
+def test_layout_is_cached_only_when_ocr_succeeded(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "PDF_LAYOUT_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "OCR_ENABLED", False)
+    blocks = pdf_layout.classify(pdf_layout.ocr_blocks("Scanned text", 0))
+    parses = []
+
+    async def parse(path):
+        parses.append(path)
+        return blocks, len(parses) > 1  # OCR fails on the first attempt
+
+    monkeypatch.setattr(document_service, "_parse_pdf_layout", parse)
+    pdf = tmp_path / "scan.pdf"
+
+    for _ in range(3):
+        assert asyncio.run(document_service._extract_pdf(pdf, "ab" * 32)) == blocks
+    assert len(parses) == 2
+    assert len(list(tmp_path.glob("ab/*.layout"))) == 1
@@ -0,0 +1,157 @@
+"""Reindex tests (needs fakeredis; ElasticSearch is stubbed)"""
+
+import asyncio
+
+import pytest
+
+from backend.config import settings
+from backend.models.documents import DocumentType
+from backend.services.document_service import document_service
+from backend.services.search_index import search_index
+from backend.services.tiering_service import tiering_service
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+class FakeElasticsearch:
+    """Accepts bulk requests, rejecting the chunks of selected documents"""
+
+    def __init__(self):
+        self.indexed = []
+        self.reject = set()
+        self.chunks = {}  # index -> {chunk id: body}
+
+    async def bulk(self, index, operations, routing, refresh):
+        doc_id = operations[1]["document_id"]
+        if doc_id in self.reject:
+            error = {"type": "mapper_parsing_exception", "reason": "bad chunk"}
+            return {"errors": True, "items": [{"index": {"status": 400, "error": error}}]}
+        self.indexed.append((index, doc_id))
+        stored = self.chunks.setdefault(index, {})
+        for action, body in zip(operations[::2], operations[1::2], strict=True):
+            stored[action["index"]["_id"]] = body
+        return {"errors": False, "items": [{"index": {"status": 201}}]}
+
+    async def delete_by_query(self, index, query, routing, conflicts, refresh):
+        # Only the "document's chunks from chunk_index on" query is supported
+        term, chunk_range = query["bool"]["filter"]
+        doc_id = term["term"]["document_id"]
+        first = chunk_range["range"]["chunk_index"]["gte"]
+        stored = self.chunks.get(index, {})
+        for chunk_id, body in list(stored.items()):
+            if body["document_id"] == doc_id and body["chunk_index"] >= first:
+                del stored[chunk_id]
+
+
+@pytest.fixture
+def reindex(monkeypatch, tmp_path):
+    server = fakeredis.FakeServer()
+    fake = fakeredis.FakeRedis(server=server, decode_responses=True)
+    raw = fakeredis.FakeRedis(server=server)
+    for service in (document_service, tiering_service):
+        monkeypatch.setattr(service, "redis", fake)
+        monkeypatch.setattr(service, "raw_redis", raw)
+    monkeypatch.setattr(settings, "EXTRACTION_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "EMBEDDINGS_ENABLED", False)
+
+    es = FakeElasticsearch()
+    monkeypatch.setattr(type(document_service), "elasticsearch", property(lambda self: es))
+    calls = []
+
+    def record(name, result=None):
+        async def method(*args, **kwargs):
+            calls.append((name, args, kwargs))
+            return result
+
+        monkeypatch.setattr(search_index, name, method)
+
+    record("ensure", True)
+    record("create_version", "documents-new")
+    record("tenant_index")
+    for name in ("begin", "finish", "promote", "abort"):
+        record(name)
+    record("copy", 4)
+
+    def add(doc_id, status="completed", extraction=True, processed_at="2000-01-01T00:00:00"):
+        document_service._create_document_record(
+            doc_id, "u1", f"{doc_id}.md", DocumentType.MARKDOWN, tmp_path / f"{doc_id}.md", 10, "hash"
+        )
+        fake.hset(f"document:{doc_id}", mapping={"status": status, "processed_at": processed_at})
+        if extraction:
+            document_service._save_extraction(doc_id, {"kind": "text", "text": f"Text of {doc_id}."})
+
+    es.add = add
+    es.calls = calls
+    return es
+
+
+def _called(es, name):
+    return [(args, kwargs) for called, args, kwargs in es.calls if called == name]
+
+
+def test_failures_keep_the_old_index(reindex):
+    reindex.add("ok")
+    reindex.add("bad")
+    reindex.add("late", processed_at="2999-01-01T00:00:00")  # processed during the run
+    reindex.reject.add("bad")
+
+    report = asyncio.run(document_service.reindex_documents())
+
+    assert report["failed"] == ["bad"] and not report["promoted"]
+    assert not _called(reindex, "promote")
+    (args, kwargs), = _called(reindex, "abort")
+    assert args == ("documents-new",)
+    assert kwargs["restore"] == {"terms": {"document_id": ["late"]}}
+    assert document_service.redis.hget("document:bad", "status") == "completed"
+
+
+def test_unchanged_documents_are_carried_over(reindex):
+    reindex.add("ok")
+    reindex.add("legacy", extraction=False)
+    reindex.add("busy", status="processing")
+    reindex.add("broken", status="failed")
+
+    report = asyncio.run(document_service.reindex_documents())
+
+    assert (report["documents"], report["skipped"], report["in_flight"]) == (1, ["legacy"], ["busy"])
+    assert reindex.indexed == [(search_index.write_alias, "ok")]
+    (args, _), = _called(reindex, "copy")
+    assert args == (search_index.read_alias, "documents-new", {"terms": {"document_id": ["legacy", "busy"]}})
+    assert report["copied"] == 4 and report["promoted"]
+    assert not _called(reindex, "abort")
+
+
+def test_force_promotes_despite_failures(reindex):
+    reindex.add("bad")
+    reindex.reject.add("bad")
+
+    report = asyncio.run(document_service.reindex_documents(force=True))
+
+    assert report["failed"] == ["bad"] and report["promoted"]
+    assert _called(reindex, "promote") and not _called(reindex, "abort")
+
+
+def test_tenant_index_drops_chunks_beyond_the_new_count(reindex, monkeypatch):
+    async def tenant_index(user_id, for_write=False):
+        return "documents-tenant-u1"
+
+    monkeypatch.setattr(search_index, "tenant_index", tenant_index)
+    monkeypatch.setattr(settings, "CHUNK_OVERLAP", 0)
+    reindex.add("long")
+    sentences = " ".join(f"Sentence number {n} of the long document." for n in range(40))
+    document_service._save_extraction("long", {"kind": "text", "text": sentences})
+
+    def tenant_chunks():
+        return sorted(reindex.chunks["documents-tenant-u1"], key=lambda chunk_id: int(chunk_id.rsplit("_", 1)[1]))
+
+    monkeypatch.setattr(settings, "CHUNK_SIZE", 200)
+    asyncio.run(document_service.reindex_documents())
+    before = tenant_chunks()
+
+    monkeypatch.setattr(settings, "CHUNK_SIZE", 800)
+    report = asyncio.run(document_service.reindex_documents())
+
+    after = tenant_chunks()
+    assert report["chunks"] == len(after) < len(before)
+    assert after == [f"long_{n}" for n in range(len(after))]
+    assert reindex.chunks["documents-tenant-u1"][after[0]]["content"].startswith("Sentence number 0 ")
@@ -0,0 +1,152 @@
+"""Search index migration tests (needs fakeredis; ElasticSearch is stubbed)"""
+
+import asyncio
+import json
+
+import pytest
+
+from backend.core.database import db
+from backend.services import search_index as search_index_module
+from backend.services.search_index import SearchIndexManager
+
+
+class FakeIndices:
+    def __init__(self):
+        self.names = set()
+
+    async def exists(self, index):
+        return index in self.names
+
+    async def create(self, index, **kwargs):
+        self.names.add(index)
+
+    async def delete(self, index, **kwargs):
+        self.names.discard(index)
+
+
+class FakeElasticsearch:
+    def __init__(self, fail_reindex=False):
+        self.fail_reindex = fail_reindex
+        self.indices = FakeIndices()
+
+    async def reindex(self, **kwargs):
+        if self.fail_reindex:
+            raise ConnectionError("cluster unavailable")
+        return {"task": "t1"}
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    fakeredis = pytest.importorskip("fakeredis")
+    monkeypatch.setattr(db, "_redis", fakeredis.FakeRedis(decode_responses=True))
+    manager = SearchIndexManager()
+    manager.calls = []
+    aliases = {"documents": ["documents-old"]}
+
+    async def alias_targets(alias):
+        return aliases.get(alias, [])
+
+    async def create_version(bulk=True):
+        return "documents-new"
+
+    def record(name):
+        async def method(*args, **kwargs):
+            manager.calls.append((name, args, kwargs))
+
+        return method
+
+    async def promote(name):
+        aliases["documents"] = [name]
+        manager.calls.append(("promote", (name,), {}))
+
+    async def schema_version(index):
+        return 1 if index == "documents-tenant-u1" else search_index_module.SCHEMA_VERSION
+
+    monkeypatch.setattr(manager, "_alias_targets", alias_targets)
+    monkeypatch.setattr(manager, "_schema_version", schema_version)
+    monkeypatch.setattr(manager, "create_version", create_version)
+    monkeypatch.setattr(manager, "promote", promote)
+    for name in ("begin", "finish", "abort"):
+        monkeypatch.setattr(manager, name, record(name))
+    return manager
+
+
+def _names(manager):
+    return [name for name, _, _ in manager.calls]
+
+
+def test_failed_migration_returns_writes_to_the_old_index(manager, monkeypatch):
+    monkeypatch.setattr(type(manager), "es", FakeElasticsearch(fail_reindex=True))
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(manager.migrate())
+
+    assert _names(manager) == ["begin", "abort"]
+    _, args, kwargs = manager.calls[-1]
+    assert args == ("documents-new",) and "created_at" in kwargs["restore"]["range"]
+    assert not db.redis.exists(search_index_module._MIGRATION_LOCK)
+
+
+def test_one_migration_at_a_time(manager, monkeypatch):
+    monkeypatch.setattr(type(manager), "es", FakeElasticsearch())
+
+    async def wait_for_task(task_id):
+        return {"created": 3}
+
+    monkeypatch.setattr(manager, "_wait_for_task", wait_for_task)
+    db.redis.set(search_index_module._MIGRATION_LOCK, "1")
+    with pytest.raises(RuntimeError, match="in progress"):
+        asyncio.run(manager.migrate())
+    asyncio.run(manager._migrate_in_background())
+    assert manager.calls == []
+
+    db.redis.delete(search_index_module._MIGRATION_LOCK)
+    report = asyncio.run(manager.migrate())
+    assert (report["index"], report["copied"]) == ("documents-new", 3)
+    assert _names(manager) == ["begin", "finish", "promote"]
+
+
+def _tenant_setup(manager, monkeypatch, fail_copy=False):
+    es = FakeElasticsearch()
+    es.indices.names.add("documents-tenant-u1")
+    monkeypatch.setattr(type(manager), "es", es)
+    db.redis.hset(manager._TENANTS_KEY, "u1", json.dumps({"index": "documents-tenant-u1", "ready": True}))
+
+    async def copy(source, dest, query, op_type="create"):
+        manager.calls.append(("copy", (source, dest), {"op_type": op_type}))
+        if fail_copy and op_type == "create":
+            # Reads stay on the old index while the copy runs
+            assert await manager.tenant_index("u1") == "documents-tenant-u1"
+            assert await manager.tenant_index("u1", for_write=True) == "documents-tenant-u1-v3"
+            raise ConnectionError("cluster unavailable")
+        return 5
+
+    async def wait_for_task(task_id):
+        return {"created": 3}
+
+    monkeypatch.setattr(manager, "copy", copy)
+    monkeypatch.setattr(manager, "_wait_for_task", wait_for_task)
+    return es
+
+
+def test_tenant_indices_are_migrated_before_the_shared_index(manager, monkeypatch):
+    es = _tenant_setup(manager, monkeypatch)
+
+    report = asyncio.run(manager.migrate())
+    assert report["tenants"] == {"u1": {"index": "documents-tenant-u1-v3", "copied": 5}}
+    assert _names(manager) == ["copy", "finish", "begin", "finish", "promote"]
+    assert asyncio.run(manager.tenant_index("u1")) == "documents-tenant-u1-v3"
+    assert es.indices.names == {"documents-tenant-u1-v3"}
+
+
+def test_failed_tenant_migration_keeps_the_old_index(manager, monkeypatch):
+    es = _tenant_setup(manager, monkeypatch, fail_copy=True)
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(manager.migrate())
+    # Writes made meanwhile are copied back, and the shared index is left alone
+    assert manager.calls[-1] == ("copy", ("documents-tenant-u1-v3", "documents-tenant-u1"), {"op_type": "index"})
+    assert "begin" not in _names(manager)
+    assert asyncio.run(manager.tenant_index("u1")) == "documents-tenant-u1"
+    assert es.indices.names == {"documents-tenant-u1"}
+    assert not db.redis.exists(search_index_module._MIGRATION_LOCK)
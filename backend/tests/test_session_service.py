@@ -0,0 +1,33 @@
+"""Chat history paging tests (needs fakeredis)"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from backend.models.sessions import ChatMessage
+from backend.services.session_service import session_service
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    fakeredis = pytest.importorskip("fakeredis")
+    fake = fakeredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(session_service, "redis", fake)
+    return fake
+
+
+def test_before_accepts_naive_and_aware_timestamps(redis):
+    start = datetime(2026, 1, 1, 12, 0)
+    for minute in range(5):
+        message = ChatMessage(role="user", content=f"m{minute}", timestamp=start + timedelta(minutes=minute))
+        asyncio.run(session_service.add_chat_message("s1", message))
+
+    def page(before):
+        history = asyncio.run(session_service.get_chat_history("s1", limit=2, before=before))
+        return [message.content for message in history]
+
+    assert page(start + timedelta(minutes=3)) == ["m1", "m2"]
+    # "...T12:03:00Z" and the same instant in another zone
+    assert page(datetime(2026, 1, 1, 12, 3, tzinfo=timezone.utc)) == ["m1", "m2"]
+    assert page(datetime(2026, 1, 1, 14, 3, tzinfo=timezone(timedelta(hours=2)))) == ["m1", "m2"]
@@ -0,0 +1,92 @@
+"""Resumable stream tests (needs fakeredis)"""
+
+import asyncio
+
+import orjson
+import pytest
+
+from backend.services.stream_service import StreamService, parse_event_id, text_events
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+async def _deltas(count, fail=False):
+    for i in range(count):
+        await asyncio.sleep(0.002)
+        yield f"t{i} "
+    if fail:
+        raise RuntimeError("model went away")
+
+
+def _events(frames):
+    out = []
+    for frame in frames:
+        if not frame.startswith(b"id: "):
+            continue
+        head, data = frame.split(b"\ndata: ", 1)
+        out.append((head[4:].decode(), orjson.loads(data)))
+    return out
+
+
+@pytest.fixture
+def streams():
+    service = StreamService()
+    service.redis = fakeredis.FakeRedis(decode_responses=True)
+    return service
+
+
+def test_parse_event_id():
+    assert parse_event_id("abc:12") == ("abc", 12)
+    assert parse_event_id("abc") is None
+    assert parse_event_id("abc:x") is None
+    assert parse_event_id(None) is None
+
+
+def test_reconnect_replays_missed_events_without_regenerating(streams):
+    async def run():
+        stream_id = streams.start("u1", "refine", text_events(_deltas(20)))
+
+        # The client drops after three events...
+        first = []
+        async for frame in streams.frames(stream_id):
+            first.append(frame)
+            if len(_events(first)) == 3:
+                break
+        last_id = _events(first)[-1][0]
+
+        # ...and resumes from its Last-Event-ID while generation carries on
+        resumed = [frame async for frame in streams.frames(*parse_event_id(last_id))]
+        return stream_id, _events(first) + _events(resumed)
+
+    stream_id, events = asyncio.run(run())
+    assert [event["seq"] for _, event in events] == list(range(len(events)))
+    assert [event_id for event_id, _ in events] == [f"{stream_id}:{i}" for i in range(len(events))]
+    assert events[0][1] == {"seq": 0, "type": "stream", "stream_id": stream_id, "kind": "refine"}
+    assert events[-1][1]["type"] == "done"
+    text = "".join(event.get("content", "") for _, event in events)
+    assert text == "".join(f"t{i} " for i in range(20))
+
+
+def test_failure_ends_the_stream_with_an_error_event(streams):
+    async def run():
+        stream_id = streams.start("u1", "generate", text_events(_deltas(3, fail=True)))
+        return [frame async for frame in streams.frames(stream_id)]
+
+    events = [event for _, event in _events(asyncio.run(run()))]
+    assert events[-1]["type"] == "error"
+    assert "".join(event.get("content", "") for event in events) == "t0 t1 t2 "
+
+
+def test_resume_requires_the_same_draft_and_kind(streams):
+    async def run():
+        stream_id = streams.start("u1", "refine", text_events(_deltas(1)), draft_id="d1")
+        await asyncio.gather(*streams.tasks)
+        return stream_id
+
+    stream_id = asyncio.run(run())
+
+    assert streams.resumable(stream_id, "u1", "refine", "d1")
+    assert not streams.resumable(stream_id, "u1", "refine", "d2")
+    assert not streams.resumable(stream_id, "u1", "generate", "d1")
+    assert not streams.resumable(stream_id, "u2", "refine", "d1")
+    assert not streams.resumable("expired", "u1", "refine", "d1")
@@ -0,0 +1,89 @@
+"""Audio transcription tests (offline, stub engine, stdlib WAV decoding)"""
+
+import asyncio
+import wave
+
+import pytest
+
+from backend.config import settings
+from backend.services import transcription_service as transcription_module
+from backend.services.document_service import document_service
+from backend.services.transcription_service import TranscriptionService
+
+
+def describe_engine(pcm: bytes, sample_rate: int):
+    """Stub engine: one segment spanning the window, plus a silent one"""
+    duration = len(pcm) / 2 / sample_rate
+    return [(0.25, duration, f"{duration:.2f}s@{sample_rate}"), (duration, duration, "")]
+
+
+def _wav(path, seconds, sample_rate=8000):
+    with wave.open(str(path), "wb") as out:
+        out.setnchannels(1)
+        out.setsampwidth(2)
+        out.setframerate(sample_rate)
+        out.writeframes(b"\x00\x00" * int(seconds * sample_rate))
+    return path
+
+
+@pytest.fixture
+def transcriber(monkeypatch):
+    monkeypatch.setattr(settings, "TRANSCRIPTION_ENGINE", f"{__name__}:describe_engine")
+    monkeypatch.setattr(settings, "TRANSCRIPTION_MAX_WORKERS", 1)
+    monkeypatch.setattr(settings, "TRANSCRIPTION_WINDOW_SECONDS", 1)
+    monkeypatch.setattr(transcription_module.shutil, "which", lambda name: None)
+    service = TranscriptionService()
+    yield service
+    service.shutdown()
+
+
+def _collect(service, path):
+    async def collect():
+        return [segment async for segment in service.transcribe(path)]
+
+    return asyncio.run(collect())
+
+
+def test_windows_are_offset_to_absolute_time(transcriber, tmp_path):
+    segments = _collect(transcriber, _wav(tmp_path / "talk.wav", 2.5))
+
+    # Three windows (1s, 1s, 0.5s); empty segments are dropped
+    assert segments == [
+        (0.25, 1.0, "1.00s@8000"),
+        (1.25, 2.0, "1.00s@8000"),
+        (2.25, 2.5, "0.50s@8000"),
+    ]
+
+
+def test_unsupported_audio_without_ffmpeg(transcriber, tmp_path):
+    stereo = tmp_path / "stereo.wav"
+    with wave.open(str(stereo), "wb") as out:
+        out.setnchannels(2)
+        out.setsampwidth(2)
+        out.setframerate(8000)
+        out.writeframes(b"\x00" * 400)
+    compressed = tmp_path / "talk.mp3"
+    compressed.write_bytes(b"ID3")
+
+    for path in (stereo, compressed):
+        with pytest.raises(ValueError, match="ffmpeg is required"):
+            _collect(transcriber, path)
+
+
+def test_segments_pack_into_overlapping_chunks(monkeypatch):
+    monkeypatch.setattr(settings, "CHUNK_SIZE", 25)
+    monkeypatch.setattr(settings, "CHUNK_OVERLAP", 12)
+    segments = [[n * 2.0, n * 2.0 + 2, f"segment {n}"] for n in range(5)]
+
+    chunks = document_service._chunk_segments(segments, "talk.wav")
+
+    assert [chunk.page_content for chunk in chunks] == [
+        "segment 0 segment 1",
+        "segment 1 segment 2",
+        "segment 2 segment 3",
+        "segment 3 segment 4",
+    ]
+    assert [(c.metadata["start_time"], c.metadata["end_time"]) for c in chunks] == [
+        (0.0, 4.0), (2.0, 6.0), (4.0, 8.0), (6.0, 10.0),
+    ]
+    assert {chunk.metadata["source"] for chunk in chunks} == {"talk.wav"}
@@ -0,0 +1,78 @@
+"""Chunked upload tests (needs fakeredis)"""
+
+import asyncio
+import hashlib
+
+import pytest
+
+from backend.config import settings
+from backend.services.document_service import UploadConflictError, document_service
+
+
+@pytest.fixture
+def redis(monkeypatch, tmp_path):
+    fakeredis = pytest.importorskip("fakeredis")
+    fake = fakeredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(document_service, "redis", fake)
+    monkeypatch.setattr(document_service, "upload_dir", tmp_path)
+    monkeypatch.setattr(document_service, "_upload_hashers", {})
+    return fake
+
+
+async def _parts(*parts):
+    for part in parts:
+        yield part
+
+
+def test_offset_is_checked_after_taking_the_lock(redis, monkeypatch):
+    upload = asyncio.run(document_service.init_upload("u1", "notes.md", size=6))
+    real_load = document_service._load_upload
+    reads = []
+
+    def load_then_race(user_id, upload_id):
+        result = real_load(user_id, upload_id)
+        if not reads:
+            # Another append commits right after our first read
+            redis.hset(f"upload:{upload_id}", "received", "3")
+        reads.append(True)
+        return result
+
+    monkeypatch.setattr(document_service, "_load_upload", load_then_race)
+    with pytest.raises(UploadConflictError) as conflict:
+        asyncio.run(document_service.append_upload("u1", upload.id, 0, _parts(b"abc")))
+
+    assert conflict.value.expected == 3
+    assert not redis.exists(f"upload:{upload.id}:lock")
+
+
+def test_concurrent_completes_register_the_file_once(redis):
+    content = b"hello world"
+    upload = asyncio.run(
+        document_service.init_upload("u1", "notes.md", size=len(content), sha256=hashlib.sha256(content).hexdigest())
+    )
+    asyncio.run(document_service.append_upload("u1", upload.id, 0, _parts(content[:5], content[5:])))
+
+    async def complete_twice():
+        return await asyncio.gather(
+            document_service.complete_upload("u1", upload.id),
+            document_service.complete_upload("u1", upload.id),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(complete_twice())
+    documents = [result for result in results if result is not None and not isinstance(result, Exception)]
+    assert len(documents) == 1 and documents[0].size == len(content)
+    assert all(result is None or isinstance(result, UploadConflictError) for result in results if result is not documents[0])
+    assert not redis.exists(f"upload:{upload.id}:lock")
+
+
+def test_idle_hash_state_is_evicted(redis, monkeypatch):
+    stale = asyncio.run(document_service.init_upload("u1", "a.md"))
+    monkeypatch.setattr(settings, "UPLOAD_SESSION_TTL_SECONDS", -1)
+    fresh = asyncio.run(document_service.init_upload("u1", "b.md"))
+
+    assert list(document_service._upload_hashers) == [fresh.id]
+    # The evicted upload rebuilds its hash from the partial file
+    monkeypatch.setattr(settings, "UPLOAD_SESSION_TTL_SECONDS", 3600)
+    asyncio.run(document_service.append_upload("u1", stale.id, 0, _parts(b"abc")))
+    assert document_service._upload_hashers[stale.id][1] == 3
@@ -3,7 +3,7 @@
 import { useEffect, useState } from 'react';
 import { useParams, useRouter } from 'next/navigation';
 import dynamic from 'next/dynamic';
-import { blogAPI, getClientToken } from '@/lib/api';
+import { blogAPI, streamEvents } from '@/lib/api';
 import { BlogDraft } from '@/types/api';
 import { Save, Download, ArrowLeft, Sparkles } from 'lucide-react';
 
@@ -106,38 +106,27 @@ export default function EditorPage() {
     console.log('Starting refine...');
 
     try {
-      // Use fetch with streaming, adding Authorization header for auth
-      const token = getClientToken();
-      const response = await fetch(`${API_URL}/api/v1/blog/${draftId}/refine`, {
-        method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
-          ...(token ? { 'Authorization': `Bearer ${token}` } : {}),
-        },
-        credentials: 'include', // Send cookies for auth
-        body: JSON.stringify({ feedback }),
-      });
-
-      if (!response.ok) {
-        throw new Error(`HTTP ${response.status}: ${await response.text()}`);
-      }
-
-      // Read streaming response
-      const reader = response.body?.getReader();
-      if (!reader) {
-        throw new Error('No response body');
-      }
-
-      const decoder = new TextDecoder();
+      // Resumable SSE stream; reconnects with Last-Event-ID on a dropped connection
       let streamedContent = '';
-
-      while (true) {
-        const { done, value } = await reader.read();
-        if (done) break;
-        
-        const chunk = decoder.decode(value, { stream: true });
-        streamedContent += chunk;
-        setContent(streamedContent);
+      let streamError: string | undefined;
+      await streamEvents(
+        `${API_URL}/api/v1/blog/${draftId}/refine`,
+        {
+          method: 'POST',
+          headers: { 'Content-Type': 'application/json' },
+          body: JSON.stringify({ feedback }),
+        },
+        (event) => {
+          if (event.type === 'content') {
+            streamedContent += event.content as string;
+            setContent(streamedContent);
+          } else if (event.type === 'error') {
+            streamError = event.message as string;
+          }
+        }
+      );
+      if (streamError) {
+        throw new Error(streamError);
       }
 
       setRefining(false);
@@ -69,6 +69,86 @@ export async function authorizedFetch(
   });
 }
 
+export interface StreamEvent {
+  seq: number;
+  type: string;
+  [key: string]: unknown;
+}
+
+/**
+ * Read a resumable blog SSE stream (generate-content / refine)
+ *
+ * Frames carry `id: <stream_id>:<seq>`. If the connection drops before the
+ * final `done`/`error` event, the stream is resumed from
+ * /api/v1/blog/streams/<stream_id> with Last-Event-ID, so the generation is
+ * not started again.
+ */
+export async function streamEvents(
+  url: string,
+  options: RequestInit,
+  onEvent: (event: StreamEvent) => void,
+  maxRetries = 5
+): Promise<void> {
+  let lastEventId: string | undefined;
+  let streamId: string | undefined;
+  let retryMs = 2000;
+  let attempt = 0;
+
+  while (true) {
+    let finished = false;
+    try {
+      const response = streamId
+        ? await authorizedFetch(`${API_URL}/api/v1/blog/streams/${streamId}`, {
+            headers: { 'Last-Event-ID': lastEventId ?? '' },
+          })
+        : await authorizedFetch(url, options);
+      if (!response.ok) {
+        throw new Error(`HTTP ${response.status}: ${await response.text()}`);
+      }
+      const reader = response.body?.getReader();
+      if (!reader) {
+        throw new Error('No response body');
+      }
+
+      const decoder = new TextDecoder();
+      let buffer = '';
+      while (!finished) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        let end: number;
+        while ((end = buffer.indexOf('\n\n')) >= 0) {
+          const frame = buffer.slice(0, end);
+          buffer = buffer.slice(end + 2);
+          let data = '';
+          for (const line of frame.split('\n')) {
+            if (line.startsWith('id: ')) lastEventId = line.slice(4);
+            else if (line.startsWith('data: ')) data += line.slice(6);
+            else if (line.startsWith('retry: ')) retryMs = Number(line.slice(7)) || retryMs;
+          }
+          if (!data) continue;
+          const event = JSON.parse(data) as StreamEvent;
+          if (event.type === 'stream') streamId = event.stream_id as string;
+          onEvent(event);
+          if (event.type === 'done' || event.type === 'error') finished = true;
+        }
+      }
+    } catch (error) {
+      // Nothing to resume from, or the server rejected the request
+      if (!streamId || (error instanceof Error && error.message.startsWith('HTTP'))) {
+        throw error;
+      }
+    }
+
+    if (finished) return;
+    if (!streamId || ++attempt > maxRetries) {
+      throw new Error('Stream ended before completion');
+    }
+    await new Promise((resolve) => setTimeout(resolve, retryMs));
+  }
+}
+
 api.interceptors.request.use((config) => {
   const token = getClientToken();
   if (token) {
@@ -0,0 +1,164 @@
+# scripts/bench_chunk_storage.py
+"""
+Compare Redis memory for per-field chunk hashes and packed chunk blobs.
+
+    python scripts/bench_chunk_storage.py
+    python scripts/bench_chunk_storage.py --paths docs README.md --redis-url redis://localhost:6379/15
+
+Chunks every Markdown/text file under ``--paths`` with the configured
+CHUNK_SIZE/CHUNK_OVERLAP (the same splitter document processing uses), then
+stores each document both ways:
+
+    legacy  document:{id}:content hash of chunk_N fields, plus the first
+            50,000 characters again as extracted_text on document:{id}
+    packed  document:{id}:content string from backend.core.chunk_codec
+
+With a reachable Redis, sizes come from MEMORY USAGE on keys written under a
+``bench:`` prefix (removed afterwards); use a scratch database. Otherwise
+they are estimated from Redis' encodings and jemalloc size classes. Also
+reports encode/decode time per document.
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from backend.config import settings
+from backend.core import chunk_codec
+
+ROOT = Path(__file__).resolve().parents[1]
+_SUFFIXES = {".md", ".txt", ".rst"}
+_KEY_OVERHEAD = 72  # main dict entry, key sds and object header, same for both layouts
+
+
+def load_corpus(paths: List[str]) -> List[List[str]]:
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=settings.CHUNK_SIZE,
+        chunk_overlap=settings.CHUNK_OVERLAP,
+    )
+    files: List[Path] = []
+    for name in paths:
+        path = (ROOT / name) if not Path(name).is_absolute() else Path(name)
+        files.extend(sorted(p for p in path.rglob("*") if p.suffix in _SUFFIXES) if path.is_dir() else [path])
+    corpus = []
+    for path in files:
+        chunks = [c.strip() for c in splitter.split_text(path.read_text(encoding="utf-8", errors="ignore"))]
+        chunks = [c for c in chunks if c]
+        if chunks:
+            corpus.append(chunks)
+    return corpus
+
+
+def alloc(size: int) -> int:
+    """jemalloc size class for an allocation"""
+    if size <= 8:
+        return 8
+    if size <= 128:
+        return (size + 15) // 16 * 16
+    step = 1 << ((size - 1).bit_length() - 3)
+    return (size + step - 1) // step * step
+
+
+def sds(size: int) -> int:
+    header = 3 if size < 256 else 5 if size < 65536 else 9
+    return alloc(header + size + 1)
+
+
+def estimate_legacy(chunks: List[str]) -> int:
+    # Chunk values exceed hash-max-listpack-value, so the hash is a hashtable
+    buckets = 1 << max(2, (len(chunks) - 1).bit_length())
+    content = _KEY_OVERHEAD + alloc(8 * buckets) + sum(
+        32 + sds(len(f"chunk_{i}")) + sds(len(chunk.encode())) for i, chunk in enumerate(chunks)
+    )
+    extracted = "\n\n".join(chunks)[:50000].encode()
+    return content + 32 + sds(len("extracted_text")) + sds(len(extracted))
+
+
+def estimate_packed(blob: bytes) -> int:
+    return _KEY_OVERHEAD + sds(len(blob))
+
+
+def measure_redis(redis, corpus: List[List[str]], blobs: List[bytes]):
+    legacy = packed = 0
+    for i, (chunks, blob) in enumerate(zip(corpus, blobs, strict=True)):
+        meta, content = f"bench:document:{i}", f"bench:document:{i}:content"
+        redis.hset(meta, mapping={"filename": f"doc{i}.md"})
+        base = redis.memory_usage(meta, samples=0)
+        redis.hset(content, mapping={f"chunk_{n}": chunk for n, chunk in enumerate(chunks)})
+        redis.hset(meta, "extracted_text", "\n\n".join(chunks)[:50000])
+        legacy += redis.memory_usage(content, samples=0) + redis.memory_usage(meta, samples=0) - base
+        redis.delete(content)
+        redis.set(content, blob)
+        packed += redis.memory_usage(content, samples=0)
+        redis.delete(meta, content)
+    return legacy, packed
+
+
+def connect(url: Optional[str]):
+    from redis import Redis
+
+    try:
+        redis = Redis.from_url(url or settings.REDIS_URL)
+        redis.ping()
+        return redis
+    except Exception as e:
+        print(f"Redis unavailable ({e}); estimating sizes", file=sys.stderr)
+        return None
+
+
+def main(args):
+    corpus = load_corpus(args.paths)
+    if not corpus:
+        raise SystemExit("No documents found under --paths")
+
+    started = time.perf_counter()
+    blobs = [chunk_codec.encode_chunks(chunks) for chunks in corpus]
+    encode_ms = (time.perf_counter() - started) * 1000
+    started = time.perf_counter()
+    for blob in blobs:
+        chunk_codec.decode_chunks(blob)
+    decode_ms = (time.perf_counter() - started) * 1000
+    started = time.perf_counter()
+    for blob in blobs:
+        next(chunk_codec.iter_chunks(blob))
+    first_chunk_ms = (time.perf_counter() - started) * 1000
+
+    redis = None if args.estimate else connect(args.redis_url)
+    if redis is not None:
+        legacy, packed = measure_redis(redis, corpus, blobs)
+        method = "MEMORY USAGE"
+    else:
+        legacy = sum(estimate_legacy(chunks) for chunks in corpus)
+        packed = sum(estimate_packed(blob) for blob in blobs)
+        method = "estimate"
+
+    count = len(corpus)
+    text_bytes = sum(len(chunk.encode()) for chunks in corpus for chunk in chunks)
+    report = {
+        "documents": count,
+        "chunks": sum(len(chunks) for chunks in corpus),
+        "chunk_text_bytes": text_bytes,
+        "packed_blob_bytes": sum(len(blob) for blob in blobs),
+        "method": method,
+        "legacy_bytes": legacy,
+        "packed_bytes": packed,
+        "reduction": round(1 - packed / legacy, 3),
+        "encode_ms_per_doc": round(encode_ms / count, 3),
+        "decode_ms_per_doc": round(decode_ms / count, 3),
+        "first_chunk_ms_per_doc": round(first_chunk_ms / count, 3),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--paths", nargs="+", default=["docs", "README.md", "CHANGELOG.md"])
+    parser.add_argument("--redis-url", help="Default: REDIS_URL")
+    parser.add_argument("--estimate", action="store_true", help="Skip Redis and estimate sizes")
+    main(parser.parse_args())
@@ -0,0 +1,147 @@
+# scripts/bench_stream_coalescing.py
+"""
+Measure token micro-batching on the streaming endpoints.
+
+    python scripts/bench_stream_coalescing.py --tokens 2000 --rate 200
+
+Serves a synthetic LLM delta sequence (1-6 characters per delta, arriving
+``--rate`` times a second) through the served event path (``text_events``,
+``coalesce_events``, ``encode_event`` and ``id_frame``, without the Redis
+round trip) from a real uvicorn server on loopback, with coalescing off and at a few settings, and reads it
+back with a raw socket client in the same process. Reported per 1,000
+tokens:
+
+    writes     HTTP body writes (one send syscall / TCP segment each)
+    payload    bytes read by the client (body + chunked transfer framing)
+    wire       payload + 52 bytes of IPv4/TCP headers per write
+    cpu ms     process CPU (server and client); the source-only row is the
+               same delta sequence consumed without HTTP
+    1st byte   delay from request to the first body byte
+"""
+import argparse
+import asyncio
+import random
+import socket
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import uvicorn
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+
+from backend.core.coalesce import coalesce_events
+from backend.core.sse import id_frame
+from backend.services.stream_service import encode_event, text_events
+
+TCP_IP_HEADERS = 52  # IPv4 + TCP with timestamps, per segment
+
+
+async def deltas(count: int, rate: float, seed: int = 3):
+    rng = random.Random(seed)
+    interval = 1 / rate
+    started = time.perf_counter()
+    for i in range(count):
+        # Sleep to the schedule rather than per delta, like a steady model
+        delay = started + i * interval - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        yield "".join(rng.choices("abcdefghij klmnop", k=rng.randint(1, 6)))
+
+
+async def aenumerate(source, start: int = 0):
+    async for item in source:
+        yield start, item
+        start += 1
+
+
+def build_app(args, stats: dict) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/stream")
+    async def stream(delay_ms: int, max_bytes: int, count: int):
+        async def body():
+            events = text_events(deltas(count, args.rate))
+            async for seq, event in aenumerate(coalesce_events(events, delay_ms, max_bytes), 1):
+                stats["writes"] += 1
+                yield id_frame(f"bench:{seq}", encode_event(seq, event))
+
+        return StreamingResponse(body(), media_type="text/event-stream")
+
+    return app
+
+
+async def fetch(port: int, delay_ms: int, max_bytes: int, count: int) -> tuple:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    started = time.perf_counter()
+    writer.write(
+        f"GET /stream?delay_ms={delay_ms}&max_bytes={max_bytes}&count={count} HTTP/1.1\r\n"
+        "Host: bench\r\nConnection: close\r\n\r\n".encode()
+    )
+    await writer.drain()
+    head = await reader.readuntil(b"\r\n\r\n")
+    payload = 0
+    first_byte = None
+    while True:
+        data = await reader.read(65536)
+        if not data:
+            break
+        if first_byte is None:
+            first_byte = time.perf_counter() - started
+        payload += len(data)
+    writer.close()
+    return payload, first_byte or 0.0, len(head)
+
+
+async def source_cpu(args) -> float:
+    cpu = time.process_time()
+    async for _ in deltas(args.tokens, args.rate):
+        pass
+    return time.process_time() - cpu
+
+
+async def main(args):
+    stats = {"writes": 0}
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    server = uvicorn.Server(
+        uvicorn.Config(build_app(args, stats), host="127.0.0.1", port=port, log_level="warning")
+    )
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+
+    await fetch(port, 0, args.max_bytes, 50)  # warm up routing and imports
+    baseline = await source_cpu(args)
+    per_k = 1000 / args.tokens
+    print(f"{args.tokens} deltas at {args.rate:.0f}/s; figures per 1,000 tokens")
+    print(f"{'coalesce':>14} {'writes':>8} {'payload B':>10} {'wire B':>9} {'cpu ms':>8} {'1st byte ms':>12}")
+    print(f"{'source only':>14} {'':>8} {'':>10} {'':>9} {baseline * 1000 * per_k:>8.2f}")
+    try:
+        for delay_ms in [0, *args.delay_ms]:
+            stats["writes"] = 0
+            cpu = time.process_time()
+            payload, first_byte, _ = await fetch(port, delay_ms, args.max_bytes, args.tokens)
+            cpu = time.process_time() - cpu
+            writes = stats["writes"]
+            label = "off" if not delay_ms else f"{delay_ms}ms/{args.max_bytes}B"
+            print(
+                f"{label:>14} {writes * per_k:>8.0f} {payload * per_k:>10.0f}"
+                f" {(payload + writes * TCP_IP_HEADERS) * per_k:>9.0f}"
+                f" {cpu * 1000 * per_k:>8.2f} {first_byte * 1000:>12.2f}"
+            )
+    finally:
+        server.should_exit = True
+        await serving
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tokens", type=int, default=2000)
+    parser.add_argument("--rate", type=float, default=200, help="Deltas per second")
+    parser.add_argument("--delay-ms", type=int, nargs="+", default=[10, 25, 50])
+    parser.add_argument("--max-bytes", type=int, default=1024)
+    asyncio.run(main(parser.parse_args()))
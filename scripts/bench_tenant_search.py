@@ -0,0 +1,271 @@
+# scripts/bench_tenant_search.py
+"""
+Benchmark tenant-scoped chunk search as the number of tenants grows.
+
+    python scripts/bench_tenant_search.py --tenants 10 100 1000
+
+Runs DocumentService's ElasticSearch query path against an in-process,
+ES-compatible stub that models shards: a routed search scans one shard, an
+unrouted one scans all of them, and each shard is a linear scan. Absolute
+numbers say nothing about a real cluster; the growth with tenant count is
+the point. Three layouts are compared:
+
+    unrouted   shared index, routing ignored (the previous behaviour)
+    routed     shared index, routed by user_id
+    dedicated  the queried tenant moved to its own index
+
+Uses fakeredis when installed, otherwise the configured Redis (only the
+search:tenant_indices entries it creates are touched, and removed again).
+"""
+import argparse
+import asyncio
+import fnmatch
+import itertools
+import random
+import statistics
+import sys
+import time
+import zlib
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from backend.config import settings
+from backend.core.database import db
+
+WORDS = (
+    "retrieval index shard tenant routing query latency filter cache vector "
+    "chunk overlap document summary draft outline section heading table list"
+).split()
+
+
+class _Namespace:
+    pass
+
+
+class StubElasticsearch:
+    """Just enough of AsyncElasticsearch for the document and index services"""
+
+    def __init__(self, honor_routing: bool = True):
+        self.honor_routing = honor_routing
+        self.shards = {}  # index -> list of {id: source}
+        self.aliases = {}  # alias -> {index: is_write_index}
+        self.docs_scanned = 0
+        self._tasks = {}
+        self._task_ids = itertools.count()
+
+        self.indices = _Namespace()
+        for name in (
+            "exists", "exists_alias", "get_alias", "get", "get_mapping", "create",
+            "delete", "put_settings", "refresh", "update_aliases",
+        ):
+            setattr(self.indices, name, getattr(self, f"_indices_{name}"))
+        self.cluster = _Namespace()
+        self.cluster.health = self._noop
+        self.tasks = _Namespace()
+        self.tasks.get = self._tasks_get
+
+    async def _noop(self, **kwargs):
+        return {}
+
+    def _resolve(self, index, write=False):
+        names = index if isinstance(index, list) else [index]
+        targets = []
+        for name in names:
+            if name in self.aliases:
+                members = self.aliases[name]
+                if write:
+                    members = {i: w for i, w in members.items() if w or len(members) == 1}
+                targets.extend(members)
+            elif name in self.shards:
+                targets.append(name)
+        return list(dict.fromkeys(targets))
+
+    def _shard(self, index, doc_id, routing):
+        shards = self.shards[index]
+        key = routing if routing is not None else doc_id
+        return shards[zlib.crc32(key.encode("utf-8")) % len(shards)]
+
+    async def _indices_exists(self, index):
+        return index in self.shards or index in self.aliases
+
+    async def _indices_exists_alias(self, name):
+        return bool(self.aliases.get(name))
+
+    async def _indices_get_alias(self, name):
+        return {index: {"aliases": {name: {}}} for index in self.aliases[name]}
+
+    async def _indices_get(self, index, ignore_unavailable=False):
+        return {name: {} for name in self.shards if fnmatch.fnmatch(name, index)}
+
+    async def _indices_get_mapping(self, index):
+        name = self._resolve(index)[0]
+        return {name: {"mappings": {"_meta": {"schema_version": 99}}}}
+
+    async def _indices_create(self, index, mappings=None, settings=None):
+        count = int((settings or {}).get("number_of_shards", 1))
+        self.shards[index] = [{} for _ in range(count)]
+
+    async def _indices_delete(self, index, ignore_unavailable=False):
+        self.shards.pop(index, None)
+        for members in self.aliases.values():
+            members.pop(index, None)
+
+    async def _indices_put_settings(self, index, settings):
+        return {}
+
+    async def _indices_refresh(self, index):
+        return {}
+
+    async def _indices_update_aliases(self, actions):
+        for action in actions:
+            if "add" in action:
+                spec = action["add"]
+                self.aliases.setdefault(spec["alias"], {})[spec["index"]] = spec.get(
+                    "is_write_index", False
+                )
+            elif "remove" in action:
+                self.aliases.get(action["remove"]["alias"], {}).pop(action["remove"]["index"], None)
+            elif "remove_index" in action:
+                await self._indices_delete(action["remove_index"]["index"])
+
+    async def bulk(self, index, operations, routing=None, refresh=None):
+        [target] = self._resolve(index, write=True)
+        for action, source in zip(operations[::2], operations[1::2], strict=True):
+            doc_id = action["index"]["_id"]
+            self._shard(target, doc_id, routing)[doc_id] = source
+        return {"errors": False}
+
+    def _matches(self, source, clause):
+        if "term" in clause:
+            (field, value), = clause["term"].items()
+            return source.get(field) == value
+        if "terms" in clause:
+            (field, values), = clause["terms"].items()
+            return source.get(field) in set(values)
+        return True
+
+    def _scan(self, index, routing, query):
+        for target in self._resolve(index):
+            shards = self.shards[target]
+            if routing is not None and self.honor_routing:
+                shards = [self._shard(target, "", routing)]
+            for shard in shards:
+                for doc_id, source in shard.items():
+                    self.docs_scanned += 1
+                    if all(self._matches(source, clause) for clause in query):
+                        yield doc_id, source, shard
+
+    async def search(self, index, size=10, query=None, routing=None, aggs=None, **kwargs):
+        query = query or {}
+        clauses = query.get("bool", {}).get("filter", [])
+        terms = []
+        for must in query.get("bool", {}).get("must", []):
+            terms.extend(must.get("multi_match", {}).get("query", "").lower().split())
+        hits = []
+        for doc_id, source, _ in self._scan(index, routing, clauses):
+            content = source.get("content", "").lower()
+            score = sum(content.count(term) for term in terms)
+            if score:
+                hits.append({"_id": doc_id, "_score": float(score), "_source": source})
+        hits.sort(key=lambda hit: hit["_score"], reverse=True)
+        return {"hits": {"hits": hits[:size]}}
+
+    async def delete_by_query(self, index, query, routing=None, conflicts=None):
+        for doc_id, _, shard in list(self._scan(index, routing, [query])):
+            shard.pop(doc_id, None)
+
+    async def reindex(self, source, dest, conflicts=None, wait_for_completion=True, **kwargs):
+        clauses = [source["query"]] if "query" in source else []
+        created = 0
+        for doc_id, body, _ in list(self._scan(source["index"], None, clauses)):
+            shard = self._shard(dest["index"], doc_id, body.get("user_id"))
+            if doc_id not in shard:
+                shard[doc_id] = body
+                created += 1
+        task_id = f"task-{next(self._task_ids)}"
+        self._tasks[task_id] = {"completed": True, "response": {"created": created, "failures": []}}
+        return {"task": task_id}
+
+    async def _tasks_get(self, task_id):
+        return self._tasks[task_id]
+
+    async def close(self):
+        pass
+
+
+async def run_layout(layout, tenants, docs_per_tenant, chunks_per_doc, queries, shards):
+    from backend.models.documents import Document, DocumentType, ProcessingStatus
+    from backend.services.document_service import document_service
+    from backend.services.search_index import search_index
+
+    stub = StubElasticsearch(honor_routing=layout != "unrouted")
+    db._elasticsearch = stub
+    search_index._ready = False
+    settings.ES_NUMBER_OF_SHARDS = shards
+
+    rng = random.Random(42)
+    user_ids = [f"bench-{layout}-{n}" for n in range(tenants)]
+    try:
+        for user_id in user_ids:
+            for d in range(docs_per_tenant):
+                doc = Document(
+                    id=f"{user_id}-doc{d}",
+                    user_id=user_id,
+                    filename=f"doc{d}.md",
+                    file_type=DocumentType.MARKDOWN,
+                    file_path="",
+                    size=0,
+                    status=ProcessingStatus.COMPLETED,
+                    created_at=datetime.utcnow(),
+                )
+                chunks = [" ".join(rng.choices(WORDS, k=60)) for _ in range(chunks_per_doc)]
+                await document_service._index_chunks(doc, chunks, refresh=False)
+
+        probe = user_ids[0]
+        if layout == "dedicated":
+            await search_index.promote_tenant(probe)
+
+        latencies = []
+        scanned_before = stub.docs_scanned
+        for _ in range(queries):
+            started = time.perf_counter()
+            await document_service._search_with_elasticsearch(
+                query=" ".join(rng.sample(WORDS, 3)),
+                user_id=probe,
+                document_ids=None,
+                top_k=settings.TOP_K_RESULTS,
+            )
+            latencies.append((time.perf_counter() - started) * 1000)
+        return statistics.median(latencies), (stub.docs_scanned - scanned_before) / queries
+    finally:
+        for user_id in user_ids:
+            db.redis.hdel("search:tenant_indices", user_id)
+
+
+async def main(args):
+    try:
+        import fakeredis  # type: ignore
+
+        db._redis = fakeredis.FakeRedis(decode_responses=True)
+    except ImportError:
+        pass
+
+    print(f"{'tenants':>8} {'layout':>10} {'p50 ms':>9} {'docs scanned/query':>20}")
+    for tenants in args.tenants:
+        for layout in ("unrouted", "routed", "dedicated"):
+            p50, scanned = await run_layout(
+                layout, tenants, args.docs, args.chunks, args.queries, args.shards
+            )
+            print(f"{tenants:>8} {layout:>10} {p50:>9.2f} {scanned:>20.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tenants", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--docs", type=int, default=3, help="Documents per tenant")
+    parser.add_argument("--chunks", type=int, default=10, help="Chunks per document")
+    parser.add_argument("--queries", type=int, default=30)
+    parser.add_argument("--shards", type=int, default=8)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,113 @@
+# scripts/bench_token_stream.py
+"""
+Microbenchmark token streaming serialization.
+
+    python scripts/bench_token_stream.py --tokens 200000
+
+Compares the original per-token ``json.dumps`` SSE frames, a per-token
+event dict merged with its ``seq`` and dumped with orjson, and the served
+encoding (``stream_service.encode_event`` of a bare text delta inside an
+``id_frame``), both as bare frame building and through a StreamingResponse
+driven by a minimal ASGI harness, plus the chat_history message codec.
+Tokens are not coalesced and the Redis round trip is left out.
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import orjson
+from fastapi.responses import StreamingResponse
+
+from backend.core.chat_codec import decode_message, encode_message, to_epoch_ms
+from backend.core.sse import id_frame
+from backend.services.stream_service import encode_event
+
+WORDS = "the model streams short tokens like these, with “quotes” and émojis 🚀\n".split(" ")
+
+
+def legacy_frame(token: str) -> str:
+    sse_data = json.dumps({"type": "content", "content": token})
+    return f"data: {sse_data}\n\n"
+
+
+def dict_frame(seq: int, token: str) -> bytes:
+    event = {"type": "content", "content": token}
+    return id_frame(f"bench:{seq}", orjson.dumps({"seq": seq, **event}))
+
+
+def served_frame(seq: int, token: str) -> bytes:
+    return id_frame(f"bench:{seq}", encode_event(seq, token))
+
+
+def legacy_encode(role: str, content: str) -> str:
+    return json.dumps(
+        [role[0], to_epoch_ms(datetime.utcnow()), content],
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+
+
+def timed(label: str, count: int, fn):
+    started = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<34} {count / elapsed / 1000:>10.0f} k/s {elapsed * 1e9 / count:>10.0f} ns/op")
+
+
+async def stream(frame, tokens) -> int:
+    """Bytes sent by a StreamingResponse of ``frame(token)`` chunks"""
+
+    async def body():
+        for seq, token in enumerate(tokens, 1):
+            yield frame(seq, token)
+
+    sent = 0
+
+    async def receive():
+        await asyncio.sleep(3600)
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal sent
+        sent += len(message.get("body", b""))
+
+    scope = {"type": "http", "asgi": {"spec_version": "2.4"}, "method": "GET"}
+    await StreamingResponse(body(), media_type="text/event-stream")(scope, receive, send)
+    return sent
+
+
+def main(args):
+    rng = random.Random(7)
+    tokens = [rng.choice(WORDS) + " " for _ in range(args.tokens)]
+    n = len(tokens)
+
+    print(f"{n} tokens")
+    numbered = list(enumerate(tokens, 1))
+    timed("frames: json.dumps + f-string", n, lambda: [legacy_frame(t) for t in tokens])
+    timed("frames: event dict + seq merge", n, lambda: [dict_frame(i, t) for i, t in numbered])
+    timed("frames: encode_event", n, lambda: [served_frame(i, t) for i, t in numbered])
+    timed("response: json.dumps frames", n, lambda: asyncio.run(stream(lambda _, t: legacy_frame(t), tokens)))
+    timed("response: event dict + seq merge", n, lambda: asyncio.run(stream(dict_frame, tokens)))
+    timed("response: encode_event", n, lambda: asyncio.run(stream(served_frame, tokens)))
+
+    messages = [" ".join(rng.choices(WORDS, k=40)) for _ in range(n // 10)]
+    m = len(messages)
+    timed("chat codec: json encode", m, lambda: [legacy_encode("user", c) for c in messages])
+    timed("chat codec: orjson encode", m, lambda: [encode_message("user", c) for c in messages])
+    encoded = [encode_message("user", c) for c in messages]
+    timed("chat codec: json decode", m, lambda: [json.loads(raw) for raw in encoded])
+    timed("chat codec: orjson decode", m, lambda: [orjson.loads(raw) for raw in encoded])
+    assert decode_message(encoded[0])["content"] == messages[0]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tokens", type=int, default=200000)
+    main(parser.parse_args())
@@ -0,0 +1,140 @@
+# scripts/bench_workers.py
+"""
+Load-test the multi-process server at several worker counts.
+
+    python scripts/bench_workers.py --workers 1 2 4 --duration 10
+    python scripts/bench_workers.py --path /api/v1/blog --token "$JWT"
+
+For each worker count, starts ``python -m backend.serve`` on a free loopback
+port, waits for /health, then drives it from ``--clients`` load processes,
+each holding ``--connections`` keep-alive HTTP/1.1 connections that send
+requests back to back for ``--duration`` seconds. Reports requests per
+second, latency percentiles and the speed-up over the first worker count.
+The load generators share the machine with the server, so scaling flattens
+once workers and clients together exceed the available cores.
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def start_server(workers: int, port: int) -> subprocess.Popen:
+    server = subprocess.Popen(
+        [sys.executable, "-m", "backend.serve", "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers)],
+        cwd=ROOT,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+                if response.status == 200:
+                    return server
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError(f"server with {workers} worker(s) did not start")
+
+
+async def connection(host: str, port: int, request: bytes, until: float, latencies: List[float]) -> int:
+    reader, writer = await asyncio.open_connection(host, port)
+    errors = 0
+    try:
+        while time.perf_counter() < until:
+            started = time.perf_counter()
+            writer.write(request)
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = 0
+            for line in head.split(b"\r\n"):
+                if line[:15].lower() == b"content-length:":
+                    length = int(line[15:])
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - started)
+            if not head.startswith(b"HTTP/1.1 2"):
+                errors += 1
+    finally:
+        writer.close()
+    return errors
+
+
+def load(args: Tuple[str, int, bytes, float, int]) -> Tuple[List[float], int]:
+    host, port, request, until, connections = args
+    latencies: List[float] = []
+
+    async def run():
+        return await asyncio.gather(
+            *(connection(host, port, request, until, latencies) for _ in range(connections))
+        )
+
+    errors = asyncio.run(run())
+    return latencies, sum(errors)
+
+
+def measure(args, host: str, port: int) -> Tuple[float, List[float], int]:
+    headers = f"Host: {host}\r\nConnection: keep-alive\r\n"
+    if args.token:
+        headers += f"Authorization: Bearer {args.token}\r\n"
+    request = f"GET {args.path} HTTP/1.1\r\n{headers}\r\n".encode()
+
+    until = time.perf_counter() + 1  # warm-up second
+    with multiprocessing.Pool(args.clients) as pool:
+        pool.map(load, [(host, port, request, until, args.connections)] * args.clients)
+        until = time.perf_counter() + args.duration
+        results = pool.map(load, [(host, port, request, until, args.connections)] * args.clients)
+    latencies = sorted(latency for result in results for latency in result[0])
+    return len(latencies) / args.duration, latencies, sum(result[1] for result in results)
+
+
+def percentile(values: List[float], q: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * q))] * 1000 if values else 0.0
+
+
+def main(args):
+    print(
+        f"GET {args.path}: {args.clients} client process(es) x {args.connections} connection(s),"
+        f" {args.duration:.0f}s per run, {os.cpu_count()} CPU(s)"
+    )
+    print(f"{'workers':>8} {'req/s':>10} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7} {'speed-up':>9}")
+    baseline: Optional[float] = None
+    for workers in args.workers:
+        port = free_port()
+        server = start_server(workers, port)
+        try:
+            throughput, latencies, errors = measure(args, "127.0.0.1", port)
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait(timeout=60)
+        baseline = baseline or throughput
+        print(
+            f"{workers:>8} {throughput:>10.0f} {percentile(latencies, 0.5):>8.2f}"
+            f" {percentile(latencies, 0.99):>8.2f} {errors:>7} {throughput / baseline:>8.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--path", default="/health")
+    parser.add_argument("--token", default="", help="JWT for authenticated paths")
+    parser.add_argument("--clients", type=int, default=max(2, (os.cpu_count() or 2) // 2))
+    parser.add_argument("--connections", type=int, default=16, help="Per client process")
+    parser.add_argument("--duration", type=float, default=10)
+    main(parser.parse_args())
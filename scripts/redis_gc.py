@@ -0,0 +1,49 @@
+# scripts/redis_gc.py
+"""
+Run one Redis garbage collection pass and print what it reclaimed.
+
+    python scripts/redis_gc.py --dry-run
+    python scripts/redis_gc.py --failed-ttl-days 14
+
+Walks the keyspace with incremental SCAN and removes orphaned keys, dangling
+set members and expired failed/abandoned artifacts (see
+backend.services.gc_service). The API runs the same pass every
+GC_INTERVAL_SECONDS; this is for one-off clean-ups and for checking what a
+pass would do before enabling it.
+"""
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from backend.config import settings
+from backend.core.database import db
+
+
+async def main(args):
+    if args.failed_ttl_days is not None:
+        settings.GC_FAILED_TTL_DAYS = args.failed_ttl_days
+    if args.empty_draft_ttl_days is not None:
+        settings.GC_EMPTY_DRAFT_TTL_DAYS = args.empty_draft_ttl_days
+    if args.stale_minutes is not None:
+        settings.GC_STALE_MINUTES = args.stale_minutes
+
+    from backend.services.gc_service import gc_service
+
+    try:
+        report = await gc_service.collect(dry_run=args.dry_run)
+    finally:
+        await db.close()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--dry-run", action="store_true", help="Report only; change nothing")
+    parser.add_argument("--failed-ttl-days", type=int, help="Override GC_FAILED_TTL_DAYS (0 keeps failed items)")
+    parser.add_argument("--empty-draft-ttl-days", type=int, help="Override GC_EMPTY_DRAFT_TTL_DAYS")
+    parser.add_argument("--stale-minutes", type=int, help="Override GC_STALE_MINUTES")
+    asyncio.run(main(parser.parse_args()))
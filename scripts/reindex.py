@@ -0,0 +1,53 @@
+# scripts/reindex.py
+"""
+Re-chunk and re-index every processed document from its stored extraction.
+
+    python scripts/reindex.py --chunk-size 800 --chunk-overlap 120
+
+Original files are not re-opened. With ElasticSearch configured, the new
+chunks go into a fresh index version and the `documents` alias is flipped
+to it once the run completes. If any document fails, the new version is
+discarded and the old one keeps serving; pass --force to flip anyway.
+"""
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from backend.config import settings
+from backend.core.database import db
+
+
+async def main(args):
+    if args.chunk_size:
+        settings.CHUNK_SIZE = args.chunk_size
+    if args.chunk_overlap is not None:
+        settings.CHUNK_OVERLAP = args.chunk_overlap
+
+    from backend.services.document_service import document_service
+
+    try:
+        report = await document_service.reindex_documents(
+            concurrency=args.concurrency, force=args.force
+        )
+    finally:
+        if document_service.elasticsearch:
+            await document_service.elasticsearch.close()
+        db.redis.close()
+    print(json.dumps(report, indent=2))
+    if report["index"] and not report["promoted"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--chunk-size", type=int, help="Override CHUNK_SIZE for this run")
+    parser.add_argument("--chunk-overlap", type=int, help="Override CHUNK_OVERLAP for this run")
+    parser.add_argument("--concurrency", type=int, help="Documents processed at once")
+    parser.add_argument(
+        "--force", action="store_true", help="Flip to the new index even if some documents failed"
+    )
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,58 @@
+# scripts/tier_storage.py
+"""
+Run one tiering pass: move idle document chunks and draft bodies to disk.
+
+    python scripts/tier_storage.py --dry-run
+    python scripts/tier_storage.py --after-days 14 --hot-max-mb 512
+
+Content not accessed for TIER_AFTER_DAYS (and, with a budget, the least
+recently accessed content beyond TIER_HOT_MAX_MB) moves from Redis to the
+SQLite cold store at COLD_STORE_PATH; see backend.services.tiering_service.
+It comes back into Redis the next time it is read. Run this on the host
+that serves the API, since the cold store is a local file. The pass holds
+tier:lock, so it will not run alongside the server's periodic pass.
+"""
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from backend.config import settings
+from backend.core.cold_store import cold_store
+from backend.core.database import db
+
+# Upper bound on one pass; the lock is released as soon as the pass ends
+_LOCK_SECONDS = 60 * 60
+
+
+async def main(args):
+    if args.after_days is not None:
+        settings.TIER_AFTER_DAYS = args.after_days
+    if args.hot_max_mb is not None:
+        settings.TIER_HOT_MAX_MB = args.hot_max_mb
+
+    from backend.services.tiering_service import tiering_service
+
+    # A dry run moves nothing, so it does not need the lock
+    if not args.dry_run and not tiering_service.acquire_lock(_LOCK_SECONDS):
+        print("Another tiering pass holds tier:lock; try again later")
+        sys.exit(1)
+    try:
+        report = await tiering_service.run(dry_run=args.dry_run)
+    finally:
+        if not args.dry_run:
+            tiering_service.release_lock()
+        await db.close()
+        cold_store.close()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--dry-run", action="store_true", help="Report only; move nothing")
+    parser.add_argument("--after-days", type=int, help="Override TIER_AFTER_DAYS (0 disables age-based moves)")
+    parser.add_argument("--hot-max-mb", type=int, help="Override TIER_HOT_MAX_MB (0 = no budget)")
+    asyncio.run(main(parser.parse_args()))